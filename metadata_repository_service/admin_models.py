@@ -0,0 +1,74 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Models for administrating the service"""
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class CacheStats(BaseModel):
+    """
+    Statistics of the in-memory entity cache of a service process.
+    """
+
+    entries: int = Field(..., description="The number of cached entities.")
+    max_entries: int = Field(
+        ..., description="The maximum number of entities held by the cache."
+    )
+    hits: int = Field(..., description="The number of lookups served by the cache.")
+    misses: int = Field(
+        ..., description="The number of lookups that were not served by the cache."
+    )
+    evictions: int = Field(
+        ..., description="The number of entities evicted because the cache was full."
+    )
+
+
+class DatasetSummaryRebuild(BaseModel):
+    """
+    The result of rebuilding all stored Dataset summaries.
+    """
+
+    count: int = Field(..., description="The number of rebuilt Dataset summaries.")
+
+
+class IndexReport(BaseModel):
+    """
+    The result of comparing the indexes of the metadata store with the registered
+    indexes. Indexes are given as "<collection>.<index name>".
+    """
+
+    missing: List[str] = Field([], description="Registered indexes that did not exist.")
+    created: List[str] = Field([], description="Missing indexes that were created.")
+    failed: List[str] = Field(
+        [], description="Missing indexes that could not be created."
+    )
+    mismatched: List[str] = Field(
+        [],
+        description="Indexes with the name of a registered index but other options.",
+    )
+    extra: List[str] = Field(
+        [], description="Existing indexes that are not registered."
+    )
+    dropped: List[str] = Field([], description="Extra indexes that were dropped.")
+
+
+class ReferenceRebuild(BaseModel):
+    """
+    The result of rebuilding the reverse references of all entities.
+    """
+
+    count: int = Field(..., description="The number of stored references.")
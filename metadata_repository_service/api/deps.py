@@ -15,9 +15,119 @@
 
 """FastAPI dependencies (used with the `Depends` feature)"""
 
+from typing import Callable, List, NamedTuple, Optional, Type
+
+from fastapi import Query
+from pydantic import BaseModel
+
 from metadata_repository_service.config import CONFIG
+from metadata_repository_service.dao.utils import (
+    MODEL_CLASSES,
+    get_reference_collection,
+)
 
 
 def get_config():
     """Get runtime configuration."""
     return CONFIG
+
+
+def _get_reference_fields(model_class: Type[BaseModel]) -> List[str]:
+    """Get the names of the reference fields of a model class"""
+    return [name for name in model_class.__fields__ if get_reference_collection(name)]
+
+
+def get_fields_dependency(
+    model_class: Type[BaseModel],
+) -> Callable[..., Optional[List[str]]]:
+    """
+    Get the dependency for the fields requested from an entity of a model class,
+    documented with an example for the model class.
+
+    Args:
+        model_class: The model class of the entities
+
+    Returns:
+        The dependency, resolving to the requested fields, ``None`` for all fields
+
+    """
+    reference_fields = _get_reference_fields(model_class)
+    if reference_fields:
+        description = (
+            "Fields to return in addition to the ID. Fields of embedded "
+            + "references are given as dotted paths, "
+            + f"e.g. '{reference_fields[0]}.alias'."
+        )
+    else:
+        description = "Fields to return in addition to the ID, e.g. 'alias'."
+
+    def get_fields(
+        fields: Optional[List[str]] = Query(None, description=description)
+    ) -> Optional[List[str]]:
+        return fields
+
+    return get_fields
+
+
+class EmbeddingParameters(NamedTuple):
+    """The references requested to be embedded in an entity"""
+
+    embedded: bool = False
+    embed: Optional[List[str]] = None
+    depth: Optional[int] = None
+
+
+def _get_embed_example(reference_fields: List[str]) -> str:
+    """Get an example of a dotted path of reference fields"""
+    for field in reference_fields:
+        model_class = MODEL_CLASSES[get_reference_collection(field)]
+        subfields = _get_reference_fields(model_class)
+        if subfields:
+            return f"{field}.{subfields[0]}"
+    return reference_fields[0]
+
+
+def get_embedding_dependency(
+    model_class: Type[BaseModel], default_depth: Optional[int] = None
+) -> Callable[..., EmbeddingParameters]:
+    """
+    Get the dependency for the references requested to be embedded in an entity of
+    a model class, documented with an example for the model class.
+
+    Args:
+        model_class: The model class of the entities
+        default_depth: The maximum number of levels of references to embed if
+            neither the depth nor the reference fields to embed are requested,
+            unlimited by default
+
+    Returns:
+        The dependency, resolving to the parameters of the embedding
+
+    """
+    reference_fields = _get_reference_fields(model_class)
+    embed_description = "Reference fields to embed instead of all of them, implies "
+    if reference_fields:
+        embed_description += (
+            "embedded. References of embedded entities are given as dotted paths, "
+            + f"e.g. '{_get_embed_example(reference_fields)}'."
+        )
+    else:
+        embed_description += (
+            f"embedded. A {model_class.__name__} has no reference fields."
+        )
+    depth_description = (
+        "Maximum number of levels of references to embed, implies embedded."
+    )
+    if default_depth is not None:
+        depth_description += f" {default_depth} if only embedded is given."
+
+    def get_embedding(
+        embedded: bool = False,
+        embed: Optional[List[str]] = Query(None, description=embed_description),
+        depth: Optional[int] = Query(None, ge=0, description=depth_description),
+    ) -> EmbeddingParameters:
+        if embedded and embed is None and depth is None:
+            depth = default_depth
+        return EmbeddingParameters(embedded=embedded, embed=embed, depth=depth)
+
+    return get_embedding
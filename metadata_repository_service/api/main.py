@@ -21,6 +21,9 @@ Additional endpoints might be structured in dedicated modules
 from fastapi import FastAPI
 from ghga_service_chassis_lib.api import configure_app
 
+from metadata_repository_service.api.deps import get_config
+from metadata_repository_service.api.responses import declare_continuations
+from metadata_repository_service.api.routers.admin import admin_router
 from metadata_repository_service.api.routers.analyses import analysis_router
 from metadata_repository_service.api.routers.analysis_processes import (
     analysis_process_router,
@@ -40,6 +43,7 @@ from metadata_repository_service.api.routers.experiment_processes import (
     experiment_process_router,
 )
 from metadata_repository_service.api.routers.experiments import experiment_router
+from metadata_repository_service.api.routers.export import export_router
 from metadata_repository_service.api.routers.files import file_router
 from metadata_repository_service.api.routers.individuals import individual_router
 from metadata_repository_service.api.routers.members import member_router
@@ -52,6 +56,12 @@ from metadata_repository_service.api.routers.submissions import submission_route
 from metadata_repository_service.api.routers.technologies import technology_router
 from metadata_repository_service.api.routers.workflows import workflow_router
 from metadata_repository_service.config import CONFIG
+from metadata_repository_service.dao.change_stream import (
+    start_change_stream_watcher,
+    stop_change_stream_watchers,
+)
+from metadata_repository_service.dao.db import close_db, connect_db
+from metadata_repository_service.dao.indexes import ensure_indexes
 
 app = FastAPI()
 configure_app(app, config=CONFIG)
@@ -76,6 +86,42 @@ app.include_router(submission_router)
 app.include_router(technology_router)
 app.include_router(workflow_router)
 app.include_router(dataset_summary_router)
+app.include_router(export_router)
+app.include_router(admin_router)
+
+
+def openapi():
+    """
+    Get the OpenAPI schema of the app, with the fields that entity responses
+    add to the response models of their routes.
+    """
+    if app.openapi_schema is None:
+        app.openapi_schema = declare_continuations(FastAPI.openapi(app))
+    return app.openapi_schema
+
+
+app.openapi = openapi  # type: ignore
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Open the database connection pool shared by all requests, create the missing
+    indexes and start watching the change stream if enabled.
+    """
+    config = app.dependency_overrides.get(get_config, get_config)()
+    await connect_db(config)
+    if config.create_indexes_on_startup:
+        await ensure_indexes(config)
+    if config.change_stream_enabled:
+        await start_change_stream_watcher(config)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop watching the change stream and close the database connection pool."""
+    await stop_change_stream_watchers()
+    await close_db()
 
 
 @app.get("/")
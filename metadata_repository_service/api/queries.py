@@ -0,0 +1,292 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Handlers of the routes that query the entities of a collection, shared by the
+routers of all entity collections. The collection of a model class is named
+after the model class.
+"""
+
+# pylint: disable=too-many-arguments
+
+from typing import List, Optional, Type
+
+from fastapi import Request
+from fastapi.exceptions import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from metadata_repository_service.api.deps import EmbeddingParameters
+from metadata_repository_service.api.responses import (
+    entity_batch_response,
+    entity_response,
+    is_conditional,
+    is_not_modified,
+    not_modified_response,
+    referenced_entity_page_response,
+)
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao.embedding import EmbeddingBudget
+from metadata_repository_service.dao.entities import (
+    get_entity_batch,
+    get_entity_document,
+    get_entity_page,
+)
+from metadata_repository_service.dao.references import (
+    get_referenced_entities,
+    get_referencing_entities,
+)
+from metadata_repository_service.dao.versioning import (
+    get_document_version,
+    get_entity_version,
+)
+from metadata_repository_service.page_models import EntityPage, ReferencePage
+
+
+def _not_found(model_class: Type[BaseModel], entity_id: str) -> HTTPException:
+    """Get the error for an entity that does not exist"""
+    return HTTPException(
+        status_code=404,
+        detail=f"{model_class.__name__} with id '{entity_id}' not found",
+    )
+
+
+async def get_entity_response(
+    model_class: Type[BaseModel],
+    entity_id: str,
+    request: Request,
+    config: Config,
+    embedding: EmbeddingParameters = EmbeddingParameters(),
+    fields: Optional[List[str]] = None,
+) -> Response:
+    """
+    Given an entity ID, get the response with the entity, or ``304 Not Modified``
+    if the request is conditional and the entity was not modified. The version of
+    the entity is only looked up ahead of the entity for conditional requests.
+
+    Args:
+        model_class: The model class of the entity
+        entity_id: The ID of the entity
+        request: The request, with its conditional headers
+        config: Rumtime configuration
+        embedding: The references to embed, within the embedding budget. None, by
+            default.
+        fields: The fields to return in addition to the ID, all by default
+
+    Returns:
+        The response
+
+    Raises:
+        HTTPException: 400 if a field or reference field is unknown, 404 if the
+            entity does not exist
+
+    """
+    arguments = dict(
+        field="id",
+        collection_name=model_class.__name__,
+        embedded=embedding.embedded,
+        fields=fields,
+        embed=embedding.embed,
+        depth=embedding.depth,
+        config=config,
+    )
+    try:
+        if is_conditional(request):
+            version = await get_entity_version(identifier=entity_id, **arguments)
+            if version is not None and is_not_modified(request, version):
+                return not_modified_response(version)
+        document = await get_entity_document(
+            identifier=entity_id,
+            budget=EmbeddingBudget.from_config(config),
+            **arguments,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    if not document:
+        raise _not_found(model_class, entity_id)
+    # the version of the document as retrieved, which is the version evaluated
+    # above unless the document was truncated to the byte budget
+    version = get_document_version(document, **arguments)
+    return entity_response(model_class, document, fields=fields, version=version)
+
+
+async def get_entity_batch_response(
+    model_class: Type[BaseModel],
+    identifiers: List[str],
+    config: Config,
+    embedding: EmbeddingParameters = EmbeddingParameters(),
+    fields: Optional[List[str]] = None,
+) -> Response:
+    """
+    Given a list of IDs, or accessions for the entities that have one, get the
+    response with the entities in the order of the identifiers.
+
+    Args:
+        model_class: The model class of the entities
+        identifiers: The IDs or accessions
+        config: Rumtime configuration
+        embedding: The references to embed, within the embedding budget. None, by
+            default.
+        fields: The fields to return in addition to the ID, all by default
+
+    Returns:
+        The response
+
+    Raises:
+        HTTPException: 400 if there are too many identifiers, or a field or
+            reference field is unknown
+
+    """
+    try:
+        batch = await get_entity_batch(
+            identifiers=identifiers,
+            collection_name=model_class.__name__,
+            model_class=model_class,
+            embedded=embedding.embedded,
+            fields=fields,
+            embed=embedding.embed,
+            depth=embedding.depth,
+            config=config,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    return entity_batch_response(model_class, batch, fields=fields)
+
+
+async def get_entity_list_page(
+    model_class: Type[BaseModel],
+    limit: int,
+    config: Config,
+    after: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> EntityPage:
+    """
+    Get a page of the entities of a collection, restricted to the requested fields.
+
+    Args:
+        model_class: The model class of the entities
+        limit: The maximum number of entities
+        config: Rumtime configuration
+        after: The cursor returned with the previous page
+        fields: The fields to return in addition to the ID
+
+    Returns:
+        The page of entities
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid or a field is unknown
+
+    """
+    try:
+        return await get_entity_page(
+            collection_name=model_class.__name__,
+            model_class=model_class,
+            limit=limit,
+            after=after,
+            fields=fields,
+            config=config,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+
+
+async def get_referencing_entity_page(
+    model_class: Type[BaseModel],
+    entity_id: str,
+    limit: int,
+    config: Config,
+    after: Optional[str] = None,
+    referencing_collection: Optional[str] = None,
+) -> ReferencePage:
+    """
+    Given an entity ID, get a page of the references to the entity from other
+    entities.
+
+    Args:
+        model_class: The model class of the entity
+        entity_id: The ID of the entity
+        limit: The maximum number of references
+        config: Rumtime configuration
+        after: The cursor returned with the previous page
+        referencing_collection: Only get the references from this collection
+
+    Returns:
+        The page of references
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid, 404 if the entity does not
+            exist
+
+    """
+    try:
+        references = await get_referencing_entities(
+            collection_name=model_class.__name__,
+            document_id=entity_id,
+            limit=limit,
+            after=after,
+            referencing_collection=referencing_collection,
+            config=config,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    if references is None:
+        raise _not_found(model_class, entity_id)
+    return references
+
+
+async def get_referenced_entity_response(
+    model_class: Type[BaseModel],
+    entity_id: str,
+    field: str,
+    limit: int,
+    config: Config,
+    after: Optional[str] = None,
+    embedded: bool = False,
+) -> Response:
+    """
+    Given an entity ID and the name of a field with an array of references, get
+    the response with a page of the entities referenced in the field.
+
+    Args:
+        model_class: The model class of the referencing entity
+        entity_id: The ID of the referencing entity
+        field: The name of the field with the array of references
+        limit: The maximum number of entities
+        config: Rumtime configuration
+        after: The cursor returned with the previous page or a truncated array
+        embedded: Whether or not to embed references. ``False``, by default.
+
+    Returns:
+        The response
+
+    Raises:
+        HTTPException: 400 if the field is not an array of references or the
+            cursor is invalid, 404 if the entity does not exist
+
+    """
+    try:
+        page = await get_referenced_entities(
+            collection_name=model_class.__name__,
+            document_id=entity_id,
+            field=field,
+            limit=limit,
+            after=after,
+            embedded=embedded,
+            config=config,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    if page is None:
+        raise _not_found(model_class, entity_id)
+    return referenced_entity_page_response(field, page)
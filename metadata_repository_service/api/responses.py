@@ -0,0 +1,376 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Rendering of documents from the metadata store as JSON responses
+"""
+
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from metadata_repository_service.dao.embedding import (
+    CONTINUATIONS_FIELD,
+    EMBED_ALL,
+    FieldSelection,
+    get_field_selection,
+)
+from metadata_repository_service.dao.references import is_reference_array
+from metadata_repository_service.dao.submission_planner import get_model_classes
+from metadata_repository_service.dao.utils import (
+    MODEL_CLASSES,
+    get_reference_collection,
+)
+from metadata_repository_service.dao.versioning import EntityVersion
+from metadata_repository_service.page_models import EntityBatch, EntityPage
+
+
+class RenderField(NamedTuple):
+    """A field of a model, as rendered in a response"""
+
+    name: str
+    default: Any
+    # the model classes of the documents nested in the field, if any
+    model_classes: Tuple[Type[BaseModel], ...]
+    # the type that numbers are converted to, as done by the validation
+    scalar_type: Optional[type]
+
+
+_RENDER_PLANS: Dict[Type[BaseModel], List[RenderField]] = {}
+_RENDER_FIELDS: Dict[Type[BaseModel], Dict[str, RenderField]] = {}
+
+
+def get_render_plan(model_class: Type[BaseModel]) -> List[RenderField]:
+    """
+    Get the fields to render for documents of a model class.
+
+    Args:
+        model_class: The model class
+
+    Returns:
+        The fields of the model class, computed on first use
+
+    """
+    plan = _RENDER_PLANS.get(model_class)
+    if plan is not None:
+        return plan
+    # registered before it is filled in, as models can nest themselves
+    plan = _RENDER_PLANS[model_class] = []
+    for field_name, field in model_class.__fields__.items():
+        plan.append(
+            RenderField(
+                name=field_name,
+                default=field.get_default(),
+                model_classes=tuple(get_model_classes(field.outer_type_)),
+                scalar_type=field.type_ if field.type_ in (str, int) else None,
+            )
+        )
+    return plan
+
+
+def get_render_fields(model_class: Type[BaseModel]) -> Dict[str, RenderField]:
+    """
+    Get the fields that can be selected for documents of a model class, which
+    include the fields of its subclasses.
+
+    Args:
+        model_class: The model class
+
+    Returns:
+        The fields keyed by their name, computed on first use
+
+    """
+    render_fields = _RENDER_FIELDS.get(model_class)
+    if render_fields is None:
+        render_fields = {}
+        for subclass in model_class.__subclasses__():
+            render_fields.update(get_render_fields(subclass))
+        render_fields.update(
+            (field.name, field) for field in get_render_plan(model_class)
+        )
+        _RENDER_FIELDS[model_class] = render_fields
+    return render_fields
+
+
+def _select_model_class(
+    model_classes: Tuple[Type[BaseModel], ...], document: Dict
+) -> Type[BaseModel]:
+    """Select the model class of a document by its schema type"""
+    schema_class = MODEL_CLASSES.get(document.get("schema_type"))
+    if schema_class is not None and issubclass(schema_class, model_classes):
+        return schema_class
+    return model_classes[0]
+
+
+def _render_value(
+    value: Any, field: RenderField, selection: Optional[FieldSelection] = None
+) -> Any:
+    """Render the value of a field, or an item of a list field"""
+    if isinstance(value, dict) and field.model_classes:
+        if selection is not None:
+            return _render_selection(field.model_classes[0], value, selection)
+        return render_entity(_select_model_class(field.model_classes, value), value)
+    if isinstance(value, list):
+        return [_render_value(item, field, selection) for item in value]
+    if (
+        field.scalar_type is not None
+        and type(value)
+        is not field.scalar_type  # pylint: disable=unidiomatic-typecheck
+        and isinstance(value, (int, float))
+    ):
+        return field.scalar_type(value)
+    return value
+
+
+def _render_selection(
+    model_class: Type[BaseModel], document: Dict, selection: FieldSelection
+) -> Dict:
+    """Render the ID and the selected fields of a document"""
+    render_fields = get_render_fields(model_class)
+    rendered = {"id": document.get("id")}
+    for field_name, subselection in selection.items():
+        field = render_fields[field_name]
+        value = document.get(field_name)
+        if value is None:
+            rendered[field_name] = field.default
+        else:
+            rendered[field_name] = _render_value(value, field, subselection)
+    if CONTINUATIONS_FIELD in document:
+        rendered[CONTINUATIONS_FIELD] = document[CONTINUATIONS_FIELD]
+    return rendered
+
+
+def render_entity(
+    model_class: Type[BaseModel],
+    document: Dict,
+    selection: Optional[FieldSelection] = None,
+) -> Dict:
+    """
+    Render a document from the metadata store as its model would be rendered,
+    without validating it: only the fields of the model are kept, missing fields
+    are set to their default, and nested documents are rendered with the model
+    class given by their schema type. The cursors of reference arrays that were
+    truncated to the embedding budget are kept.
+
+    Args:
+        model_class: The model class
+        document: The document, with or without embedded references
+        selection: The fields to render in addition to the ID, all by default
+
+    Returns:
+        The rendered document
+
+    """
+    if selection is not None:
+        return _render_selection(model_class, document, selection)
+    model_class = _select_model_class((model_class,), document)
+    rendered = {}
+    for field in get_render_plan(model_class):
+        value = document.get(field.name)
+        if value is None:
+            rendered[field.name] = field.default
+        elif type(value) is str:  # pylint: disable=unidiomatic-typecheck
+            rendered[field.name] = value
+        else:
+            rendered[field.name] = _render_value(value, field)
+    if CONTINUATIONS_FIELD in document:
+        rendered[CONTINUATIONS_FIELD] = document[CONTINUATIONS_FIELD]
+    return rendered
+
+
+def declare_continuations(openapi_schema: Dict) -> Dict:
+    """
+    Declare the cursors of truncated reference arrays, which ``render_entity``
+    keeps in the rendered documents, as an optional property of the schemas of
+    the models that have arrays of references.
+
+    Args:
+        openapi_schema: The OpenAPI schema of the app, modified in place
+
+    Returns:
+        The OpenAPI schema
+
+    """
+    schemas = openapi_schema.get("components", {}).get("schemas", {})
+    for (name, schema) in schemas.items():
+        model_class = MODEL_CLASSES.get(name)
+        if model_class is None or not any(
+            is_reference_array(model_class, field) for field in model_class.__fields__
+        ):
+            continue
+        schema.setdefault("properties", {})[CONTINUATIONS_FIELD] = {
+            "title": "Continuations",
+            "type": "object",
+            "additionalProperties": {"type": "string"},
+            "description": "The cursors of the arrays of references that were "
+            + "truncated to the embedding budget, keyed by field name. Pass a "
+            + "cursor as 'after' to the references route of the field to get "
+            + "the remaining entities. Not set if no array was truncated.",
+        }
+    return openapi_schema
+
+
+def entity_response(
+    model_class: Type[BaseModel],
+    document: Dict,
+    fields: Optional[List[str]] = None,
+    version: Optional[EntityVersion] = None,
+) -> Response:
+    """
+    Given a document from the metadata store, get the JSON response with the
+    document rendered as an instance of a model class.
+
+    Documents from the metadata store are trusted, so that the response is built
+    without validating the document against the model, neither when building the
+    model object nor when serializing the response.
+
+    Args:
+        model_class: The model class, as declared as the response model of the route
+        document: The document
+        fields: The fields requested for the document, all by default
+        version: The version of the document, sent as the ``ETag`` and
+            ``Last-Modified`` headers
+
+    Returns:
+        The response
+
+    """
+    selection = get_field_selection(fields, model_class, embedding=EMBED_ALL)
+    return Response(
+        content=orjson.dumps(render_entity(model_class, document, selection)),
+        media_type="application/json",
+        headers=_version_headers(version),
+    )
+
+
+def is_conditional(request: Request) -> bool:
+    """Whether a GET request has an ``If-None-Match`` or ``If-Modified-Since``
+    header, to be evaluated with ``is_not_modified``"""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, version: EntityVersion) -> bool:
+    """
+    Evaluate the ``If-None-Match`` and ``If-Modified-Since`` headers of a GET
+    request against the current version of the requested entity. As specified by
+    RFC 7232, ``If-Modified-Since`` is ignored if ``If-None-Match`` is given.
+
+    Args:
+        request: The request
+        version: The current version of the entity
+
+    Returns:
+        Whether the entity was not modified, i.e. whether to respond with
+        ``304 Not Modified``
+
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {etag.strip() for etag in if_none_match.split(",")}
+        # the weak comparison, ignoring the weak indicator of the given tags
+        return "*" in etags or version.etag in {
+            etag[2:] if etag.startswith("W/") else etag for etag in etags
+        }
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have a resolution of one second
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(version: EntityVersion) -> Response:
+    """
+    Get the ``304 Not Modified`` response for a version of an entity.
+
+    Args:
+        version: The current version of the entity
+
+    Returns:
+        The response, without content
+
+    """
+    return Response(status_code=304, headers=_version_headers(version))
+
+
+def _version_headers(version: Optional[EntityVersion]) -> Dict[str, str]:
+    """Get the ``ETag`` and ``Last-Modified`` headers for a version of an entity"""
+    if version is None:
+        return {}
+    headers = {"ETag": version.etag}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(version.last_modified, usegmt=True)
+    return headers
+
+
+def referenced_entity_page_response(field: str, page: EntityPage) -> Response:
+    """
+    Given a page of the entities referenced by a field, get the JSON response with
+    the entities rendered as instances of the model class of the field.
+
+    Args:
+        field: The name of the reference field
+        page: The page of entities, as stored in the metadata store
+
+    Returns:
+        The response
+
+    """
+    model_class = MODEL_CLASSES[get_reference_collection(field)]
+    content = {
+        "items": [render_entity(model_class, item) for item in page.items],
+        "next_cursor": page.next_cursor,
+    }
+    return Response(content=orjson.dumps(content), media_type="application/json")
+
+
+def entity_batch_response(
+    model_class: Type[BaseModel], batch: EntityBatch, fields: Optional[List[str]] = None
+) -> Response:
+    """
+    Given a batch of documents from the metadata store, get the JSON response with
+    the documents rendered as instances of a model class.
+
+    Args:
+        model_class: The model class of the collection of the batch
+        batch: The batch of documents
+        fields: The fields requested for the documents, all by default
+
+    Returns:
+        The response
+
+    """
+    selection = get_field_selection(fields, model_class, embedding=EMBED_ALL)
+    content = {
+        "items": [
+            {
+                "identifier": item.identifier,
+                "found": item.found,
+                "entity": None
+                if item.entity is None
+                else render_entity(model_class, item.entity, selection),
+            }
+            for item in batch.items
+        ]
+    }
+    return Response(content=orjson.dumps(content), media_type="application/json")
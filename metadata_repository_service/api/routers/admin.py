@@ -0,0 +1,90 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Routes for administrating the service
+"""
+
+from fastapi import APIRouter, Depends
+
+from metadata_repository_service.admin_models import (
+    CacheStats,
+    DatasetSummaryRebuild,
+    IndexReport,
+    ReferenceRebuild,
+)
+from metadata_repository_service.api.deps import get_config
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.dataset_summary import rebuild_dataset_summaries
+from metadata_repository_service.dao.indexes import reconcile_indexes
+from metadata_repository_service.dao.references import rebuild_references
+
+admin_router = APIRouter()
+
+
+@admin_router.get(
+    "/admin/cache_stats",
+    response_model=CacheStats,
+    summary="Get entity cache statistics",
+    tags=["Admin"],
+)
+async def get_cache_stats(config: Config = Depends(get_config)):
+    """
+    Get the statistics of the in-memory entity cache of the serving process.
+    """
+    return get_entity_cache(config).stats()
+
+
+@admin_router.post(
+    "/admin/rebuild_dataset_summaries",
+    response_model=DatasetSummaryRebuild,
+    summary="Rebuild all Dataset summaries",
+    tags=["Admin"],
+)
+async def rebuild_all_dataset_summaries(config: Config = Depends(get_config)):
+    """
+    Recompute and store the summaries of all Datasets in the metadata store.
+    """
+    count = await rebuild_dataset_summaries(config=config)
+    return DatasetSummaryRebuild(count=count)
+
+
+@admin_router.post(
+    "/admin/rebuild_references",
+    response_model=ReferenceRebuild,
+    summary="Rebuild the references between entities",
+    tags=["Admin"],
+)
+async def rebuild_all_references(config: Config = Depends(get_config)):
+    """
+    Replace the stored references between entities, used to look up the entities
+    that reference an entity, with the references found in all entities.
+    """
+    count = await rebuild_references(config=config)
+    return ReferenceRebuild(count=count)
+
+
+@admin_router.get(
+    "/admin/indexes",
+    response_model=IndexReport,
+    summary="Compare the indexes with the registered indexes",
+    tags=["Admin"],
+)
+async def get_index_report(config: Config = Depends(get_config)):
+    """
+    Report the registered indexes that are missing from the metadata store, and
+    the existing indexes that differ from or are not in the registry.
+    """
+    return await reconcile_indexes(config=config, create_missing=False)
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Analyses"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.analysis import get_analysis
 from metadata_repository_service.models import Analysis
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 analysis_router = APIRouter()
 
@@ -32,17 +50,139 @@ analysis_router = APIRouter()
     tags=["Query"],
 )
 async def get_analyses(
-    analysis_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    analysis_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Analysis)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Analysis)),
+    config: Config = Depends(get_config),
 ):
     """
     Given an Analysis ID, get the Analysis record from the metadata store.
     """
-    analysis = await get_analysis(
-        analysis_id=analysis_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Analysis,
+        analysis_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@analysis_router.get(
+    "/analyses",
+    response_model=EntityPage,
+    summary="List Analysis records",
+    tags=["Query"],
+)
+async def list_analyses(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Analysis)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Analysis records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Analysis, limit, config, after=after, fields=fields
+    )
+
+
+@analysis_router.post(
+    "/analyses/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Analysis records",
+    tags=["Query"],
+)
+async def get_analyses_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Analysis)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Analysis)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Analysis IDs or accessions, get the Analysis records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Analysis,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@analysis_router.get(
+    "/analyses/{analysis_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Analysis",
+    tags=["Query"],
+)
+async def list_analysis_references(
+    analysis_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Analysis ID, get a page of the entities that reference the
+    Analysis, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Analysis,
+        analysis_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@analysis_router.get(
+    "/analyses/{analysis_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Analysis",
+    tags=["Query"],
+)
+async def list_analysis_referenced_entities(
+    analysis_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Analysis ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Analysis,
+        analysis_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not analysis:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Analysis.__name__} with id '{analysis_id}' not found",
-        )
-    return analysis
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Analysis Processes"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.analysis_process import get_analysis_process
 from metadata_repository_service.models import AnalysisProcess
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 analysis_process_router = APIRouter()
 
@@ -33,18 +51,138 @@ analysis_process_router = APIRouter()
 )
 async def get_analysis_processes(
     analysis_process_id: str,
-    embedded: bool = False,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(AnalysisProcess)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(AnalysisProcess)),
     config: Config = Depends(get_config),
 ):
     """
     Given an AnalysisProcess ID, get the AnalysisProcess record from the metadata store.
     """
-    analysis_process = await get_analysis_process(
-        analysis_process_id=analysis_process_id, embedded=embedded, config=config
+    return await get_entity_response(
+        AnalysisProcess,
+        analysis_process_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@analysis_process_router.get(
+    "/analysis_process",
+    response_model=EntityPage,
+    summary="List AnalysisProcess records",
+    tags=["Query"],
+)
+async def list_analysis_processes(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(AnalysisProcess)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of AnalysisProcess records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        AnalysisProcess, limit, config, after=after, fields=fields
+    )
+
+
+@analysis_process_router.post(
+    "/analysis_process/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of AnalysisProcess records",
+    tags=["Query"],
+)
+async def get_analysis_processes_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(AnalysisProcess)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(AnalysisProcess)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of AnalysisProcess IDs, get the AnalysisProcess records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        AnalysisProcess,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@analysis_process_router.get(
+    "/analysis_process/{analysis_process_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a AnalysisProcess",
+    tags=["Query"],
+)
+async def list_analysis_process_references(
+    analysis_process_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a AnalysisProcess ID, get a page of the entities that reference the
+    AnalysisProcess, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        AnalysisProcess,
+        analysis_process_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@analysis_process_router.get(
+    "/analysis_process/{analysis_process_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a AnalysisProcess",
+    tags=["Query"],
+)
+async def list_analysis_process_referenced_entities(
+    analysis_process_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a AnalysisProcess ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        AnalysisProcess,
+        analysis_process_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not analysis_process:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{AnalysisProcess.__name__} with id '{analysis_process_id}' not found",
-        )
-    return analysis_process
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Biospecimens"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.biospecimen import get_biospecimen
 from metadata_repository_service.models import Biospecimen
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 biospecimen_router = APIRouter()
 
@@ -32,17 +50,139 @@ biospecimen_router = APIRouter()
     tags=["Query"],
 )
 async def get_biospecimens(
-    biospecimen_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    biospecimen_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Biospecimen)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Biospecimen)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Biospecimen ID, get the Biospecimen record from the metadata store.
     """
-    biospecimen = await get_biospecimen(
-        biospecimen_id=biospecimen_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Biospecimen,
+        biospecimen_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@biospecimen_router.get(
+    "/biospecimens",
+    response_model=EntityPage,
+    summary="List Biospecimen records",
+    tags=["Query"],
+)
+async def list_biospecimens(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Biospecimen)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Biospecimen records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Biospecimen, limit, config, after=after, fields=fields
+    )
+
+
+@biospecimen_router.post(
+    "/biospecimens/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Biospecimen records",
+    tags=["Query"],
+)
+async def get_biospecimens_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Biospecimen)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Biospecimen)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Biospecimen IDs or accessions, get the Biospecimen records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Biospecimen,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@biospecimen_router.get(
+    "/biospecimens/{biospecimen_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Biospecimen",
+    tags=["Query"],
+)
+async def list_biospecimen_references(
+    biospecimen_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Biospecimen ID, get a page of the entities that reference the
+    Biospecimen, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Biospecimen,
+        biospecimen_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@biospecimen_router.get(
+    "/biospecimens/{biospecimen_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Biospecimen",
+    tags=["Query"],
+)
+async def list_biospecimen_referenced_entities(
+    biospecimen_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Biospecimen ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Biospecimen,
+        biospecimen_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not biospecimen:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Biospecimen.__name__} with id '{biospecimen_id}' not found",
-        )
-    return biospecimen
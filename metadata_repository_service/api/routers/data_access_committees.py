@@ -14,17 +14,35 @@
 # limitations under the License.
 "Routes for retrieving DataAccessCommittees"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
 from metadata_repository_service.creation_models import CreateDataAccessCommittee
 from metadata_repository_service.dao.data_access_committee import (
     create_data_access_committee,
-    get_data_access_committee,
 )
 from metadata_repository_service.models import DataAccessCommittee
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 data_access_committee_router = APIRouter()
 
@@ -37,24 +55,25 @@ data_access_committee_router = APIRouter()
 )
 async def get_data_access_committees(
     data_access_committee_id: str,
-    embedded: bool = False,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(DataAccessCommittee)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(DataAccessCommittee)),
     config: Config = Depends(get_config),
 ):
     """
     Given a DataAccessCommittee ID, get the DataAccessCommittee record
     from the metadata store.
     """
-    data_access_committee = await get_data_access_committee(
-        data_access_committee_id=data_access_committee_id,
-        embedded=embedded,
-        config=config,
+    return await get_entity_response(
+        DataAccessCommittee,
+        data_access_committee_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
     )
-    if not data_access_committee:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{DataAccessCommittee.__name__} with id '{data_access_committee_id}' not found",
-        )
-    return data_access_committee
 
 
 @data_access_committee_router.post(
@@ -75,3 +94,124 @@ async def create_data_access_committees(
         data_access_committee, config=config
     )
     return dac_entity
+
+
+@data_access_committee_router.get(
+    "/data_access_committees",
+    response_model=EntityPage,
+    summary="List DataAccessCommittee records",
+    tags=["Query"],
+)
+async def list_data_access_committees(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(DataAccessCommittee)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of DataAccessCommittee records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        DataAccessCommittee, limit, config, after=after, fields=fields
+    )
+
+
+@data_access_committee_router.post(
+    "/data_access_committees/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of DataAccessCommittee records",
+    tags=["Query"],
+)
+async def get_data_access_committees_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(DataAccessCommittee)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(DataAccessCommittee)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of DataAccessCommittee IDs or accessions, get the DataAccessCommittee records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        DataAccessCommittee,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@data_access_committee_router.get(
+    "/data_access_committees/{data_access_committee_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a DataAccessCommittee",
+    tags=["Query"],
+)
+async def list_data_access_committee_references(
+    data_access_committee_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a DataAccessCommittee ID, get a page of the entities that reference the
+    DataAccessCommittee, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        DataAccessCommittee,
+        data_access_committee_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@data_access_committee_router.get(
+    "/data_access_committees/{data_access_committee_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a DataAccessCommittee",
+    tags=["Query"],
+)
+async def list_data_access_committee_referenced_entities(
+    data_access_committee_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a DataAccessCommittee ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        DataAccessCommittee,
+        data_access_committee_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
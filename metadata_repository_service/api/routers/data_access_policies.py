@@ -14,10 +14,24 @@
 # limitations under the License.
 "Routes for retrieving DataAccessPolicys"
 
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.exceptions import HTTPException
 
-from metadata_repository_service.api.deps import get_config
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
 from metadata_repository_service.creation_models import (
     CreateDataAccessCommittee,
@@ -26,11 +40,14 @@ from metadata_repository_service.creation_models import (
 from metadata_repository_service.dao.data_access_committee import (
     get_data_access_committee_by_accession,
 )
-from metadata_repository_service.dao.data_access_policy import (
-    create_data_access_policy,
-    get_data_access_policy,
-)
+from metadata_repository_service.dao.data_access_policy import create_data_access_policy
 from metadata_repository_service.models import DataAccessPolicy
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 data_access_policy_router = APIRouter()
 
@@ -43,21 +60,24 @@ data_access_policy_router = APIRouter()
 )
 async def get_data_access_policies(
     data_access_policy_id: str,
-    embedded: bool = False,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(DataAccessPolicy)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(DataAccessPolicy)),
     config: Config = Depends(get_config),
 ):
     """
     Given a DataAccessPolicy ID, get the DataAccessPolicy record from the metadata store.
     """
-    data_access_policy = await get_data_access_policy(
-        data_access_policy_id=data_access_policy_id, embedded=embedded, config=config
+    return await get_entity_response(
+        DataAccessPolicy,
+        data_access_policy_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
     )
-    if not data_access_policy:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{DataAccessPolicy.__name__} with id '{data_access_policy_id}' not found",
-        )
-    return data_access_policy
 
 
 @data_access_policy_router.post(
@@ -94,3 +114,124 @@ async def create_data_access_policies(
         )
     dap = await create_data_access_policy(data_access_policy, config=config)
     return dap
+
+
+@data_access_policy_router.get(
+    "/data_access_policies",
+    response_model=EntityPage,
+    summary="List DataAccessPolicy records",
+    tags=["Query"],
+)
+async def list_data_access_policies(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(DataAccessPolicy)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of DataAccessPolicy records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        DataAccessPolicy, limit, config, after=after, fields=fields
+    )
+
+
+@data_access_policy_router.post(
+    "/data_access_policies/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of DataAccessPolicy records",
+    tags=["Query"],
+)
+async def get_data_access_policies_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(DataAccessPolicy)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(DataAccessPolicy)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of DataAccessPolicy IDs or accessions, get the DataAccessPolicy records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        DataAccessPolicy,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@data_access_policy_router.get(
+    "/data_access_policies/{data_access_policy_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a DataAccessPolicy",
+    tags=["Query"],
+)
+async def list_data_access_policy_references(
+    data_access_policy_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a DataAccessPolicy ID, get a page of the entities that reference the
+    DataAccessPolicy, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        DataAccessPolicy,
+        data_access_policy_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@data_access_policy_router.get(
+    "/data_access_policies/{data_access_policy_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a DataAccessPolicy",
+    tags=["Query"],
+)
+async def list_data_access_policy_referenced_entities(
+    data_access_policy_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a DataAccessPolicy ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        DataAccessPolicy,
+        data_access_policy_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
@@ -14,27 +14,39 @@
 # limitations under the License.
 "Routes for retrieving Datasets"
 
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.exceptions import HTTPException
 
-from metadata_repository_service.api.deps import get_config
-from metadata_repository_service.config import Config
-from metadata_repository_service.creation_models import (
-    CreateDataAccessPolicy,
-    CreateDataset,
-    CreateFile,
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
 )
-from metadata_repository_service.dao.data_access_policy import (
-    get_data_access_policy_by_accession,
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
 )
+from metadata_repository_service.config import Config
+from metadata_repository_service.creation_models import CreateDataset
 from metadata_repository_service.dao.dataset import (
     change_dataset_status,
     create_dataset,
-    get_dataset,
     get_dataset_by_accession,
+    lookup_dataset_references,
 )
-from metadata_repository_service.dao.file import get_file_by_accession
 from metadata_repository_service.models import Dataset
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 from metadata_repository_service.patch_models import (
     DatasetStatusPatch,
     ReleaseStatusEnum,
@@ -50,18 +62,23 @@ dataset_router = APIRouter()
     tags=["Query"],
 )
 async def get_datasets(
-    dataset_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    dataset_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Dataset)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Dataset)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Dataset ID, get the Dataset record from the metadata store.
     """
-    dataset = await get_dataset(dataset_id=dataset_id, embedded=embedded, config=config)
-    if not dataset:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Dataset.__name__} with id '{dataset_id}' not found",
-        )
-    return dataset
+    return await get_entity_response(
+        Dataset,
+        dataset_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
 
 
 @dataset_router.post(
@@ -72,37 +89,26 @@ async def create_datasets(dataset: CreateDataset, config: Config = Depends(get_c
     Given a list of File accessions and a DataAccessPolicy accession, create a
     Dataset and write to the metadata store.
     """
-    dap_accession = dataset.has_data_access_policy
-    if isinstance(dap_accession, CreateDataAccessPolicy):
-        dap_accession = dap_accession.alias
-    dap_entity = await get_data_access_policy_by_accession(dap_accession, config=config)
-    if not dap_entity:
+    references = await lookup_dataset_references(dataset, config=config)
+    if not references.data_access_policy:
         raise HTTPException(
             status_code=404,
-            detail=f"DataAccessPolicy Accession {dap_accession} provided in "
+            detail="DataAccessPolicy Accession "
+            + f"{references.data_access_policy_accession} provided in "
             + "'dataset.has_data_access_policy' could not be found. "
             + "Cannot create a Dataset that references a "
             + "non-existing DataAccessPolicy.",
         )
 
-    file_accessions = dataset.has_file
-    nonexistent_file_accessions = []
-    for file_accession in file_accessions:
-        if isinstance(file_accession, CreateFile):
-            file_accession = file_accession.alias
-        file_entity = await get_file_by_accession(file_accession, config=config)
-        if not file_entity:
-            nonexistent_file_accessions.append(file_accession)
-
-    if nonexistent_file_accessions:
+    if references.missing_file_accessions:
         raise HTTPException(
             status_code=404,
-            detail=f"File Accessions {nonexistent_file_accessions} provided in "
+            detail=f"File Accessions {references.missing_file_accessions} provided in "
             + "'dataset.has_file' could not be found. "
             + "Cannot create a Dataset that references a "
             + "non-existing File entity.",
         )
-    new_dataset = await create_dataset(dataset, config=config)
+    new_dataset = await create_dataset(dataset, config=config, references=references)
     return new_dataset
 
 
@@ -141,3 +147,122 @@ async def update_dataset_status(
         dataset_accession, dataset, config=config
     )
     return updated_dataset
+
+
+@dataset_router.get(
+    "/datasets",
+    response_model=EntityPage,
+    summary="List Dataset records",
+    tags=["Query"],
+)
+async def list_datasets(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Dataset)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Dataset records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Dataset, limit, config, after=after, fields=fields
+    )
+
+
+@dataset_router.post(
+    "/datasets/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Dataset records",
+    tags=["Query"],
+)
+async def get_datasets_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Dataset)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Dataset)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Dataset IDs or accessions, get the Dataset records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Dataset,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@dataset_router.get(
+    "/datasets/{dataset_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Dataset",
+    tags=["Query"],
+)
+async def list_dataset_references(
+    dataset_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Dataset ID, get a page of the entities that reference the
+    Dataset, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Dataset,
+        dataset_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@dataset_router.get(
+    "/datasets/{dataset_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Dataset",
+    tags=["Query"],
+)
+async def list_dataset_referenced_entities(
+    dataset_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Dataset ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Dataset,
+        dataset_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving ExperimentProcesses"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.experiment_process import get_experiment_process
 from metadata_repository_service.models import ExperimentProcess
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 experiment_process_router = APIRouter()
 
@@ -33,18 +51,142 @@ experiment_process_router = APIRouter()
 )
 async def get_experiment_processes(
     experiment_process_id: str,
-    embedded: bool = False,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(ExperimentProcess)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(ExperimentProcess)),
     config: Config = Depends(get_config),
 ):
     """
     Given a ExperimentProcess ID, get the ExperimentProcess record from the metadata store.
     """
-    experiment_process = await get_experiment_process(
-        experiment_process_id=experiment_process_id, embedded=embedded, config=config
+    return await get_entity_response(
+        ExperimentProcess,
+        experiment_process_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@experiment_process_router.get(
+    "/experiment_processes",
+    response_model=EntityPage,
+    summary="List ExperimentProcess records",
+    tags=["Query"],
+)
+async def list_experiment_processes(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(ExperimentProcess)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of ExperimentProcess records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        ExperimentProcess, limit, config, after=after, fields=fields
+    )
+
+
+@experiment_process_router.post(
+    "/experiment_processes/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of ExperimentProcess records",
+    tags=["Query"],
+)
+async def get_experiment_processes_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(ExperimentProcess)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(ExperimentProcess)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of ExperimentProcess IDs, get the ExperimentProcess records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        ExperimentProcess,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@experiment_process_router.get(
+    "/experiment_processes/{experiment_process_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a ExperimentProcess",
+    tags=["Query"],
+)
+async def list_experiment_process_references(
+    experiment_process_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a ExperimentProcess ID, get a page of the entities that reference the
+    ExperimentProcess, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        ExperimentProcess,
+        experiment_process_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@experiment_process_router.get(
+    "/experiment_processes/{experiment_process_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a ExperimentProcess",
+    tags=["Query"],
+)
+async def list_experiment_process_referenced_entities(
+    experiment_process_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a ExperimentProcess ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        ExperimentProcess,
+        experiment_process_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not experiment_process:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{ExperimentProcess.__name__} with id '{experiment_process_id}' not found",
-        )
-    return experiment_process
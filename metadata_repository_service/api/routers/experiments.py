@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Experiments"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.experiment import get_experiment
 from metadata_repository_service.models import Experiment
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 experiment_router = APIRouter()
 
@@ -32,17 +50,139 @@ experiment_router = APIRouter()
     tags=["Query"],
 )
 async def get_experiments(
-    experiment_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    experiment_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Experiment)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Experiment)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Experiment ID, get the Experiment record from the metadata store.
     """
-    experiment = await get_experiment(
-        experiment_id=experiment_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Experiment,
+        experiment_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@experiment_router.get(
+    "/experiments",
+    response_model=EntityPage,
+    summary="List Experiment records",
+    tags=["Query"],
+)
+async def list_experiments(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Experiment)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Experiment records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Experiment, limit, config, after=after, fields=fields
+    )
+
+
+@experiment_router.post(
+    "/experiments/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Experiment records",
+    tags=["Query"],
+)
+async def get_experiments_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Experiment)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Experiment)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Experiment IDs or accessions, get the Experiment records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Experiment,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@experiment_router.get(
+    "/experiments/{experiment_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Experiment",
+    tags=["Query"],
+)
+async def list_experiment_references(
+    experiment_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Experiment ID, get a page of the entities that reference the
+    Experiment, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Experiment,
+        experiment_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@experiment_router.get(
+    "/experiments/{experiment_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Experiment",
+    tags=["Query"],
+)
+async def list_experiment_referenced_entities(
+    experiment_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Experiment ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Experiment,
+        experiment_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not experiment:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Experiment.__name__} with id '{experiment_id}' not found",
-        )
-    return experiment
@@ -0,0 +1,108 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Routes for exporting records as newline-delimited JSON
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
+
+from metadata_repository_service.api.deps import get_config
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao.export import export_collection, export_dataset
+from metadata_repository_service.models import Dataset
+
+export_router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+COMPRESSION_QUERY = Query(
+    None,
+    description="Compress the response with 'gzip', or with 'zstd' if the "
+    + "service is installed with the zstd extra.",
+)
+
+
+def _ndjson_response(chunks, compression: Optional[str]) -> StreamingResponse:
+    """Stream NDJSON chunks, declaring the compression as content encoding"""
+    headers = {"Content-Encoding": compression} if compression else None
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+@export_router.get(
+    "/export/{collection_name}",
+    response_class=StreamingResponse,
+    summary="Export all records of a collection",
+    tags=["Export"],
+)
+async def export_collections(
+    collection_name: str,
+    embedded: bool = False,
+    compression: Optional[str] = COMPRESSION_QUERY,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a collection name, stream all records of the collection from the
+    metadata store as newline-delimited JSON.
+    """
+    try:
+        chunks = await export_collection(
+            collection_name=collection_name,
+            embedded=embedded,
+            compression=compression,
+            config=config,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    return _ndjson_response(chunks, compression)
+
+
+@export_router.get(
+    "/datasets/{dataset_id}/export",
+    response_class=StreamingResponse,
+    summary="Export a Dataset with the records it references",
+    tags=["Export"],
+)
+async def export_datasets(
+    dataset_id: str,
+    embedded: bool = False,
+    compression: Optional[str] = COMPRESSION_QUERY,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Dataset ID, stream the Dataset followed by the records it references
+    from the metadata store as newline-delimited JSON. Each line holds the name
+    of the collection and the record. With embedding, the Dataset and the records
+    it references directly are exported with their references embedded, and the
+    records further down are only found embedded in these.
+    """
+    try:
+        chunks = await export_dataset(
+            dataset_id=dataset_id,
+            embedded=embedded,
+            compression=compression,
+            config=config,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    if chunks is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"{Dataset.__name__} with id '{dataset_id}' not found",
+        )
+    return _ndjson_response(chunks, compression)
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Files"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.file import get_file
 from metadata_repository_service.models import File
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 file_router = APIRouter()
 
@@ -29,15 +47,137 @@ file_router = APIRouter()
     "/files/{file_id}", response_model=File, summary="Get a File", tags=["Query"]
 )
 async def get_files(
-    file_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    file_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(File)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(File)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a File ID, get the File record from the metadata store.
     """
-    file = await get_file(file_id=file_id, embedded=embedded, config=config)
-    if not file:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{File.__name__} with id '{file_id}' not found",
-        )
-    return file
+    return await get_entity_response(
+        File,
+        file_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@file_router.get(
+    "/files",
+    response_model=EntityPage,
+    summary="List File records",
+    tags=["Query"],
+)
+async def list_files(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(File)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of File records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(File, limit, config, after=after, fields=fields)
+
+
+@file_router.post(
+    "/files/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of File records",
+    tags=["Query"],
+)
+async def get_files_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(File)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(File)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of File IDs or accessions, get the File records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        File,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@file_router.get(
+    "/files/{file_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a File",
+    tags=["Query"],
+)
+async def list_file_references(
+    file_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a File ID, get a page of the entities that reference the
+    File, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        File,
+        file_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@file_router.get(
+    "/files/{file_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a File",
+    tags=["Query"],
+)
+async def list_file_referenced_entities(
+    file_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a File ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        File,
+        file_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Individuals"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.individual import get_individual
 from metadata_repository_service.models import Individual
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 individual_router = APIRouter()
 
@@ -32,17 +50,139 @@ individual_router = APIRouter()
     tags=["Query"],
 )
 async def get_individuals(
-    individual_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    individual_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Individual)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Individual)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Individual ID, get the Individual record from the metadata store.
     """
-    individual = await get_individual(
-        individual_id=individual_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Individual,
+        individual_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@individual_router.get(
+    "/individuals",
+    response_model=EntityPage,
+    summary="List Individual records",
+    tags=["Query"],
+)
+async def list_individuals(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Individual)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Individual records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Individual, limit, config, after=after, fields=fields
+    )
+
+
+@individual_router.post(
+    "/individuals/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Individual records",
+    tags=["Query"],
+)
+async def get_individuals_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Individual)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Individual)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Individual IDs or accessions, get the Individual records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Individual,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@individual_router.get(
+    "/individuals/{individual_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Individual",
+    tags=["Query"],
+)
+async def list_individual_references(
+    individual_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Individual ID, get a page of the entities that reference the
+    Individual, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Individual,
+        individual_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@individual_router.get(
+    "/individuals/{individual_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Individual",
+    tags=["Query"],
+)
+async def list_individual_referenced_entities(
+    individual_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Individual ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Individual,
+        individual_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not individual:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Individual.__name__} with id '{individual_id}' not found",
-        )
-    return individual
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Members"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.member import get_member
 from metadata_repository_service.models import Member
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 member_router = APIRouter()
 
@@ -32,15 +50,137 @@ member_router = APIRouter()
     tags=["Query"],
 )
 async def get_members(
-    member_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    member_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Member)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Member)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Member ID, get the Member record from the metadata store.
     """
-    member = await get_member(member_id=member_id, embedded=embedded, config=config)
-    if not member:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Member.__name__} with id '{member_id}' not found",
-        )
-    return member
+    return await get_entity_response(
+        Member,
+        member_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@member_router.get(
+    "/members",
+    response_model=EntityPage,
+    summary="List Member records",
+    tags=["Query"],
+)
+async def list_members(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Member)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Member records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(Member, limit, config, after=after, fields=fields)
+
+
+@member_router.post(
+    "/members/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Member records",
+    tags=["Query"],
+)
+async def get_members_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Member)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Member)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Member IDs, get the Member records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Member,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@member_router.get(
+    "/members/{member_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Member",
+    tags=["Query"],
+)
+async def list_member_references(
+    member_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Member ID, get a page of the entities that reference the
+    Member, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Member,
+        member_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@member_router.get(
+    "/members/{member_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Member",
+    tags=["Query"],
+)
+async def list_member_referenced_entities(
+    member_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Member ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Member,
+        member_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Projects"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.project import get_project
 from metadata_repository_service.models import Project
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 project_router = APIRouter()
 
@@ -32,15 +50,139 @@ project_router = APIRouter()
     tags=["Query"],
 )
 async def get_projects(
-    project_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    project_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Project)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Project)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Project ID, get the Project record from the metadata store.
     """
-    project = await get_project(project_id=project_id, embedded=embedded, config=config)
-    if not project:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Project.__name__} with id '{project_id}' not found",
-        )
-    return project
+    return await get_entity_response(
+        Project,
+        project_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@project_router.get(
+    "/projects",
+    response_model=EntityPage,
+    summary="List Project records",
+    tags=["Query"],
+)
+async def list_projects(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Project)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Project records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Project, limit, config, after=after, fields=fields
+    )
+
+
+@project_router.post(
+    "/projects/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Project records",
+    tags=["Query"],
+)
+async def get_projects_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Project)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Project)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Project IDs or accessions, get the Project records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Project,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@project_router.get(
+    "/projects/{project_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Project",
+    tags=["Query"],
+)
+async def list_project_references(
+    project_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Project ID, get a page of the entities that reference the
+    Project, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Project,
+        project_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@project_router.get(
+    "/projects/{project_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Project",
+    tags=["Query"],
+)
+async def list_project_referenced_entities(
+    project_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Project ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Project,
+        project_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Protocols"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.protocol import get_protocol
 from metadata_repository_service.models import Protocol, TaggedProtocol
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 protocol_router = APIRouter()
 
@@ -32,17 +50,139 @@ protocol_router = APIRouter()
     tags=["Query"],
 )
 async def get_protocols(
-    protocol_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    protocol_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Protocol)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Protocol)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Protocol ID, get the Protocol record from the metadata store.
     """
-    protocol = await get_protocol(
-        protocol_id=protocol_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Protocol,
+        protocol_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@protocol_router.get(
+    "/protocols",
+    response_model=EntityPage,
+    summary="List Protocol records",
+    tags=["Query"],
+)
+async def list_protocols(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Protocol)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Protocol records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Protocol, limit, config, after=after, fields=fields
+    )
+
+
+@protocol_router.post(
+    "/protocols/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Protocol records",
+    tags=["Query"],
+)
+async def get_protocols_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Protocol)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Protocol)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Protocol IDs, get the Protocol records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Protocol,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@protocol_router.get(
+    "/protocols/{protocol_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Protocol",
+    tags=["Query"],
+)
+async def list_protocol_references(
+    protocol_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Protocol ID, get a page of the entities that reference the
+    Protocol, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Protocol,
+        protocol_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@protocol_router.get(
+    "/protocols/{protocol_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Protocol",
+    tags=["Query"],
+)
+async def list_protocol_referenced_entities(
+    protocol_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Protocol ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Protocol,
+        protocol_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not protocol:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Protocol.__name__} with id '{protocol_id}' not found",
-        )
-    return protocol
@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Publications"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.publication import get_publication
 from metadata_repository_service.models import Publication
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 publication_router = APIRouter()
 
@@ -32,17 +50,139 @@ publication_router = APIRouter()
     tags=["Query"],
 )
 async def get_publications(
-    publication_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    publication_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Publication)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Publication)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Publication ID, get the Publication record from the metadata store.
     """
-    publication = await get_publication(
-        publication_id=publication_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Publication,
+        publication_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@publication_router.get(
+    "/publications",
+    response_model=EntityPage,
+    summary="List Publication records",
+    tags=["Query"],
+)
+async def list_publications(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Publication)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Publication records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Publication, limit, config, after=after, fields=fields
+    )
+
+
+@publication_router.post(
+    "/publications/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Publication records",
+    tags=["Query"],
+)
+async def get_publications_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Publication)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Publication)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Publication IDs, get the Publication records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Publication,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@publication_router.get(
+    "/publications/{publication_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Publication",
+    tags=["Query"],
+)
+async def list_publication_references(
+    publication_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Publication ID, get a page of the entities that reference the
+    Publication, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Publication,
+        publication_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@publication_router.get(
+    "/publications/{publication_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Publication",
+    tags=["Query"],
+)
+async def list_publication_referenced_entities(
+    publication_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Publication ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Publication,
+        publication_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not publication:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Publication.__name__} with id '{publication_id}' not found",
-        )
-    return publication
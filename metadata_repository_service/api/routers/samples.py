@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Samples"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.sample import get_sample
 from metadata_repository_service.models import Sample
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 sample_router = APIRouter()
 
@@ -32,15 +50,137 @@ sample_router = APIRouter()
     tags=["Query"],
 )
 async def get_samples(
-    sample_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    sample_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Sample)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Sample)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Sample ID, get the Sample record from the metadata store.
     """
-    sample = await get_sample(sample_id=sample_id, embedded=embedded, config=config)
-    if not sample:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Sample.__name__} with id '{sample_id}' not found",
-        )
-    return sample
+    return await get_entity_response(
+        Sample,
+        sample_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@sample_router.get(
+    "/samples",
+    response_model=EntityPage,
+    summary="List Sample records",
+    tags=["Query"],
+)
+async def list_samples(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Sample)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Sample records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(Sample, limit, config, after=after, fields=fields)
+
+
+@sample_router.post(
+    "/samples/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Sample records",
+    tags=["Query"],
+)
+async def get_samples_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Sample)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Sample)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Sample IDs or accessions, get the Sample records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Sample,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@sample_router.get(
+    "/samples/{sample_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Sample",
+    tags=["Query"],
+)
+async def list_sample_references(
+    sample_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Sample ID, get a page of the entities that reference the
+    Sample, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Sample,
+        sample_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@sample_router.get(
+    "/samples/{sample_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Sample",
+    tags=["Query"],
+)
+async def list_sample_referenced_entities(
+    sample_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Sample ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Sample,
+        sample_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
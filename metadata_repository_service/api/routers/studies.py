@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Studies"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.study import get_study
 from metadata_repository_service.models import Study
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 study_router = APIRouter()
 
@@ -29,15 +47,137 @@ study_router = APIRouter()
     "/studies/{study_id}", response_model=Study, summary="Get a Study", tags=["Query"]
 )
 async def get_studies(
-    study_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    study_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Study)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Study)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Study ID, get the Study record from the metadata store.
     """
-    study = await get_study(study_id=study_id, embedded=embedded, config=config)
-    if not study:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Study.__name__} with id '{study_id}' not found",
-        )
-    return study
+    return await get_entity_response(
+        Study,
+        study_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@study_router.get(
+    "/studies",
+    response_model=EntityPage,
+    summary="List Study records",
+    tags=["Query"],
+)
+async def list_studies(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Study)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Study records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(Study, limit, config, after=after, fields=fields)
+
+
+@study_router.post(
+    "/studies/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Study records",
+    tags=["Query"],
+)
+async def get_studies_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Study)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Study)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Study IDs or accessions, get the Study records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Study,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@study_router.get(
+    "/studies/{study_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Study",
+    tags=["Query"],
+)
+async def list_study_references(
+    study_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Study ID, get a page of the entities that reference the
+    Study, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Study,
+        study_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@study_router.get(
+    "/studies/{study_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Study",
+    tags=["Query"],
+)
+async def list_study_referenced_entities(
+    study_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Study ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Study,
+        study_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
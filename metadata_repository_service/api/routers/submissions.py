@@ -14,19 +14,44 @@
 # limitations under the License.
 "Routes to support Submissions"
 
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.exceptions import HTTPException
 
-from metadata_repository_service.api.deps import get_config
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
 from metadata_repository_service.creation_models import CreateSubmission
 from metadata_repository_service.dao.submission import (
+    SUBMISSION_EMBEDDING_DEPTH,
     add_submission,
     get_submission,
     patch_submission,
     update_submission,
 )
+from metadata_repository_service.dao.submission_stream import (
+    ingest_submission_stream,
+    iter_lines,
+)
 from metadata_repository_service.models import Submission
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 from metadata_repository_service.patch_models import SubmissionStatusPatch
 
 submission_router = APIRouter()
@@ -48,7 +73,41 @@ async def create_submission(
             detail="Unexpected error",
         )
 
-    submission = await add_submission(input_submission, config)
+    try:
+        submission = await add_submission(input_submission, config)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    return submission
+
+
+@submission_router.post(
+    "/submissions/stream",
+    summary="Add a submission streamed as NDJSON records to a metadata store",
+    response_model=Submission,
+    tags=["Submission"],
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+            "required": True,
+        }
+    },
+)
+async def create_submission_from_stream(
+    request: Request, config: Config = Depends(get_config)
+):
+    """
+    Add a submission to a metadata store from a stream of newline-delimited JSON
+    records. Each record is an entity of the submission, typed by its schema_type
+    (e.g. CreateFile), that references other entities by alias. An optional
+    record of schema_type CreateSubmission holds the fields of the submission
+    itself. The entities are referenced by ID in the returned submission.
+    """
+    try:
+        submission = await ingest_submission_stream(
+            iter_lines(request.stream()), config
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
     return submission
 
 
@@ -59,21 +118,26 @@ async def create_submission(
     tags=["Query"],
 )
 async def get_submissions(
-    submission_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    submission_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(Submission, default_depth=SUBMISSION_EMBEDDING_DEPTH)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Submission)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Submission ID, get the corresponding Submission record
     from the metadata store.
     """
-    submission = await get_submission(
-        submission_id=submission_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Submission,
+        submission_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
     )
-    if not submission:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Submission.__name__} with id '{submission_id}' not found",
-        )
-    return submission
 
 
 @submission_router.patch(
@@ -129,6 +193,132 @@ async def update_full_submission(
             detail=f"{Submission.__name__} with id '{submission_id}' not found",
         )
 
-    updated_submission = await update_submission(submission, input_submission, config)
+    try:
+        updated_submission = await update_submission(
+            submission, input_submission, config
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
 
     return updated_submission
+
+
+@submission_router.get(
+    "/submissions",
+    response_model=EntityPage,
+    summary="List Submission records",
+    tags=["Query"],
+)
+async def list_submissions(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Submission)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Submission records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Submission, limit, config, after=after, fields=fields
+    )
+
+
+@submission_router.post(
+    "/submissions/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Submission records",
+    tags=["Query"],
+)
+async def get_submissions_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(
+        get_embedding_dependency(Submission, default_depth=SUBMISSION_EMBEDDING_DEPTH)
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Submission)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Submission IDs, get the Submission records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Submission,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@submission_router.get(
+    "/submissions/{submission_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Submission",
+    tags=["Query"],
+)
+async def list_submission_references(
+    submission_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Submission ID, get a page of the entities that reference the
+    Submission, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Submission,
+        submission_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@submission_router.get(
+    "/submissions/{submission_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Submission",
+    tags=["Query"],
+)
+async def list_submission_referenced_entities(
+    submission_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Submission ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Submission,
+        submission_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
+    )
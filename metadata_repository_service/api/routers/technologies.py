@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Studies"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.technology import get_technology
 from metadata_repository_service.models import Technology
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 technology_router = APIRouter()
 
@@ -32,17 +50,139 @@ technology_router = APIRouter()
     tags=["Query"],
 )
 async def get_technologies(
-    technology_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    technology_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Technology)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Technology)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Technology ID, get the Technology record from the metadata store.
     """
-    technology = await get_technology(
-        technology_id=technology_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Technology,
+        technology_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@technology_router.get(
+    "/technologies",
+    response_model=EntityPage,
+    summary="List Technology records",
+    tags=["Query"],
+)
+async def list_technologies(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Technology)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Technology records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Technology, limit, config, after=after, fields=fields
+    )
+
+
+@technology_router.post(
+    "/technologies/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Technology records",
+    tags=["Query"],
+)
+async def get_technologies_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Technology)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Technology)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Technology IDs, get the Technology records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Technology,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@technology_router.get(
+    "/technologies/{technology_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Technology",
+    tags=["Query"],
+)
+async def list_technology_references(
+    technology_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Technology ID, get a page of the entities that reference the
+    Technology, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Technology,
+        technology_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@technology_router.get(
+    "/technologies/{technology_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Technology",
+    tags=["Query"],
+)
+async def list_technology_referenced_entities(
+    technology_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Technology ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Technology,
+        technology_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not technology:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Technology.__name__} with id '{technology_id}' not found",
-        )
-    return technology
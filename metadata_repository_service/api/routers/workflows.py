@@ -14,13 +14,31 @@
 # limitations under the License.
 "Routes for retrieving Workflows"
 
-from fastapi import APIRouter, Depends
-from fastapi.exceptions import HTTPException
+from typing import List, Optional
 
-from metadata_repository_service.api.deps import get_config
+from fastapi import APIRouter, Depends, Query, Request
+
+from metadata_repository_service.api.deps import (
+    EmbeddingParameters,
+    get_config,
+    get_embedding_dependency,
+    get_fields_dependency,
+)
+from metadata_repository_service.api.queries import (
+    get_entity_batch_response,
+    get_entity_list_page,
+    get_entity_response,
+    get_referenced_entity_response,
+    get_referencing_entity_page,
+)
 from metadata_repository_service.config import Config
-from metadata_repository_service.dao.workflow import get_workflow
 from metadata_repository_service.models import Workflow
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchRequest,
+    EntityPage,
+    ReferencePage,
+)
 
 workflow_router = APIRouter()
 
@@ -32,17 +50,139 @@ workflow_router = APIRouter()
     tags=["Query"],
 )
 async def get_workflows(
-    workflow_id: str, embedded: bool = False, config: Config = Depends(get_config)
+    workflow_id: str,
+    request: Request,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Workflow)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Workflow)),
+    config: Config = Depends(get_config),
 ):
     """
     Given a Workflow ID, get the Workflow record from the metadata store.
     """
-    workflow = await get_workflow(
-        workflow_id=workflow_id, embedded=embedded, config=config
+    return await get_entity_response(
+        Workflow,
+        workflow_id,
+        request,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@workflow_router.get(
+    "/workflows",
+    response_model=EntityPage,
+    summary="List Workflow records",
+    tags=["Query"],
+)
+async def list_workflows(
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Workflow)),
+    config: Config = Depends(get_config),
+):
+    """
+    Get a page of Workflow records from the metadata store, restricted to
+    the requested fields.
+    """
+    return await get_entity_list_page(
+        Workflow, limit, config, after=after, fields=fields
+    )
+
+
+@workflow_router.post(
+    "/workflows/batch",
+    response_model=EntityBatch,
+    summary="Get a batch of Workflow records",
+    tags=["Query"],
+)
+async def get_workflows_batch(
+    batch_request: EntityBatchRequest,
+    embedding: EmbeddingParameters = Depends(get_embedding_dependency(Workflow)),
+    fields: Optional[List[str]] = Depends(get_fields_dependency(Workflow)),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a list of Workflow IDs, get the Workflow records from the
+    metadata store, in the order of the request.
+    """
+    return await get_entity_batch_response(
+        Workflow,
+        batch_request.ids,
+        config,
+        embedding=embedding,
+        fields=fields,
+    )
+
+
+@workflow_router.get(
+    "/workflows/{workflow_id}/referenced_by",
+    response_model=ReferencePage,
+    summary="List the references to a Workflow",
+    tags=["Query"],
+)
+async def list_workflow_references(
+    workflow_id: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None, description="The cursor returned with the previous page."
+    ),
+    collection: Optional[str] = Query(
+        None, description="Only list the references from this collection."
+    ),
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Workflow ID, get a page of the entities that reference the
+    Workflow, with the field of the reference.
+    """
+    return await get_referencing_entity_page(
+        Workflow,
+        workflow_id,
+        limit,
+        config,
+        after=after,
+        referencing_collection=collection,
+    )
+
+
+@workflow_router.get(
+    "/workflows/{workflow_id}/references/{field}",
+    response_model=EntityPage,
+    summary="List the entities referenced by a Workflow",
+    tags=["Query"],
+)
+async def list_workflow_referenced_entities(
+    workflow_id: str,
+    field: str,
+    limit: int = Query(
+        100, ge=1, description="Maximum number of records, capped by the service."
+    ),
+    after: Optional[str] = Query(
+        None,
+        description="The cursor returned with the previous page, or with an array "
+        + "of references that was truncated to the embedding budget.",
+    ),
+    embedded: bool = False,
+    config: Config = Depends(get_config),
+):
+    """
+    Given a Workflow ID and the name of a field with an array of references, get
+    a page of the entities referenced in the field, e.g. to walk an array that
+    was truncated to the embedding budget.
+    """
+    return await get_referenced_entity_response(
+        Workflow,
+        workflow_id,
+        field,
+        limit,
+        config,
+        after=after,
+        embedded=embedded,
     )
-    if not workflow:
-        raise HTTPException(
-            status_code=404,
-            detail=f"{Workflow.__name__} with id '{workflow_id}' not found",
-        )
-    return workflow
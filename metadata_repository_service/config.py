@@ -15,8 +15,11 @@
 
 """Config Parameter Modeling and Parsing"""
 
+from typing import List, Literal, Optional
+
 from ghga_service_chassis_lib.api import ApiConfigBase
 from ghga_service_chassis_lib.config import config_from_yaml
+from pydantic import Field
 
 
 @config_from_yaml(prefix="metadata_repository_service")
@@ -29,6 +32,128 @@ class Config(ApiConfigBase):
     # are inherited from PubSubConfigBase;
     db_url: str = "mongodb://localhost:27017"
     db_name: str = "metadata-store"
+    db_max_pool_size: int = Field(
+        100, description="Maximum number of pooled connections to the database."
+    )
+    db_max_idle_time_ms: Optional[int] = Field(
+        None,
+        description="Time in milliseconds after which an idle pooled connection "
+        + "is closed. Idle connections are kept open indefinitely if not set.",
+    )
+    db_server_selection_timeout_ms: int = Field(
+        30000,
+        description="Time in milliseconds to wait for a suitable database server "
+        + "before a database operation fails.",
+    )
+    embedding_aggregation_collections: List[str] = Field(
+        [],
+        description="Collections for which embedded entities are retrieved with a "
+        + "single server-side aggregation pipeline instead of resolving the "
+        + "references level by level in the service.",
+        example=["Dataset", "Submission"],
+    )
+    entity_cache_collections: List[str] = Field(
+        [],
+        description="Collections whose entities are cached in memory by each "
+        + "service process. The cache is disabled if empty.",
+        example=["Dataset", "Study", "File", "Sample"],
+    )
+    entity_cache_max_entries: int = Field(
+        10000,
+        description="Maximum number of entities held by the in-memory cache. "
+        + "The least recently used entities are evicted first.",
+    )
+    entity_cache_max_bytes: int = Field(
+        256 * 1024 * 1024,
+        description="Maximum total size in bytes of the entities held by the "
+        + "in-memory cache, as encoded in BSON. The least recently used entities "
+        + "are evicted first.",
+    )
+    entity_cache_ttl: float = Field(
+        300, description="Time in seconds after which a cached entity expires."
+    )
+    accession_block_size: int = Field(
+        1000,
+        description="Number of accessions that are reserved at once per accession "
+        + "prefix. Reserved accessions that are not used before the service is "
+        + "stopped are skipped.",
+    )
+    ingestion_batch_size: int = Field(
+        1000,
+        description="Maximum number of records that are written to a collection "
+        + "with a single bulk write when storing a Submission.",
+    )
+    ingestion_spill_dir: Optional[str] = Field(
+        None,
+        description="Directory for the temporary alias tables of Submissions that "
+        + "are streamed as NDJSON. Defaults to the temporary directory of the system.",
+    )
+    submission_update_transactions: bool = Field(
+        True,
+        description="Whether the changes of a Submission update are written in a "
+        + "single transaction. Standalone servers, which do not support "
+        + "transactions, write the changes without one.",
+    )
+    create_indexes_on_startup: bool = Field(
+        True,
+        description="Whether to create the missing indexes of the metadata store "
+        + "when the service starts.",
+    )
+    batch_max_ids: int = Field(
+        1000,
+        description="Maximum number of IDs or accessions that can be looked up with "
+        + "a single request to a batch endpoint.",
+    )
+    embedding_max_nodes: int = Field(
+        10000,
+        description="Maximum number of entities embedded for a single request to an "
+        + "entity endpoint. Arrays of references beyond this budget are truncated, "
+        + "with a cursor for paging through the remaining references.",
+    )
+    embedding_max_bytes: int = Field(
+        64 * 1024 * 1024,
+        description="Maximum total size in bytes of the entities embedded for a "
+        + "single request to an entity endpoint, truncating arrays of references "
+        + "in the same way. Entities embedded by aggregation are only bounded by "
+        + "the maximum document size of the database server.",
+    )
+    list_max_page_size: int = Field(
+        1000,
+        description="Maximum number of entities returned with a single page of a "
+        + "list endpoint.",
+    )
+    export_batch_size: int = Field(
+        1000,
+        description="Number of documents that are read from the database, and "
+        + "serialized, at once when exporting records.",
+    )
+    dataset_summary_strategy: Literal["embedding", "aggregation"] = Field(
+        "embedding",
+        description="How Dataset summaries are computed: by embedding the Dataset "
+        + "and counting in the service, or with an aggregation pipeline that only "
+        + "transfers the aggregated numbers from the database.",
+    )
+    change_stream_enabled: bool = Field(
+        False,
+        description="Whether to watch the change stream of the database to keep "
+        + "derived state, like cached entities, consistent with changes made by "
+        + "other processes. Requires the database to run as a replica set, and "
+        + "MongoDB 6.0 to identify updated and deleted documents precisely.",
+    )
+    change_stream_collections: List[str] = Field(
+        [],
+        description="Collections whose changes are watched. All collections except "
+        + "internal ones are watched if empty.",
+        example=["Dataset", "File", "Submission"],
+    )
+    change_stream_consumer: str = Field(
+        "metadata-repository-service",
+        description="Name under which the position in the change stream of the "
+        + "process maintaining derived state in the database, like Dataset "
+        + "summaries, is persisted together with its lease, so that a single "
+        + "process of the service consumes the changes and a restarted service "
+        + "resumes where it stopped.",
+    )
 
 
 CONFIG = Config()
@@ -0,0 +1,201 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Allocation of unique accessions for entities in the metadata store
+"""
+
+import asyncio
+import weakref
+from typing import Dict, Hashable, List, MutableMapping, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.core.utils import get_timestamp
+from metadata_repository_service.dao.db import get_db_client
+
+ACCESSION_TRACKER_COLLECTION = "_accession_tracker_"
+ACCESSION_COUNTER_COLLECTION = "_accession_counters_"
+
+SPECIAL_ACCESSION_PREFIXES = {
+    "DataAccessPolicy": "DAP",
+    "DataAccessCommittee": "DAC",
+}
+
+# accessions have 12 digits
+MAX_ACCESSION_NUMBER = 999_999_999_999
+
+# Reserved accessions that have not been handed out yet, per database and prefix
+_ACCESSION_POOLS: Dict[Hashable, List[str]] = {}
+# Locks of the pools, per event loop since a lock can only be used in one loop
+_ACCESSION_LOCKS: MutableMapping[
+    asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Lock]
+] = weakref.WeakKeyDictionary()
+
+
+def get_accession_prefix(collection_name: str) -> str:
+    """
+    Get the accession prefix of the entities of a collection.
+
+    Args:
+        collection_name: The name of the collection
+
+    Returns:
+        The accession prefix
+
+    """
+    if collection_name in SPECIAL_ACCESSION_PREFIXES:
+        return SPECIAL_ACCESSION_PREFIXES[collection_name]
+    return collection_name[:3].upper()
+
+
+def format_accession(prefix: str, number: int) -> str:
+    """
+    Format an accession from its prefix and number.
+
+    Args:
+        prefix: The accession prefix
+        number: The accession number
+
+    Returns:
+        The accession
+
+    """
+    return f"GHGA:{prefix}{str(number).zfill(12)}"
+
+
+async def _increment_counter(prefix: str, size: int, config: Config) -> int:
+    """Atomically increment the accession counter of a prefix and return it"""
+    client = await get_db_client(config)
+    collection = client[config.db_name][ACCESSION_COUNTER_COLLECTION]
+    try:
+        counter = await collection.find_one_and_update(
+            {"prefix": prefix},
+            {"$inc": {"value": size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # another process created the counter concurrently, so it exists now
+        counter = await collection.find_one_and_update(
+            {"prefix": prefix},
+            {"$inc": {"value": size}},
+            return_document=ReturnDocument.AFTER,
+        )
+    return counter["value"]
+
+
+async def _reserve_block(collection_name: str, size: int, config: Config) -> List[str]:
+    """
+    Reserve a block of consecutive accessions for a collection.
+
+    The block is reserved with a single increment of the counter of the prefix,
+    so no other process is handed out the same numbers. Accessions of the block
+    that have been handed out before, e.g. random accessions from before the
+    counters were introduced, are skipped, so the returned block can be smaller
+    than requested.
+    """
+    prefix = get_accession_prefix(collection_name)
+    end = await _increment_counter(prefix, size, config)
+    if end > MAX_ACCESSION_NUMBER:
+        raise RuntimeError(f"No more accessions available for prefix {prefix}")
+    accessions = [
+        format_accession(prefix, number) for number in range(end - size + 1, end + 1)
+    ]
+
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    # accessions are of fixed width, so a block is a contiguous range
+    query = {"accession": {"$gte": accessions[0], "$lte": accessions[-1]}}
+    projection = {"_id": 0, "accession": 1}
+    used = set()
+    for cname in (collection_name, ACCESSION_TRACKER_COLLECTION):
+        used.update(
+            [doc["accession"] async for doc in database[cname].find(query, projection)]
+        )
+    return [accession for accession in accessions if accession not in used]
+
+
+def _get_lock(pool_id: Hashable) -> asyncio.Lock:
+    """Get the lock of an accession pool for the running event loop"""
+    locks = _ACCESSION_LOCKS.setdefault(asyncio.get_running_loop(), {})
+    if pool_id not in locks:
+        locks[pool_id] = asyncio.Lock()
+    return locks[pool_id]
+
+
+async def generate_accessions(
+    collection_name: str,
+    count: int,
+    config: Config = CONFIG,
+    session: Optional[AsyncIOMotorClientSession] = None,
+) -> List[str]:
+    """
+    Generate unique accessions for entities of a collection.
+
+    Accessions are reserved in blocks of the configured size with a single
+    atomic counter increment, and handed out from an in-process pool. Only the
+    accessions that are handed out are recorded in the accession tracker.
+    Reserved accessions that are never handed out, e.g. because the service
+    is restarted, are skipped.
+
+    Args:
+        collection_name: The name of the collection
+        count: The number of accessions
+        config: Runtime configuration
+        session: The session of the transaction in which the handed out
+            accessions are recorded, if any
+
+    Returns:
+        The new accessions
+
+    """
+    if count < 1:
+        return []
+    pool_id = (config.db_url, config.db_name, get_accession_prefix(collection_name))
+    async with _get_lock(pool_id):
+        pool = _ACCESSION_POOLS.setdefault(pool_id, [])
+        while len(pool) < count:
+            size = max(config.accession_block_size, count - len(pool))
+            pool.extend(await _reserve_block(collection_name, size, config))
+        accessions = pool[:count]
+        del pool[:count]
+
+    client = await get_db_client(config)
+    timestamp = await get_timestamp()
+    await client[config.db_name][ACCESSION_TRACKER_COLLECTION].insert_many(
+        [{"accession": accession, "timestamp": timestamp} for accession in accessions],
+        ordered=False,
+        session=session,
+    )
+    return accessions
+
+
+async def generate_accession(collection_name: str, config: Config = CONFIG) -> str:
+    """
+    Generate a unique accession.
+
+    Args:
+        collection_name: The name of the collection
+        config: Runtime configuration
+
+    Returns:
+        A new accession
+
+    """
+    accessions = await generate_accessions(collection_name, 1, config=config)
+    return accessions[0]
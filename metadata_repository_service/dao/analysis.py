@@ -20,82 +20,12 @@ from typing import List
 
 from metadata_repository_service.config import CONFIG, Config
 from metadata_repository_service.dao.db import get_db_client
-from metadata_repository_service.dao.utils import embed_references, get_entity
+from metadata_repository_service.dao.embedding import embed_references_many
 from metadata_repository_service.models import Analysis
 
 COLLECTION_NAME = "Analysis"
 
 
-async def retrieve_analyses(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of Analysis objects from metadata store.
-
-    Args:
-        config: Rumtime configuration
-
-    Returns:
-        A list of Analysis object IDs.
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    analyses = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in analyses]
-
-
-async def get_analysis(
-    analysis_id: str, embedded: bool = False, config: Config = CONFIG
-) -> Analysis:
-    """
-    Given an Analysis ID, get the Analysis object from metadata store.
-
-    Args:
-        analysis_id: The Analysis ID
-        embedded: Whether or not to embed references. ``False``, by default.
-        config: Rumtime configuration
-
-    Returns:
-        The Analysis object
-
-    """
-    analysis = await get_entity(
-        identifier=analysis_id,
-        field="id",
-        collection_name=COLLECTION_NAME,
-        model_class=Analysis,
-        embedded=embedded,
-        config=config,
-    )
-    return analysis
-
-
-async def get_analysis_by_accession(
-    analysis_accession: str, embedded: bool = False, config: Config = CONFIG
-) -> Analysis:
-    """
-    Given an Analysis accession, get the Analysis object from metadata store.
-
-    Args:
-        analysis_accession: The Analysis accession
-        embedded: Whether or not to embed references. ``False``, by default.
-        config: Rumtime configuration
-
-    Returns:
-        The Analysis object
-
-    """
-    analysis_entity = await get_entity(
-        identifier=analysis_accession,
-        field="accession",
-        collection_name=COLLECTION_NAME,
-        model_class=Analysis,
-        embedded=embedded,
-        config=config,
-    )
-    return analysis_entity
-
-
 async def get_analysis_by_linked_files(
     file_id_list: List[str], embedded: bool = False, config: Config = CONFIG
 ) -> List[Analysis]:
@@ -116,8 +46,6 @@ async def get_analysis_by_linked_files(
     collection = client[config.db_name][COLLECTION_NAME]
     entities = await collection.find({"has_file": {"$in": file_id_list}}).to_list(None)
     if entities and embedded:
-        for analysis in entities:
-            analysis = await embed_references(analysis, config=config)
-    client.close()
+        entities = await embed_references_many(entities, config=config)
     analysis_entities = [Analysis(**x) for x in entities]
     return analysis_entities
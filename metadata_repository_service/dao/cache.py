@@ -0,0 +1,240 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-process cache for entities retrieved from the metadata store"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Set, Tuple
+
+import bson
+
+from metadata_repository_service.config import CONFIG, Config
+
+# (collection name, field, identifier, embedded, remaining embedding budget)
+CacheKey = Tuple[str, str, str, bool, Optional[Tuple[int, int]]]
+
+
+def _iter_embedded_ids(value: Any) -> Iterator[str]:
+    """Iterate over the IDs of the documents embedded in a document"""
+    if isinstance(value, dict):
+        items: Iterable[Any] = value.values()
+    elif isinstance(value, list):
+        items = value
+    else:
+        return
+    for item in items:
+        if isinstance(item, dict) and "id" in item:
+            yield item["id"]
+        yield from _iter_embedded_ids(item)
+
+
+def _discard_key(keys_by_id: Dict[Any, Set[CacheKey]], index_key: Any, key: CacheKey):
+    """Remove a cache key from an index of the cache keys"""
+    keys = keys_by_id.get(index_key)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del keys_by_id[index_key]
+
+
+class EntityCache:
+    """
+    A bounded LRU cache with a time-to-live for entity documents, holding at most
+    ``max_entries`` documents of at most ``max_bytes`` bytes in total, as encoded
+    in BSON.
+
+    Entries are keyed by the collection name, the field and identifier that was
+    looked up, whether the references of the entity were embedded, and the budget
+    for embedding them. The cached documents are shared between all readers and
+    must be treated as read-only.
+
+    Each invalidation increments the generation of the cache, so that a document
+    read from the metadata store before an invalidation is not cached after it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        collections: Iterable[str],
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.collections: Set[str] = set(collections)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self.bytes = 0
+        # expiry time, document, size and IDs of the embedded documents per key
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict, int, Set[str]]]" = (
+            OrderedDict()
+        )
+        self._keys_by_document: Dict[Tuple[str, str], Set[CacheKey]] = {}
+        self._keys_by_embedded_id: Dict[str, Set[CacheKey]] = {}
+
+    def is_enabled(self, collection_name: str) -> bool:
+        """Whether entities of the given collection are cached"""
+        return self.max_entries > 0 and collection_name in self.collections
+
+    def get(self, key: CacheKey) -> Optional[Dict]:
+        """
+        Get a cached entity document.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The document, or ``None`` if it is not cached or has expired
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, document, _, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return document
+
+    def put(self, key: CacheKey, document: Dict, generation: Optional[int] = None):
+        """
+        Cache an entity document, evicting the least recently used entries
+        if the cache is full. Documents larger than the cache are not cached.
+
+        Args:
+            key: The cache key
+            document: The entity document
+            generation: The generation of the cache when the document was read
+                from the metadata store. The document is not cached if the cache
+                was invalidated since.
+
+        """
+        if generation is not None and generation != self.generation:
+            return
+        if key in self._entries:
+            self._remove(key)
+        size = len(bson.encode(document))
+        if size > self.max_bytes:
+            return
+        embedded_ids = set(_iter_embedded_ids(document)) if key[3] else set()
+        self._entries[key] = (time.monotonic() + self.ttl, document, size, embedded_ids)
+        self.bytes += size
+        document_key = (key[0], document["id"])
+        self._keys_by_document.setdefault(document_key, set()).add(key)
+        for embedded_id in embedded_ids:
+            self._keys_by_embedded_id.setdefault(embedded_id, set()).add(key)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate(self, collection_name: str, document_ids: Iterable[str]):
+        """
+        Remove all cached entries that contain one of the given documents: the
+        entries of the documents themselves, regardless of the field they were
+        looked up by, and the entries that embed them.
+
+        Args:
+            collection_name: The collection of the changed documents
+            document_ids: The IDs of the changed documents
+
+        """
+        self.generation += 1
+        for document_id in document_ids:
+            keys = {
+                *self._keys_by_document.get((collection_name, document_id), ()),
+                *self._keys_by_embedded_id.get(document_id, ()),
+            }
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_collection(self, collection_name: str):
+        """
+        Remove all cached entries of a collection and all entries with embedded
+        references, since the collections of embedded documents are not tracked.
+
+        Args:
+            collection_name: The name of the collection
+
+        """
+        self.generation += 1
+        for key in [
+            key for key in self._entries if key[0] == collection_name or key[3]
+        ]:
+            self._remove(key)
+
+    def clear(self):
+        """Remove all cached entries"""
+        self.generation += 1
+        self.bytes = 0
+        self._entries.clear()
+        self._keys_by_document.clear()
+        self._keys_by_embedded_id.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit, miss and eviction counters as well as the number and size
+        of the entries"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: CacheKey):
+        """Remove a cached entry"""
+        _, document, size, embedded_ids = self._entries.pop(key)
+        self.bytes -= size
+        _discard_key(self._keys_by_document, (key[0], document["id"]), key)
+        for embedded_id in embedded_ids:
+            _discard_key(self._keys_by_embedded_id, embedded_id, key)
+
+
+# One cache per database, shared by all requests of the process
+_ENTITY_CACHES: Dict[Hashable, EntityCache] = {}
+
+
+def get_entity_cache(config: Config = CONFIG) -> EntityCache:
+    """
+    Get the entity cache for the configured database.
+
+    Args:
+        config: Runtime configuration
+
+    Returns:
+        The entity cache
+
+    """
+    cache_id = (config.db_url, config.db_name)
+    cache = _ENTITY_CACHES.get(cache_id)
+    if cache is None:
+        cache = EntityCache(
+            max_entries=config.entity_cache_max_entries,
+            max_bytes=config.entity_cache_max_bytes,
+            ttl=config.entity_cache_ttl,
+            collections=config.entity_cache_collections,
+        )
+        _ENTITY_CACHES[cache_id] = cache
+    return cache
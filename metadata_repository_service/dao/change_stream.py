@@ -0,0 +1,582 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Watch the change stream of the metadata store and notify listeners about
+changed documents, so that derived state stays consistent across processes.
+
+Derived state held in memory, like cached entities, is maintained by every
+process of the service. Derived state stored in the metadata store, like Dataset
+summaries, is maintained by a single consumer that is elected among the
+processes by a lease on its persisted position in the change stream.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.db import get_db_client
+
+RESUME_TOKEN_COLLECTION = "_change_stream_tokens_"
+
+# Seconds to wait before reopening the change stream after an error
+RETRY_DELAY = 5
+
+# Seconds for which the elected consumer holds its lease without renewing it
+LEASE_DURATION = 30
+
+# The elected consumer persists its position after this many handled changes,
+# or after this many seconds, whichever comes first, renewing its lease
+CHECKPOINT_EVENTS = 100
+CHECKPOINT_INTERVAL = 5
+
+# Milliseconds to wait for a change before the elected consumer checks whether
+# to renew its lease
+MAX_AWAIT_TIME_MS = 1000
+
+
+class ChangeEvent(NamedTuple):
+    """A change of the metadata store, as told to the change listeners"""
+
+    # the type of the change, e.g. "insert", "update", "replace" or "delete";
+    # "invalidate" if any document of the collection, or of the database if the
+    # collection name is ``None``, might have changed
+    operation: str
+    collection_name: Optional[str]
+    # the ID of the changed document, ``None`` if it is not known
+    document_id: Optional[str] = None
+    # the ``_id`` of the changed document, ``None`` if it is not known
+    document_key: Any = None
+
+
+# A listener is called with a change event. Unless the event identifies the changed
+# document by its ID or ``_id``, any document of the collection, or of the database,
+# might have changed.
+ChangeListener = Callable[[ChangeEvent, Config], Awaitable[None]]
+
+# The listeners maintaining state held by each process
+_CHANGE_LISTENERS: List[ChangeListener] = []
+
+# The listeners maintaining state stored in the metadata store
+_PERSISTENT_CHANGE_LISTENERS: List[ChangeListener] = []
+
+# Collections of derived state, whose changes are not watched
+_DERIVED_COLLECTIONS: List[str] = []
+
+# The background tasks per watched database
+_WATCHERS: Dict[Hashable, List["asyncio.Task[None]"]] = {}
+
+
+def register_change_listener(listener: ChangeListener) -> ChangeListener:
+    """
+    Register a listener that is notified about changed documents in every process.
+    Can be used as a decorator.
+
+    Args:
+        listener: The listener
+
+    Returns:
+        The listener
+
+    """
+    if listener not in _CHANGE_LISTENERS:
+        _CHANGE_LISTENERS.append(listener)
+    return listener
+
+
+def register_persistent_change_listener(listener: ChangeListener) -> ChangeListener:
+    """
+    Register a listener that maintains derived state in the metadata store. It is
+    notified about changed documents by the elected consumer only, at least once
+    per change. Can be used as a decorator.
+
+    Args:
+        listener: The listener
+
+    Returns:
+        The listener
+
+    """
+    if listener not in _PERSISTENT_CHANGE_LISTENERS:
+        _PERSISTENT_CHANGE_LISTENERS.append(listener)
+    return listener
+
+
+def unregister_change_listener(listener: ChangeListener):
+    """
+    Stop notifying a listener about changed documents.
+
+    Args:
+        listener: The listener
+
+    """
+    for listeners in (_CHANGE_LISTENERS, _PERSISTENT_CHANGE_LISTENERS):
+        if listener in listeners:
+            listeners.remove(listener)
+
+
+def register_derived_collection(collection_name: str):
+    """
+    Exclude a collection of derived state from the watched collections, so that
+    maintaining the derived state does not notify the listeners in turn.
+
+    Args:
+        collection_name: The name of the collection
+
+    """
+    if collection_name not in _DERIVED_COLLECTIONS:
+        _DERIVED_COLLECTIONS.append(collection_name)
+
+
+@register_change_listener
+async def invalidate_entity_cache(event: ChangeEvent, config: Config):
+    """Remove changed documents from the entity cache"""
+    cache = get_entity_cache(config)
+    if event.collection_name is None:
+        cache.clear()
+    elif event.document_id is None:
+        cache.invalidate_collection(event.collection_name)
+    else:
+        cache.invalidate(event.collection_name, [event.document_id])
+
+
+async def _notify_listeners(
+    listeners: List[ChangeListener], event: ChangeEvent, config: Config
+):
+    """Notify listeners about a change"""
+    for listener in listeners:
+        try:
+            await listener(event, config)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception(
+                "Change listener %s failed for %s in collection %s",
+                listener.__name__,
+                event.document_id or event.document_key,
+                event.collection_name,
+            )
+
+
+def get_change_event(change: Dict) -> Optional[ChangeEvent]:
+    """
+    Get the change event to notify the listeners about for an event of a change
+    stream.
+
+    The ID of the changed document is taken from its post-image, included for
+    inserted and replaced documents and, if enabled for the collection, for
+    updated documents, or else from its pre-image, included for updated and
+    deleted documents if enabled for the collection.
+
+    Args:
+        change: The event of the change stream
+
+    Returns:
+        The change event, or ``None`` if the event is not about changed documents
+
+    """
+    operation = change["operationType"]
+    collection_name = change.get("ns", {}).get("coll")
+    if operation in {"insert", "update", "replace", "delete"}:
+        document = (
+            change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+        )
+        return ChangeEvent(
+            operation=operation,
+            collection_name=collection_name,
+            document_id=document.get("id"),
+            document_key=change.get("documentKey", {}).get("_id"),
+        )
+    if operation in {"drop", "rename"}:
+        return ChangeEvent(operation="invalidate", collection_name=collection_name)
+    if operation == "dropDatabase":
+        return ChangeEvent(operation="invalidate", collection_name=None)
+    return None
+
+
+async def _handle_change(listeners: List[ChangeListener], change: Dict, config: Config):
+    """Notify listeners about an event of a change stream"""
+    event = get_change_event(change)
+    if event is not None:
+        await _notify_listeners(listeners, event, config)
+
+
+def _is_watched(collection_name: str, config: Config) -> bool:
+    """Whether the changes of a collection are watched"""
+    if collection_name in _DERIVED_COLLECTIONS:
+        return False
+    if config.change_stream_collections:
+        return collection_name in config.change_stream_collections
+    # internal collections like the accession tracker start with an underscore
+    return not collection_name.startswith("_")
+
+
+def _get_change_stream_pipeline(config: Config) -> List[Dict]:
+    """
+    Get the pipeline that filters the change events of the watched collections,
+    and that strips the pre- and post-images of the changed documents down to
+    their IDs
+    """
+    if config.change_stream_collections:
+        collection_filter: Dict = {
+            "$in": [
+                x
+                for x in config.change_stream_collections
+                if x not in _DERIVED_COLLECTIONS
+            ]
+        }
+    else:
+        collection_filter = {
+            "$not": {"$regex": "^_"},
+            "$nin": list(_DERIVED_COLLECTIONS),
+        }
+    return [
+        {"$match": {"ns.coll": collection_filter}},
+        {
+            "$project": {
+                "operationType": 1,
+                "ns": 1,
+                "documentKey": 1,
+                "fullDocument.id": 1,
+                "fullDocumentBeforeChange.id": 1,
+            }
+        },
+    ]
+
+
+def _open_change_stream(
+    database: AsyncIOMotorDatabase,
+    config: Config,
+    resume_token: Optional[Dict],
+    **kwargs,
+):
+    """Open the change stream of the watched collections after a resume token"""
+    return database.watch(
+        _get_change_stream_pipeline(config),
+        full_document="whenAvailable",
+        full_document_before_change="whenAvailable",
+        resume_after=resume_token,
+        **kwargs,
+    )
+
+
+async def watch_changes(database: AsyncIOMotorDatabase, config: Config = CONFIG):
+    """
+    Tail the change stream of the database and notify the listeners registered
+    with ``register_change_listener`` about every change, until cancelled.
+
+    The stream starts at the current position, as a starting process holds no
+    state derived from earlier changes. An interrupted stream is resumed after the
+    last handled change. If that position is no longer available in the oplog, the
+    listeners are told that any document might have changed.
+
+    Args:
+        database: The database to watch
+        config: Runtime configuration
+
+    """
+    resume_token = None
+    while True:
+        try:
+            async with _open_change_stream(database, config, resume_token) as stream:
+                async for change in stream:
+                    await _handle_change(_CHANGE_LISTENERS, change, config)
+                    resume_token = stream.resume_token
+                    if change["operationType"] == "invalidate":
+                        # the stream cannot be resumed after an invalidate event
+                        resume_token = None
+                        break
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as error:
+            if resume_token is None:
+                logging.exception("Change stream failed")
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            logging.warning(
+                "Cannot resume change stream, all derived state is discarded: %s",
+                error,
+            )
+            resume_token = None
+            await _notify_listeners(
+                _CHANGE_LISTENERS, ChangeEvent("invalidate", None), config
+            )
+        except PyMongoError:
+            logging.exception("Change stream interrupted")
+            await asyncio.sleep(RETRY_DELAY)
+
+
+class _ConsumerState:
+    """The position of the elected consumer in the change stream"""
+
+    def __init__(self, owner: str, resume_token: Optional[Dict]):
+        self.owner = owner
+        self.resume_token = resume_token
+
+
+async def _create_consumer_index(database: AsyncIOMotorDatabase) -> bool:
+    """
+    Create the unique index on the names of the consumers, unless it exists,
+    returning whether it exists. The election of the consumer relies on it, so
+    that competing processes cannot insert a document for the same consumer.
+    """
+    try:
+        await database[RESUME_TOKEN_COLLECTION].create_index("consumer", unique=True)
+    except PyMongoError:
+        logging.exception("Cannot create the index of the change stream consumers")
+        return False
+    return True
+
+
+async def _acquire_lease(
+    database: AsyncIOMotorDatabase, owner: str, config: Config
+) -> Optional[Dict]:
+    """
+    Acquire or renew the lease of the configured consumer, unless another owner
+    holds it, returning the persisted position of the consumer
+    """
+    now = time.time()
+    try:
+        return await database[RESUME_TOKEN_COLLECTION].find_one_and_update(
+            {
+                "consumer": config.change_stream_consumer,
+                "$or": [
+                    {"owner": owner},
+                    {"owner": None},
+                    {"lease_expires": {"$lt": now}},
+                ],
+            },
+            {"$set": {"owner": owner, "lease_expires": now + LEASE_DURATION}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # the document of the consumer exists and another owner holds the lease
+        return None
+
+
+async def _save_position(
+    database: AsyncIOMotorDatabase,
+    state: _ConsumerState,
+    config: Config,
+    release: bool = False,
+) -> bool:
+    """
+    Persist the position of the consumer and renew, or release, its lease,
+    returning whether the lease was still held
+    """
+    lease: Dict[str, Any] = (
+        {"owner": None, "lease_expires": None}
+        if release
+        else {"lease_expires": time.time() + LEASE_DURATION}
+    )
+    result = await database[RESUME_TOKEN_COLLECTION].update_one(
+        {"consumer": config.change_stream_consumer, "owner": state.owner},
+        {"$set": {"resume_token": state.resume_token, **lease}},
+    )
+    return result.matched_count > 0
+
+
+async def _tail_leased_changes(
+    database: AsyncIOMotorDatabase, stream: Any, state: _ConsumerState, config: Config
+) -> bool:
+    """
+    Notify the persistent listeners about the changes of an open change stream,
+    persisting the position in batches, until the stream is invalidated or the lease
+    is lost, returning whether the lease is still held
+    """
+    pending = 0
+    checkpoint_at = time.monotonic() + CHECKPOINT_INTERVAL
+    while True:
+        change = await stream.try_next()
+        invalidated = False
+        if change is not None:
+            await _handle_change(_PERSISTENT_CHANGE_LISTENERS, change, config)
+            pending += 1
+            # the stream cannot be resumed after an invalidate event
+            invalidated = change["operationType"] == "invalidate"
+        if invalidated:
+            state.resume_token = None
+        elif stream.resume_token is not None:
+            state.resume_token = stream.resume_token
+        if (
+            invalidated
+            or pending >= CHECKPOINT_EVENTS
+            or (time.monotonic() >= checkpoint_at)
+        ):
+            if not await _save_position(database, state, config):
+                return False
+            pending = 0
+            checkpoint_at = time.monotonic() + CHECKPOINT_INTERVAL
+        if invalidated:
+            return True
+
+
+async def _consume_leased_changes(
+    database: AsyncIOMotorDatabase, state: _ConsumerState, config: Config
+):
+    """
+    Notify the persistent listeners about the changes after the persisted position,
+    while the lease is held
+    """
+    while True:
+        try:
+            async with _open_change_stream(
+                database,
+                config,
+                state.resume_token,
+                max_await_time_ms=MAX_AWAIT_TIME_MS,
+            ) as stream:
+                if not await _tail_leased_changes(database, stream, state, config):
+                    logging.warning("Lost the lease of the change stream")
+                    return
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as error:
+            if state.resume_token is None:
+                logging.exception("Change stream failed")
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            logging.warning(
+                "Cannot resume change stream, all derived state is recomputed: %s",
+                error,
+            )
+            state.resume_token = None
+            if not await _save_position(database, state, config):
+                return
+            await _notify_listeners(
+                _PERSISTENT_CHANGE_LISTENERS, ChangeEvent("invalidate", None), config
+            )
+        except PyMongoError:
+            logging.exception("Change stream interrupted")
+            await asyncio.sleep(RETRY_DELAY)
+
+
+async def consume_changes(
+    database: AsyncIOMotorDatabase,
+    config: Config = CONFIG,
+    owner: Optional[str] = None,
+):
+    """
+    Compete for the lease of the configured consumer and, while holding it, tail
+    the change stream of the database and notify the listeners registered with
+    ``register_persistent_change_listener`` about every change, until cancelled.
+
+    The lease is held on the document of the consumer, whose name is made unique
+    by an index created before the first attempt to acquire the lease, since the
+    index of the registry (see ``dao/indexes.py``) might not have been created.
+
+    The position of the consumer is persisted under its name periodically and when
+    the lease is released, so that the next holder of the lease, e.g. a restarted
+    process, resumes where it stopped. Changes since the last persisted position
+    are handled again. If that position is no longer available in the oplog, the
+    listeners are told that any document might have changed.
+
+    Args:
+        database: The database to watch
+        config: Runtime configuration
+        owner: The name of the competing process, unique by default
+
+    """
+    if owner is None:
+        owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    while not await _create_consumer_index(database):
+        await asyncio.sleep(RETRY_DELAY)
+    state: Optional[_ConsumerState] = None
+    try:
+        while True:
+            try:
+                lease = await _acquire_lease(database, owner, config)
+            except PyMongoError:
+                logging.exception("Cannot acquire the lease of the change stream")
+                lease = None
+            if lease is None:
+                await asyncio.sleep(LEASE_DURATION / 2)
+                continue
+            state = _ConsumerState(owner, lease.get("resume_token"))
+            await _consume_leased_changes(database, state, config)
+            state = None
+    finally:
+        if state is not None:
+            await _save_position(database, state, config, release=True)
+
+
+async def _enable_document_images(database: AsyncIOMotorDatabase, config: Config):
+    """
+    Have the change stream include the pre- and post-images of the changed
+    documents of the watched collections, which requires MongoDB 6.0
+    """
+    for collection_name in await database.list_collection_names():
+        if not _is_watched(collection_name, config):
+            continue
+        try:
+            await database.command(
+                "collMod",
+                collection_name,
+                changeStreamPreAndPostImages={"enabled": True},
+            )
+        except OperationFailure as error:
+            logging.warning(
+                "Cannot enable document images for collection %s: %s",
+                collection_name,
+                error,
+            )
+
+
+async def start_change_stream_watcher(config: Config = CONFIG):
+    """
+    Start watching the change stream of the configured database in background
+    tasks, unless it is already watched: one notifying the listeners of this
+    process, and one competing for the lease of the persistent listeners.
+
+    Args:
+        config: Runtime configuration
+
+    """
+    watcher_id = (config.db_url, config.db_name)
+    watchers = _WATCHERS.get(watcher_id)
+    if watchers and not any(watcher.done() for watcher in watchers):
+        return
+    for watcher in watchers or ():
+        watcher.cancel()
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    await _enable_document_images(database, config)
+    _WATCHERS[watcher_id] = [
+        asyncio.create_task(watch_changes(database, config=config)),
+        asyncio.create_task(consume_changes(database, config=config)),
+    ]
+
+
+async def stop_change_stream_watchers():
+    """
+    Stop all background tasks watching change streams.
+    """
+    watchers = [watcher for tasks in _WATCHERS.values() for watcher in tasks]
+    for watcher in watchers:
+        watcher.cancel()
+    for watcher in watchers:
+        try:
+            await watcher
+        except asyncio.CancelledError:
+            pass
+    _WATCHERS.clear()
@@ -16,7 +16,7 @@
 Convenience methods for retrieving DataAccessCommittee records
 """
 
-from typing import List, Union
+from typing import Union
 
 from metadata_repository_service.config import CONFIG, Config
 from metadata_repository_service.core.utils import generate_uuid, get_timestamp
@@ -24,32 +24,16 @@ from metadata_repository_service.creation_models import (
     CreateDataAccessCommittee,
     CreateMember,
 )
+from metadata_repository_service.dao.accession import generate_accession
 from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.entities import get_entity
 from metadata_repository_service.dao.member import create_member, get_member_by_email
-from metadata_repository_service.dao.utils import generate_accession, get_entity
+from metadata_repository_service.dao.utils import add_references
 from metadata_repository_service.models import DataAccessCommittee
 
 COLLECTION_NAME = "DataAccessCommittee"
 
 
-async def retrieve_data_access_committees(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of DataAccessCommittee object IDs from metadata store.
-
-    Args:
-        config: Rumtime configuration
-
-    Returns:
-        A list of DataAccessCommittee object IDs.
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    data_access_committees = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in data_access_committees]
-
-
 async def get_data_access_committee(
     data_access_committee_id: str, embedded: bool = False, config: Config = CONFIG
 ) -> DataAccessCommittee:
@@ -158,6 +142,6 @@ async def create_data_access_committee(
         dac_entity["main_contact"] = main_contact_member.id
     dac_entity["accession"] = await generate_accession(COLLECTION_NAME, config=config)
     await collection.insert_one(dac_entity)
-    client.close()
+    await add_references({COLLECTION_NAME: [dac_entity]}, config)
     dac = await get_data_access_committee(dac_entity["id"], config=config)
     return dac
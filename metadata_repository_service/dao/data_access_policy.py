@@ -16,39 +16,21 @@
 Convenience methods for retrieving DataAccessPolicy records
 """
 
-from typing import List
-
 from metadata_repository_service.config import CONFIG, Config
 from metadata_repository_service.core.utils import generate_uuid, get_timestamp
 from metadata_repository_service.creation_models import CreateDataAccessPolicy
+from metadata_repository_service.dao.accession import generate_accession
 from metadata_repository_service.dao.data_access_committee import (
     get_data_access_committee_by_accession,
 )
 from metadata_repository_service.dao.db import get_db_client
-from metadata_repository_service.dao.utils import generate_accession, get_entity
+from metadata_repository_service.dao.entities import get_entity
+from metadata_repository_service.dao.utils import add_references
 from metadata_repository_service.models import DataAccessPolicy
 
 COLLECTION_NAME = "DataAccessPolicy"
 
 
-async def retrieve_data_access_policies(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of DataAccessPolicy object IDs from metadata store.
-
-    Args:
-        config: Rumtime configuration
-
-    Returns:
-        A list of DataAccessPolicy object IDs.
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    data_access_policies = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in data_access_policies]
-
-
 async def get_data_access_policy(
     data_access_policy_id: str, embedded: bool = False, config: Config = CONFIG
 ) -> DataAccessPolicy:
@@ -138,6 +120,6 @@ async def create_data_access_policy(
     dap_entity["update_date"] = dap_entity["creation_date"]
     dap_entity["accession"] = await generate_accession(COLLECTION_NAME, config=config)
     await collection.insert_one(dap_entity)
-    client.close()
+    await add_references({COLLECTION_NAME: [dap_entity]}, config)
     dap = await get_data_access_policy(dap_entity["id"], config=config)
     return dap
@@ -16,7 +16,8 @@
 Convenience methods for retrieving Dataset records
 """
 
-from typing import List
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Set
 
 from metadata_repository_service.config import CONFIG, Config
 from metadata_repository_service.core.utils import generate_uuid, get_timestamp
@@ -25,17 +26,18 @@ from metadata_repository_service.creation_models import (
     CreateDataset,
     CreateFile,
 )
+from metadata_repository_service.dao.accession import generate_accession
 from metadata_repository_service.dao.analysis import get_analysis_by_linked_files
+from metadata_repository_service.dao.cache import get_entity_cache
 from metadata_repository_service.dao.data_access_policy import (
     get_data_access_policy_by_accession,
 )
+from metadata_repository_service.dao.dataset_summary import update_dataset_summary
 from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.entities import get_entity
 from metadata_repository_service.dao.experiment import get_experiments_by_linked_files
-from metadata_repository_service.dao.file import get_file_by_accession
-from metadata_repository_service.dao.sample import get_sample
-from metadata_repository_service.dao.study import get_study
-from metadata_repository_service.dao.utils import generate_accession, get_entity
-from metadata_repository_service.models import Dataset
+from metadata_repository_service.dao.utils import add_references
+from metadata_repository_service.models import DataAccessPolicy, Dataset
 from metadata_repository_service.patch_models import (
     DatasetStatusPatch,
     ReleaseStatusEnum,
@@ -46,24 +48,6 @@ from metadata_repository_service.patch_models import (
 COLLECTION_NAME = "Dataset"
 
 
-async def retrieve_datasets(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of Dataset object IDs from metadata store.
-
-    Args:
-        config: Rumtime configuration
-
-    Returns:
-        A list of Dataset object IDs.
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    datasets = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in datasets]
-
-
 async def get_dataset(
     dataset_id: str, embedded: bool = False, config: Config = CONFIG
 ) -> Dataset:
@@ -116,16 +100,97 @@ async def get_dataset_by_accession(
     return dataset
 
 
-async def create_dataset(  # noqa: C901
+class DatasetReferences(NamedTuple):
+    """The entities referenced by a Dataset to be created"""
+
+    data_access_policy_accession: str
+    data_access_policy: Optional[DataAccessPolicy]
+    # the IDs of the Files found, keyed by accession
+    file_ids: Dict[str, str]
+    missing_file_accessions: List[str]
+
+
+def _get_id(reference: Any) -> str:
+    """Get the ID of a reference that may be embedded"""
+    return reference if isinstance(reference, str) else reference.id
+
+
+async def _get_existing_ids(
+    collection_name: str, document_ids: List[str], config: Config = CONFIG
+) -> Set[str]:
+    """Given a list of IDs, get the ones that exist in a collection"""
+    if not document_ids:
+        return set()
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    documents = collection.find({"id": {"$in": document_ids}}, {"_id": 0, "id": 1})
+    return {document["id"] async for document in documents}
+
+
+async def lookup_dataset_references(
     dataset: CreateDataset, config: Config = CONFIG
+) -> DatasetReferences:
+    """
+    Given a Dataset to be created, look up the DataAccessPolicy and all Files it
+    references by accession.
+
+    The DataAccessPolicy and the Files are looked up concurrently, the Files
+    with a single query.
+
+    Args:
+        dataset: The Dataset object
+        config: Rumtime configuration
+
+    Returns:
+        The referenced entities, and the accessions of the Files not found
+
+    """
+    dap_accession = dataset.has_data_access_policy
+    if isinstance(dap_accession, CreateDataAccessPolicy):
+        dap_accession = dap_accession.alias
+    file_accessions = [
+        x.alias if isinstance(x, CreateFile) else x for x in dataset.has_file
+    ]
+
+    async def get_file_ids() -> Dict[str, str]:
+        client = await get_db_client(config)
+        collection = client[config.db_name]["File"]
+        documents = collection.find(
+            {"accession": {"$in": list(set(file_accessions))}},
+            {"_id": 0, "id": 1, "accession": 1},
+        )
+        return {document["accession"]: document["id"] async for document in documents}
+
+    dap_entity, file_ids = await asyncio.gather(
+        get_data_access_policy_by_accession(dap_accession, config=config),
+        get_file_ids(),
+    )
+    return DatasetReferences(
+        data_access_policy_accession=dap_accession,
+        data_access_policy=dap_entity,
+        file_ids=file_ids,
+        missing_file_accessions=[x for x in file_accessions if x not in file_ids],
+    )
+
+
+async def create_dataset(
+    dataset: CreateDataset,
+    config: Config = CONFIG,
+    references: Optional[DatasetReferences] = None,
 ) -> Dataset:
     """
     Given a list of File IDs and a Data Access Policy ID, create a new Dataset object
     and write to the metadata store.
 
+    The Experiments and Analyses linked to the Files are looked up concurrently,
+    followed by the Studies and Samples they reference, so that the number of
+    queries does not depend on the number of Files.
+
     Args:
         dataset: The Dataset object
         config: Rumtime configuration
+        references: The referenced entities, as looked up with
+            ``lookup_dataset_references``. Looked up if not given.
 
     Returns:
         The Dataset object
@@ -133,63 +198,60 @@ async def create_dataset(  # noqa: C901
     """
     client = await get_db_client(config)
     collection = client[config.db_name][COLLECTION_NAME]
-    # Get referenced File entities
-    file_entities = {}
     for file_accession in dataset.has_file:
         if not file_accession:
             raise Exception("Dataset does not have a valid File: " f"{dataset}")
-        if isinstance(file_accession, CreateFile):
-            file_accession = file_accession.alias
-        file_entity = await get_file_by_accession(
-            file_accession=file_accession, config=config
+    if references is None:
+        references = await lookup_dataset_references(dataset, config=config)
+    if references.missing_file_accessions:
+        raise Exception(
+            "Cannot find a File with accession: "
+            f"{references.missing_file_accessions[0]}"
         )
-        if not file_entity:
-            raise Exception(f"Cannot find a File with accession: {file_accession}")
-        file_entities[file_entity.id] = file_entity
-
-    dap_accession = dataset.has_data_access_policy
-    if isinstance(dap_accession, CreateDataAccessPolicy):
-        dap_accession = dap_accession.alias
-    dap_entity = await get_data_access_policy_by_accession(dap_accession, config=config)
+    dap_entity = references.data_access_policy
     if not dap_entity:
         raise Exception(
             "Cannot find a DataAccessPolicy with accession: "
             f"{dataset.has_data_access_policy}"
         )
-    file_entity_id_list = list(file_entities.keys())
+    file_entity_id_list = list(
+        dict.fromkeys(
+            references.file_ids[x.alias if isinstance(x, CreateFile) else x]
+            for x in dataset.has_file
+        )
+    )
 
-    experiment_entities = await get_experiments_by_linked_files(
-        file_id_list=file_entity_id_list, config=config
+    experiment_entities, analysis_entities = await asyncio.gather(
+        get_experiments_by_linked_files(
+            file_id_list=file_entity_id_list, config=config
+        ),
+        get_analysis_by_linked_files(file_id_list=file_entity_id_list, config=config),
     )
 
-    # Get Sample entities that are linked to Experiment entities
-    study_entities = {}
-    sample_entities = {}
-    for experiment in experiment_entities:
-        if isinstance(experiment.has_study, str):
-            study_entity = await get_study(experiment.has_study, config=config)
-        else:
-            study_entity = await get_study(experiment.has_study.id, config=config)
-        study_entities[study_entity.id] = study_entity
-        for sample in experiment.has_sample:
-            if isinstance(sample, str):
-                sample_entity = await get_sample(sample, config=config)
-            else:
-                sample_entity = await get_sample(sample.id, config=config)
-            sample_entities[sample_entity.id] = sample_entity
-
-    # Analysis
-    analysis_entities = await get_analysis_by_linked_files(
-        file_id_list=file_entity_id_list, config=config
+    # Get the Study and Sample entities that are linked to the Experiment and
+    # Analysis entities, in the order in which they are referenced
+    study_ids = [_get_id(x.has_study) for x in experiment_entities]
+    study_ids.extend(_get_id(x.has_study) for x in analysis_entities if x.has_study)
+    sample_ids = [
+        _get_id(sample)
+        for experiment in experiment_entities
+        for sample in experiment.has_sample
+    ]
+    study_ids = list(dict.fromkeys(study_ids))
+    sample_ids = list(dict.fromkeys(sample_ids))
+    existing_study_ids, existing_sample_ids = await asyncio.gather(
+        _get_existing_ids("Study", study_ids, config=config),
+        _get_existing_ids("Sample", sample_ids, config=config),
     )
-    for analysis in analysis_entities:
-        if analysis.has_study:
-            if isinstance(analysis.has_study, str):
-                study_entity = await get_study(analysis.has_study, config=config)
-            else:
-                study_entity = await get_study(analysis.has_study.id, config=config)
-            if study_entity.id not in study_entities:
-                study_entities[study_entity.id] = study_entity
+    for (collection_name, ids, existing_ids) in (
+        ("Study", study_ids, existing_study_ids),
+        ("Sample", sample_ids, existing_sample_ids),
+    ):
+        missing_ids = [x for x in ids if x not in existing_ids]
+        if missing_ids:
+            raise Exception(
+                f"Cannot find a {collection_name} with ID: {missing_ids[0]}"
+            )
 
     # Dataset
     dataset_entity = dataset.dict()
@@ -203,11 +265,13 @@ async def create_dataset(  # noqa: C901
     dataset_entity["has_file"] = file_entity_id_list
     dataset_entity["has_experiment"] = [x.id for x in experiment_entities]
     dataset_entity["has_analysis"] = [x.id for x in analysis_entities]
-    dataset_entity["has_study"] = list(study_entities.keys())
-    dataset_entity["has_sample"] = list(sample_entities.keys())
+    dataset_entity["has_study"] = study_ids
+    dataset_entity["has_sample"] = sample_ids
     dataset_entity["has_data_access_policy"] = dap_entity.id
 
     await collection.insert_one(dataset_entity)
+    await add_references({COLLECTION_NAME: [dataset_entity]}, config)
+    await update_dataset_summary(dataset_entity["id"], config=config)
     new_dataset = await get_dataset(dataset_entity["id"], config=config)
     return new_dataset
 
@@ -245,8 +309,9 @@ async def change_dataset_status(
                 }
             },
         )
+        get_entity_cache(config).invalidate(COLLECTION_NAME, [dataset_entity.id])
+        await update_dataset_summary(dataset_entity.id, config=config)
         updated_dataset = await get_dataset(dataset_entity.id, config=config)
     else:
         updated_dataset = dataset_entity
-    client.close()
     return updated_dataset
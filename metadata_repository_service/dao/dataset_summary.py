@@ -13,15 +13,50 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """
-Convenience methods for retrieving Dataset summary
+Convenience methods for computing, storing and retrieving Dataset summaries
 """
 
+import asyncio
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+import stringcase
+
 from metadata_repository_service.config import CONFIG, Config
-from metadata_repository_service.dao.utils import get_entity
-from metadata_repository_service.models import Dataset
+from metadata_repository_service.dao.change_stream import (
+    ChangeEvent,
+    register_derived_collection,
+    register_persistent_change_listener,
+)
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.entities import get_entity
+from metadata_repository_service.models import (
+    BiologicalSexEnum,
+    Dataset,
+    SequencingProtocol,
+)
+from metadata_repository_service.summary_models import DatasetSummary, Summary
 
 # pylint: disable=too-many-locals, too-many-statements, too-many-branches
 COLLECTION_NAME = "Dataset"
+SUMMARY_COLLECTION_NAME = "DatasetSummary"
+
+# summaries are maintained from the changes of the entities, not the other way round
+register_derived_collection(SUMMARY_COLLECTION_NAME)
+
+# Number of summaries that are computed concurrently when rebuilding
+REBUILD_BATCH_SIZE = 16
+
+# For each collection whose entities contribute to a Dataset summary, the
+# references that lead from an entity of that collection back to a Dataset
+SUMMARY_REFERENCE_PATHS: Dict[str, List[Tuple[str, str]]] = {
+    "Study": [("Dataset", "has_study")],
+    "Experiment": [("Dataset", "has_experiment")],
+    "Sample": [("Dataset", "has_sample")],
+    "File": [("Dataset", "has_file")],
+    "Individual": [("Sample", "has_individual"), ("Dataset", "has_sample")],
+    "Protocol": [("Experiment", "has_protocol"), ("Dataset", "has_experiment")],
+}
 
 
 async def get_dataset_for_summary_object(
@@ -48,3 +83,576 @@ async def get_dataset_for_summary_object(
         config=config,
     )
     return dataset
+
+
+async def compute_dataset_summary(
+    dataset_id: str, config: Config = CONFIG
+) -> Optional[DatasetSummary]:
+    """
+    Given a Dataset ID, compute the Dataset summary, either from the embedded
+    Dataset or with an aggregation pipeline, depending on the configured strategy.
+
+    Args:
+        dataset_id: The Dataset ID
+        config: Rumtime configuration
+
+    Returns:
+        The Dataset summary, or ``None`` if the Dataset does not exist
+
+    """
+    if config.dataset_summary_strategy == "aggregation":
+        return await _compute_dataset_summary_by_aggregation(dataset_id, config=config)
+
+    dataset = await get_dataset_for_summary_object(dataset_id=dataset_id, config=config)
+    if not dataset:
+        return None
+
+    dataset_summary = DatasetSummary()
+
+    dataset_summary.title = dataset.title
+    dataset_summary.ega_accession = dataset.ega_accession
+    dataset_summary.accession = dataset.accession
+    dataset_summary.description = dataset.description
+    dataset_summary.type = dataset.type
+
+    dataset_summary.sample_summary = get_sample_summary(dataset.has_sample)
+    dataset_summary.study_summary = get_study_summary(dataset.has_study)
+    dataset_summary.experiment_summary = get_experiment_summary(dataset.has_experiment)
+    dataset_summary.file_summary = get_file_summary(dataset.has_file)
+
+    return dataset_summary
+
+
+def _count_if(condition: Dict) -> Dict:
+    """Build an accumulator expression that counts the documents matching a condition"""
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+def _size_or_none(field: str) -> Dict:
+    """Build an expression for the length of an array field, or ``None``"""
+    return {"$cond": [{"$isArray": f"${field}"}, {"$size": f"${field}"}, None]}
+
+
+def build_dataset_summary_pipeline(dataset_id: str) -> List[Dict]:
+    """
+    Build an aggregation pipeline that computes the numbers of a Dataset summary
+    in the metadata store, so that only the aggregated numbers are transferred.
+
+    Args:
+        dataset_id: The Dataset ID
+
+    Returns:
+        The list of aggregation stages
+
+    """
+    sample_stats = [
+        {"$project": {"_id": 0, "has_individual": 1, "has_anatomical_entity": 1}},
+        {
+            "$lookup": {
+                "from": "Individual",
+                "localField": "has_individual",
+                "foreignField": "id",
+                "as": "individual",
+                "pipeline": [{"$project": {"_id": 0, "sex": 1}}],
+            }
+        },
+        {"$addFields": {"individual": {"$arrayElemAt": ["$individual", 0]}}},
+        {
+            "$group": {
+                "_id": None,
+                "male": _count_if({"$eq": ["$individual.sex", "male"]}),
+                "female": _count_if({"$eq": ["$individual.sex", "female"]}),
+                "unknown": _count_if({"$eq": ["$individual.sex", "unknown"]}),
+                "individuals": _count_if(
+                    {"$ne": [{"$ifNull": ["$individual", None]}, None]}
+                ),
+            }
+        },
+    ]
+    protocol_stats = [
+        {"$project": {"_id": 0, "has_protocol": 1}},
+        {
+            "$lookup": {
+                "from": "Protocol",
+                "localField": "has_protocol",
+                "foreignField": "id",
+                "as": "protocol",
+                "pipeline": [
+                    {"$match": {"schema_type": SequencingProtocol.__name__}},
+                    {"$project": {"_id": 0, "instrument_model": 1}},
+                ],
+            }
+        },
+        {"$unwind": "$protocol"},
+        {"$group": {"_id": "$protocol.instrument_model", "count": {"$sum": 1}}},
+    ]
+    file_stats = [
+        {
+            "$group": {
+                "_id": "$format",
+                "count": {"$sum": 1},
+                "size": {"$sum": "$size"},
+            }
+        },
+    ]
+    studies = [{"$project": {"_id": 0, "id": 1, "accession": 1, "ega_accession": 1}}]
+    lookups = [
+        ("Sample", "has_sample", "sample_stats", sample_stats),
+        ("Experiment", "has_experiment", "protocol_stats", protocol_stats),
+        ("File", "has_file", "file_stats", file_stats),
+        ("Study", "has_study", "studies", studies),
+    ]
+    stages: List[Dict] = [{"$match": {"id": dataset_id}}, {"$limit": 1}]
+    for referenced_cname, field, lookup_field, pipeline in lookups:
+        stages.append(
+            {
+                "$lookup": {
+                    "from": referenced_cname,
+                    "localField": field,
+                    "foreignField": "id",
+                    "as": lookup_field,
+                    "pipeline": pipeline,
+                }
+            }
+        )
+    stages.append(
+        {
+            "$project": {
+                "_id": 0,
+                "title": 1,
+                "description": 1,
+                "accession": 1,
+                "ega_accession": 1,
+                "type": 1,
+                "has_study": 1,
+                "sample_count": _size_or_none("has_sample"),
+                "experiment_count": _size_or_none("has_experiment"),
+                "file_count": _size_or_none("has_file"),
+                "sample_stats": 1,
+                "protocol_stats": 1,
+                "file_stats": 1,
+                "studies": 1,
+            }
+        }
+    )
+    return stages
+
+
+async def _compute_dataset_summary_by_aggregation(
+    dataset_id: str, config: Config = CONFIG
+) -> Optional[DatasetSummary]:
+    """
+    Given a Dataset ID, compute the Dataset summary with an aggregation pipeline.
+    The result is the same as computing it from the embedded Dataset.
+    """
+    client = await get_db_client(config)
+    collection = client[config.db_name][COLLECTION_NAME]
+    results = await collection.aggregate(
+        build_dataset_summary_pipeline(dataset_id)
+    ).to_list(length=1)
+    if not results:
+        return None
+    result = results[0]
+
+    dataset_summary = DatasetSummary()
+
+    dataset_summary.title = result.get("title")
+    dataset_summary.ega_accession = result.get("ega_accession")
+    dataset_summary.accession = result.get("accession")
+    dataset_summary.description = result.get("description")
+    dataset_summary.type = result.get("type")
+
+    dataset_summary.sample_summary = Summary(count=0, stats={})
+    if result["sample_count"] is not None:
+        sample_stats = (result["sample_stats"] or [{}])[0]
+        dataset_summary.sample_summary.count = result["sample_count"]
+        dataset_summary.sample_summary.stats = {
+            "sex": {
+                "male": sample_stats.get("male", 0),
+                "female": sample_stats.get("female", 0),
+                "unkown": sample_stats.get("unknown", 0),
+            },
+            # the same numbers as get_sample_summary_stats, which counts the
+            # characters of the has_phenotypic_feature field name per Individual
+            # and looks for has_anatomical_entity in the Individual
+            "tissues": 0,
+            "phenotypes": sample_stats.get("individuals", 0)
+            * len("has_phenotypic_feature"),
+        }
+
+    dataset_summary.study_summary = Summary(count=0, stats={})
+    if result.get("has_study") is not None:
+        # restore the order of the referenced Studies
+        studies = {study["id"]: study for study in result["studies"]}
+        ordered_studies = [
+            studies[study_id] for study_id in result["has_study"] if study_id in studies
+        ]
+        dataset_summary.study_summary.count = len(result["has_study"])
+        dataset_summary.study_summary.stats = {
+            "ega_accession": [study.get("ega_accession") for study in ordered_studies],
+            "accession": [study.get("accession") for study in ordered_studies],
+        }
+
+    dataset_summary.experiment_summary = Summary(count=0, stats={})
+    if result["experiment_count"] is not None:
+        dataset_summary.experiment_summary.count = result["experiment_count"]
+        dataset_summary.experiment_summary.stats = {
+            "protocol": Counter(
+                {group["_id"]: group["count"] for group in result["protocol_stats"]}
+            )
+        }
+
+    dataset_summary.file_summary = Summary(count=0, stats={})
+    if result["file_count"] is not None:
+        dataset_summary.file_summary.count = result["file_count"]
+        dataset_summary.file_summary.stats = {
+            "format": Counter(
+                {group["_id"]: group["count"] for group in result["file_stats"]}
+            ),
+            "size": sum(group["size"] for group in result["file_stats"]),
+        }
+
+    return dataset_summary
+
+
+async def update_dataset_summary(
+    dataset_id: str, config: Config = CONFIG
+) -> Optional[DatasetSummary]:
+    """
+    Given a Dataset ID, compute the Dataset summary and store it in the metadata
+    store. The stored summary is removed if the Dataset does not exist.
+
+    Args:
+        dataset_id: The Dataset ID
+        config: Rumtime configuration
+
+    Returns:
+        The Dataset summary, or ``None`` if the Dataset does not exist
+
+    """
+    client = await get_db_client(config)
+    collection = client[config.db_name][SUMMARY_COLLECTION_NAME]
+    dataset_summary = await compute_dataset_summary(dataset_id, config=config)
+    if dataset_summary is None:
+        await collection.delete_one({"id": dataset_id})
+        return None
+    summary_document = dataset_summary.dict()
+    summary_document["id"] = dataset_id
+    await collection.replace_one({"id": dataset_id}, summary_document, upsert=True)
+    return dataset_summary
+
+
+async def get_dataset_summary(
+    dataset_id: str, config: Config = CONFIG
+) -> Optional[DatasetSummary]:
+    """
+    Given a Dataset ID, get the stored Dataset summary from the metadata store.
+    The summary is computed and stored if it does not exist yet.
+
+    Args:
+        dataset_id: The Dataset ID
+        config: Rumtime configuration
+
+    Returns:
+        The Dataset summary, or ``None`` if the Dataset does not exist
+
+    """
+    client = await get_db_client(config)
+    collection = client[config.db_name][SUMMARY_COLLECTION_NAME]
+    summary_document = await collection.find_one({"id": dataset_id}, {"_id": 0})
+    if summary_document is None:
+        return await update_dataset_summary(dataset_id, config=config)
+    return DatasetSummary(**summary_document)
+
+
+async def rebuild_dataset_summaries(config: Config = CONFIG) -> int:
+    """
+    Recompute and store the summaries of all Datasets, and remove the stored
+    summaries of Datasets that no longer exist.
+
+    Args:
+        config: Rumtime configuration
+
+    Returns:
+        The number of stored Dataset summaries
+
+    """
+    client = await get_db_client(config)
+    dataset_ids = [
+        doc["id"]
+        async for doc in client[config.db_name][COLLECTION_NAME].find({}, {"id": 1})
+    ]
+    for start in range(0, len(dataset_ids), REBUILD_BATCH_SIZE):
+        await asyncio.gather(
+            *[
+                update_dataset_summary(dataset_id, config=config)
+                for dataset_id in dataset_ids[start : start + REBUILD_BATCH_SIZE]
+            ]
+        )
+    await client[config.db_name][SUMMARY_COLLECTION_NAME].delete_many(
+        {"id": {"$nin": dataset_ids}}
+    )
+    return len(dataset_ids)
+
+
+async def get_referencing_dataset_ids(
+    collection_name: str, document_ids: Set[str], config: Config = CONFIG
+) -> Set[str]:
+    """
+    Given IDs of documents in a collection, get the IDs of the Datasets whose
+    summaries depend on these documents.
+
+    Args:
+        collection_name: The collection of the documents
+        document_ids: The IDs of the documents
+        config: Rumtime configuration
+
+    Returns:
+        The IDs of the Datasets
+
+    """
+    if collection_name == COLLECTION_NAME:
+        return set(document_ids)
+    if collection_name not in SUMMARY_REFERENCE_PATHS:
+        return set()
+    client = await get_db_client(config)
+    ids = set(document_ids)
+    for referencing_cname, field in SUMMARY_REFERENCE_PATHS[collection_name]:
+        if not ids:
+            break
+        collection = client[config.db_name][referencing_cname]
+        ids = {
+            doc["id"]
+            async for doc in collection.find({field: {"$in": list(ids)}}, {"id": 1})
+        }
+    return ids
+
+
+async def update_referencing_dataset_summaries(
+    collection_name: str, document_ids: Set[str], config: Config = CONFIG
+):
+    """
+    Given IDs of changed documents in a collection, recompute the summaries of
+    all Datasets that depend on these documents.
+
+    Args:
+        collection_name: The collection of the documents
+        document_ids: The IDs of the documents
+        config: Rumtime configuration
+
+    """
+    dataset_ids = await get_referencing_dataset_ids(
+        collection_name, document_ids, config=config
+    )
+    for dataset_id in dataset_ids:
+        await update_dataset_summary(dataset_id, config=config)
+
+
+async def update_submission_dataset_summaries(
+    submission_document: Dict, config: Config = CONFIG
+):
+    """
+    Given a Submission document, recompute the summaries of all Datasets that
+    depend on the entities it references.
+
+    Args:
+        submission_document: The Submission document with unembedded references
+        config: Rumtime configuration
+
+    """
+    dataset_ids: Set[str] = set()
+    for collection_name in SUMMARY_REFERENCE_PATHS:
+        document_ids = submission_document.get(
+            f"has_{stringcase.snakecase(collection_name)}"
+        )
+        if not document_ids:
+            continue
+        if not isinstance(document_ids, list):
+            document_ids = [document_ids]
+        dataset_ids.update(
+            await get_referencing_dataset_ids(
+                collection_name, set(document_ids), config=config
+            )
+        )
+    for dataset_id in dataset_ids:
+        await update_dataset_summary(dataset_id, config=config)
+
+
+@register_persistent_change_listener
+async def update_changed_dataset_summaries(event: ChangeEvent, config: Config):
+    """
+    Recompute the summaries of the Datasets that depend on a changed document.
+
+    Inserted documents are skipped: no stored summary can depend on a new document
+    before a document referencing it is changed, which is an event of its own, and
+    the summaries of new Datasets are computed when they are retrieved first.
+    A changed document without an ID in the event is looked up by its ``_id``,
+    unless it was deleted: the summaries of deleted Datasets are then removed,
+    while the summaries depending on other deleted documents are recomputed along
+    with the documents that referenced them.
+    If any document might have changed, all summaries are recomputed.
+    """
+    if event.operation == "insert":
+        return
+    if event.collection_name is not None and (
+        event.collection_name != COLLECTION_NAME
+        and event.collection_name not in SUMMARY_REFERENCE_PATHS
+    ):
+        return
+    if event.collection_name is None or (
+        event.document_id is None and event.document_key is None
+    ):
+        await rebuild_dataset_summaries(config=config)
+        return
+    document_id = event.document_id
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    if document_id is None and event.operation != "delete":
+        document = await database[event.collection_name].find_one(
+            {"_id": event.document_key}, {"id": 1}
+        )
+        document_id = document["id"] if document else None
+    if document_id is not None:
+        await update_referencing_dataset_summaries(
+            event.collection_name, {document_id}, config=config
+        )
+    elif event.collection_name == COLLECTION_NAME and event.operation == "delete":
+        dataset_ids = [
+            doc["id"]
+            async for doc in database[COLLECTION_NAME].find({}, {"_id": 0, "id": 1})
+        ]
+        await database[SUMMARY_COLLECTION_NAME].delete_many(
+            {"id": {"$nin": dataset_ids}}
+        )
+
+
+def get_sample_summary(sample):
+    """
+    Sample Summary
+
+    Args:
+        sample (Sample): sample
+    """
+    sample_summary = Summary()
+    if sample is None:
+        sample_summary.count = 0
+        sample_summary.stats = {}
+    else:
+
+        count = len(sample)
+        sample_summary.count = count
+        sample_summary.stats = get_sample_summary_stats(sample)
+    return sample_summary
+
+
+# flake8: noqa: C901
+def get_sample_summary_stats(sample):
+    """A method to get sample summary stats
+
+    Args:
+        sample (Sample): sample
+
+    Returns:
+        stats: a dictionary of stats
+    """
+    stats = {}
+    male = 0
+    female = 0
+    unknown = 0
+    tissues = 0
+    phenotypes = []
+    for samp in sample:
+        for ind in samp.has_individual or []:
+            if ind[0] == "sex":
+                if ind[1] == BiologicalSexEnum.male:
+                    male = male + 1
+                if ind[1] == BiologicalSexEnum.female:
+                    female = female + 1
+                if ind[1] == BiologicalSexEnum.unknown:
+                    unknown = unknown + 1
+            if ind[0] == "has_phenotypic_feature":
+                for item in ind[0]:
+                    phenotypes.append(item)
+            if ind[0] == "has_anatomical_entity":
+                if ind[1] is not None:
+                    tissues = tissues + 1
+    sex_count = {"male": male, "female": female, "unkown": unknown}
+    stats = {
+        "sex": sex_count,
+        "tissues": tissues,
+        "phenotypes": len(phenotypes),
+    }
+    return stats
+
+
+def get_study_summary(study):
+    """
+    Study Summary
+
+    Args:
+        study (Study): study
+    """
+
+    study_summary = Summary()
+    if study is None:
+        study_summary.count = 0
+        study_summary.stats = {}
+    else:
+        study_summary.count = len(study)
+        ega_accession_list = []
+        accession_list = []
+        for item in study:
+            ega_accession_list.append(item.ega_accession)
+            accession_list.append(item.accession)
+        study_summary.stats = {
+            "ega_accession": ega_accession_list,
+            "accession": accession_list,
+        }
+    return study_summary
+
+
+def get_experiment_summary(experiment):
+    """
+    Experiment Summary
+
+    Args:
+        experiment (Experiment): experiment
+    """
+
+    experiment_summary = Summary()
+    protocols_list = []
+    if experiment is None:
+        experiment_summary.count = 0
+        experiment_summary.stats = {}
+    else:
+        experiment_summary.count = len(experiment)
+
+        for exp in experiment:
+            for protocol in exp.has_protocol or []:
+                if isinstance(protocol, SequencingProtocol):
+                    protocols_list.append(protocol.instrument_model)
+        experiment_summary.stats = {"protocol": Counter(protocols_list)}
+    return experiment_summary
+
+
+def get_file_summary(file):
+    """
+    File Summary
+
+    Args:
+        file (File): file
+    """
+
+    file_summary = Summary()
+    if file is None:
+        file_summary.count = 0
+        file_summary.stats = {}
+    else:
+        file_summary.count = len(file)
+        file_size = 0
+        file_format_list = []
+        for fil in file:
+            file_format_list.append(fil.format)
+            file_size += fil.size or 0
+        file_summary.stats = {"format": Counter(file_format_list), "size": file_size}
+    return file_summary
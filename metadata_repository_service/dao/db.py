@@ -15,15 +15,78 @@
 
 """Connects to database."""
 
+from typing import Dict
+
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from metadata_repository_service.config import CONFIG, Config
 
+# One pooled client per database URL, shared by all DAO calls of the process
+_DB_CLIENTS: Dict[str, AsyncIOMotorClient] = {}
+# Whether the server of a database URL supports transactions
+_TRANSACTION_SUPPORT: Dict[str, bool] = {}
+
+
+async def connect_db(config: Config = CONFIG) -> AsyncIOMotorClient:
+    """
+    Create the pooled database client for the configured database URL,
+    unless it already exists.
+
+    Args:
+        config: Runtime configuration
+
+    Returns:
+        The shared database client
+
+    """
+    db_client = _DB_CLIENTS.get(config.db_url)
+    if db_client is None:
+        db_client = AsyncIOMotorClient(
+            config.db_url,
+            maxPoolSize=config.db_max_pool_size,
+            maxIdleTimeMS=config.db_max_idle_time_ms,
+            serverSelectionTimeoutMS=config.db_server_selection_timeout_ms,
+        )
+        _DB_CLIENTS[config.db_url] = db_client
+    return db_client
+
+
+async def close_db():
+    """
+    Close all pooled database clients.
+    """
+    for db_client in _DB_CLIENTS.values():
+        db_client.close()
+    _DB_CLIENTS.clear()
+    _TRANSACTION_SUPPORT.clear()
+
 
 async def get_db_client(config: Config = CONFIG) -> AsyncIOMotorClient:
     """
     Get database client.
+
+    The client is shared across the process and must not be closed by the caller.
     """
-    db_url = config.db_url
-    db_client = AsyncIOMotorClient(db_url)
-    return db_client
+    return await connect_db(config)
+
+
+async def supports_transactions(config: Config = CONFIG) -> bool:
+    """
+    Whether the server of the configured database URL supports transactions,
+    i.e. is a replica set member or a sharded cluster router rather than a
+    standalone server. The answer is looked up once per database URL.
+
+    Args:
+        config: Runtime configuration
+
+    Returns:
+        Whether transactions are supported
+
+    """
+    supported = _TRANSACTION_SUPPORT.get(config.db_url)
+    if supported is None:
+        db_client = await get_db_client(config)
+        reply = await db_client.admin.command("isMaster")
+        supported = "setName" in reply or reply.get("msg") == "isdbgrid"
+        _TRANSACTION_SUPPORT[config.db_url] = supported
+    return supported
@@ -0,0 +1,770 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Field selections, and the embedding of referenced documents in place of the
+references of a document, either client-side or with an aggregation pipeline
+"""
+
+# pylint: disable=too-many-arguments
+
+import asyncio
+import copy
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import bson
+from pymongo.errors import OperationFailure
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.utils import (
+    MODEL_CLASSES,
+    embedded_fields,
+    get_model_field_names,
+    get_reference_collection,
+)
+
+# the fields selected from the documents of a collection, keyed by field name:
+# ``None`` selects the whole value of a field, while a nested field selection
+# selects fields of the documents embedded in place of the references of a field
+FieldSelection = Dict[str, Any]
+
+
+class EmbeddingPlan(NamedTuple):
+    """The references to embed in place of the reference fields of a document"""
+
+    # the reference fields to embed, keyed by field name, with the reference fields
+    # to embed in the embedded documents in turn; ``None`` to embed all of them
+    relations: Optional[Dict[str, Any]] = None
+    # the maximum number of levels of references to embed; ``None`` for no limit
+    depth: Optional[int] = None
+
+    def is_complete(self) -> bool:
+        """Whether all references are embedded recursively"""
+        return self.relations is None and self.depth is None
+
+    def follow(self, field: str) -> Optional["EmbeddingPlan"]:
+        """
+        Get the plan for the documents embedded in place of a reference field.
+
+        Args:
+            field: The name of the reference field
+
+        Returns
+            The plan for the embedded documents, or ``None`` if the field is not
+            to be embedded
+
+        """
+        if self.depth == 0 or (
+            self.relations is not None and field not in self.relations
+        ):
+            return None
+        return EmbeddingPlan(
+            relations=None if self.relations is None else self.relations[field],
+            depth=None if self.depth is None else self.depth - 1,
+        )
+
+
+EMBED_ALL = EmbeddingPlan()
+
+
+# the field of an embedded document with the cursors of its truncated reference
+# arrays, keyed by field name
+CONTINUATIONS_FIELD = "_continuations"
+
+
+class EmbeddingBudget:
+    """
+    The number of documents and bytes that may still be embedded while serving a
+    single request.
+
+    References beyond the budget are not embedded: arrays of references are
+    truncated, recording a cursor for the remaining references in the
+    ``CONTINUATIONS_FIELD`` of the document that has the array, while single
+    references are left as IDs.
+    """
+
+    def __init__(self, max_nodes: int, max_bytes: int):
+        self.nodes = max_nodes
+        self.bytes = max_bytes
+        self.exhausted = False
+
+    @classmethod
+    def from_config(cls, config: Config = CONFIG) -> "EmbeddingBudget":
+        """Get the configured budget for a request"""
+        return cls(
+            max_nodes=config.embedding_max_nodes, max_bytes=config.embedding_max_bytes
+        )
+
+    def take_node(self) -> bool:
+        """Reserve a document, returning whether the budget allows it"""
+        if self.nodes <= 0:
+            self.exhausted = True
+            return False
+        self.nodes -= 1
+        return True
+
+    def take_bytes(self, document: Dict) -> bool:
+        """Account for the size of a document, returning whether the budget allows it"""
+        size = len(bson.encode(document))
+        if size > self.bytes:
+            # no further documents are embedded, so that truncated arrays have
+            # all their references up to the cursor embedded
+            self.bytes = 0
+            self.exhausted = True
+            return False
+        self.bytes -= size
+        return True
+
+
+async def _get_references(
+    document_ids: Set[str],
+    collection_name: str,
+    config: Config = CONFIG,
+    projection: Optional[Dict] = None,
+) -> Dict[str, Dict]:
+    """Given a set of document IDs and a collection name, query the metadata store
+    and return the documents.
+
+    Args:
+        document_ids: The IDs of the documents
+        collection_name: The collection in the metadata store that has the documents
+        projection: The projection of the documents, all fields by default
+
+    Returns
+        A dictionary of the documents found, keyed by their ID
+
+    """
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    docs = {}
+    query = {"id": {"$in": list(document_ids)}}
+    async for doc in collection.find(query, projection):
+        docs[doc["id"]] = doc
+    for document_id in document_ids.difference(docs):
+        logging.warning(
+            "Reference with ID %s not found in collection %s",
+            document_id,
+            collection_name,
+        )
+    return docs
+
+
+def _split_paths(items: List[str]) -> List[str]:
+    """Split a list of possibly comma-separated dotted paths into single paths"""
+    return [path.strip() for item in items for path in item.split(",") if path.strip()]
+
+
+def get_embedding_plan(
+    embedded: bool,
+    embed: Optional[List[str]],
+    depth: Optional[int],
+    model_class: Any,
+) -> Optional[EmbeddingPlan]:
+    """
+    Parse the references requested to be embedded in the documents of a model class.
+
+    The reference fields are given as field names of the model class, or as dotted
+    paths for the references of the embedded documents, e.g.
+    ``has_sample.has_biospecimen``. Several comma-separated paths may be given at
+    once. A path implies embedding the reference fields along the path.
+
+    Args:
+        embedded: Whether to embed references
+        embed: The reference fields to embed, all by default
+        depth: The maximum number of levels of references to embed, unlimited by
+            default
+        model_class: The model class of the documents
+
+    Returns
+        The embedding plan, or ``None`` if no references are to be embedded
+
+    Raises:
+        ValueError: If a reference field is unknown or the depth is negative
+
+    """
+    if not embedded and embed is None and depth is None:
+        return None
+    if depth is not None and depth < 0:
+        raise ValueError(f"Invalid depth: {depth}")
+    relations: Optional[Dict[str, Any]] = None
+    if embed is not None:
+        relations = {}
+        for path in _split_paths(embed):
+            _add_relation_path(relations, path.split("."), model_class, path)
+    return EmbeddingPlan(relations=relations, depth=depth)
+
+
+def _add_relation_path(
+    relations: Dict[str, Any], field_names: List[str], model_class: Any, path: str
+):
+    """Add the reference fields along a path of field names to an embedding plan"""
+    field_name, *subfield_names = field_names
+    referenced_cname = get_reference_collection(field_name)
+    if referenced_cname is None or field_name not in get_model_field_names(model_class):
+        raise ValueError(
+            f"Unknown reference field for {model_class.__name__}: '{path}'"
+        )
+    subrelations = relations.setdefault(field_name, {})
+    if subfield_names:
+        _add_relation_path(
+            subrelations, subfield_names, MODEL_CLASSES[referenced_cname], path
+        )
+
+
+def get_field_selection(
+    fields: Optional[List[str]],
+    model_class: Any,
+    embedding: Optional[EmbeddingPlan] = None,
+) -> Optional[FieldSelection]:
+    """
+    Parse the fields requested for the documents of a model class.
+
+    A field is either a field name of the model class, or a dotted path into the
+    documents embedded in place of a reference, e.g. ``has_sample.name``. Several
+    comma-separated fields may be given at once.
+
+    Args:
+        fields: The requested fields
+        model_class: The model class of the documents
+        embedding: The references that are embedded, none by default
+
+    Returns
+        The field selection, or ``None`` if no fields were requested
+
+    Raises:
+        ValueError: If a field is unknown, or a dotted path does not continue
+            into an embedded reference
+
+    """
+    if not fields:
+        return None
+    selection: FieldSelection = {}
+    for path in _split_paths(fields):
+        _add_field_path(selection, path.split("."), model_class, embedding, path)
+    return selection or None
+
+
+def _add_field_path(
+    selection: FieldSelection,
+    field_names: List[str],
+    model_class: Any,
+    embedding: Optional[EmbeddingPlan],
+    path: str,
+):
+    """Add the field at the end of a path of field names to a field selection"""
+    field_name, *subfield_names = field_names
+    if field_name not in get_model_field_names(model_class):
+        raise ValueError(f"Unknown field for {model_class.__name__}: '{path}'")
+    if not subfield_names:
+        selection[field_name] = None
+        return
+    referenced_cname = get_reference_collection(field_name)
+    field_embedding = None if embedding is None else embedding.follow(field_name)
+    if field_embedding is None or referenced_cname is None:
+        raise ValueError(f"Field '{path}' is not a path into an embedded reference")
+    if field_name in selection and selection[field_name] is None:
+        return
+    _add_field_path(
+        selection.setdefault(field_name, {}),
+        subfield_names,
+        MODEL_CLASSES[referenced_cname],
+        field_embedding,
+        path,
+    )
+
+
+def get_projection(selection: Optional[FieldSelection]) -> Optional[Dict]:
+    """Get the projection of the documents for a field selection"""
+    if selection is None:
+        return None
+    return {"id": 1, **{field_name: 1 for field_name in selection}}
+
+
+def select_fields(document: Dict, selection: Optional[FieldSelection]) -> Dict:
+    """
+    Get the ID and the selected fields of a document, in the same way as they
+    would have been retrieved from the metadata store.
+
+    Args:
+        document: The document, with or without embedded references
+        selection: The field selection, ``None`` to select all fields
+
+    Returns
+        A copy of the document with the selected fields, sharing the values
+        that are selected as a whole
+
+    """
+    if selection is None:
+        return document
+    selected = {}
+    for field_name in ("id", *selection):
+        if field_name not in document:
+            continue
+        value = document[field_name]
+        subselection = selection.get(field_name)
+        if subselection is not None:
+            if isinstance(value, dict):
+                value = select_fields(value, subselection)
+            elif isinstance(value, list):
+                value = [
+                    select_fields(x, subselection) if isinstance(x, dict) else x
+                    for x in value
+                ]
+        selected[field_name] = value
+    if CONTINUATIONS_FIELD in document:
+        selected[CONTINUATIONS_FIELD] = document[CONTINUATIONS_FIELD]
+    return selected
+
+
+async def get_embedded_entity_by_aggregation(
+    identifier: str,
+    field: str,
+    collection_name: str,
+    selection: Optional[FieldSelection] = None,
+    embedding: EmbeddingPlan = EMBED_ALL,
+    budget: Optional[EmbeddingBudget] = None,
+    config: Config = CONFIG,
+) -> Optional[Dict]:
+    """
+    Given an identifier, field name and collection name, look up the document and
+    embed its references with a single aggregation pipeline.
+
+    Falls back to ``embed_references`` if the server rejects the pipeline, e.g. if
+    the embedded document exceeds the maximum BSON document size. The embedding
+    budget only applies to the fallback.
+
+    Args:
+        identifier: The identifier
+        field: The name of the field
+        collection_name: The collection in the metadata store that has the document
+        selection: The fields to retrieve, all by default
+        embedding: The references to embed, all by default
+        budget: The budget for embedding references in the fallback
+        config: Rumtime configuration
+
+    Returns
+        The embedded document, or ``None`` if it does not exist
+
+    """
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    projection = get_projection(selection)
+    pipeline = [
+        {"$match": {field: identifier}},
+        {"$limit": 1},
+        *([{"$project": projection}] if projection else []),
+        *build_embedding_pipeline(
+            collection_name, selection=selection, embedding=embedding
+        ),
+    ]
+    try:
+        entities = await collection.aggregate(pipeline).to_list(None)
+    except OperationFailure as error:
+        logging.warning(
+            "Embedding %s with %s %s by aggregation failed, "
+            + "falling back to client-side embedding: %s",
+            collection_name,
+            field,
+            identifier,
+            error,
+        )
+        entity = await collection.find_one({field: identifier}, projection)
+        if entity:
+            entity = await embed_references(
+                entity,
+                config=config,
+                selection=selection,
+                embedding=embedding,
+                budget=budget,
+            )
+        return entity
+    return entities[0] if entities else None
+
+
+def build_embedding_pipeline(
+    collection_name: str,
+    only_top_level: bool = False,
+    selection: Optional[FieldSelection] = None,
+    embedding: EmbeddingPlan = EMBED_ALL,
+) -> List[Dict]:
+    """
+    Build the aggregation stages that embed the referenced documents of a document
+    from the given collection, in the same way as ``embed_references``.
+
+    The reference fields are derived from the model class that corresponds to the
+    collection. Each of them is resolved with a ``$lookup`` stage whose sub-pipeline
+    embeds the references of the referenced collection in turn.
+
+    Args:
+        collection_name: The collection of the documents to embed
+        only_top_level: Whether to only embed the references of the document itself
+        selection: The fields to embed, all by default. Only the references of
+            the selected fields are looked up, and only the selected fields of
+            the referenced documents are retrieved.
+        embedding: The references to embed, all by default
+
+    Returns
+        The list of aggregation stages
+
+    """
+    stages: List[Dict] = []
+    lookup_fields = []
+    for field in _get_model_reference_fields(collection_name):
+        field_embedding = embedding.follow(field)
+        if field_embedding is None or (
+            selection is not None and field not in selection
+        ):
+            continue
+        field_selection = None if selection is None else selection[field]
+        referenced_cname = get_reference_collection(field)
+        lookup_field = f"_embedded_{field}"
+        lookup: Dict[str, Any] = {
+            "from": referenced_cname,
+            "localField": field,
+            "foreignField": "id",
+            "as": lookup_field,
+        }
+        nested_stages = []
+        if field_selection is not None:
+            nested_stages.append({"$project": get_projection(field_selection)})
+        if not only_top_level:
+            nested_stages.extend(
+                build_embedding_pipeline(
+                    referenced_cname,
+                    selection=field_selection,
+                    embedding=field_embedding,
+                )
+            )
+        if nested_stages:
+            lookup["pipeline"] = nested_stages
+
+        # restore the order (and multiplicity) of the references, using ``None``
+        # for references that cannot be resolved
+        embedded_value = {
+            "$switch": {
+                "branches": [
+                    {
+                        "case": {"$isArray": f"${field}"},
+                        "then": {
+                            "$map": {
+                                "input": f"${field}",
+                                "as": "reference",
+                                "in": _match_reference(lookup_field, "$$reference"),
+                            }
+                        },
+                    },
+                    {
+                        "case": {"$eq": [{"$type": f"${field}"}, "string"]},
+                        "then": _match_reference(lookup_field, f"${field}"),
+                    },
+                ],
+                "default": f"${field}",
+            }
+        }
+        stages.append({"$lookup": lookup})
+        stages.append({"$addFields": {field: embedded_value}})
+        lookup_fields.append(lookup_field)
+    if lookup_fields:
+        stages.append({"$project": {x: 0 for x in lookup_fields}})
+    return stages
+
+
+def _match_reference(lookup_field: str, reference: str) -> Dict:
+    """Build the aggregation expression that picks the document with ID
+    ``reference`` from the results of a ``$lookup``, or ``None`` if there is none.
+    """
+    return {
+        "$ifNull": [
+            {
+                "$arrayElemAt": [
+                    {
+                        "$filter": {
+                            "input": f"${lookup_field}",
+                            "cond": {"$eq": ["$$this.id", reference]},
+                        }
+                    },
+                    0,
+                ]
+            },
+            None,
+        ]
+    }
+
+
+def _get_model_reference_fields(collection_name: str) -> List[str]:
+    """Given a collection name, return the embeddable reference fields of the
+    corresponding model class.
+    """
+    model_class = MODEL_CLASSES.get(collection_name)
+    if model_class is None:
+        return []
+    return [x for x in model_class.__fields__ if x in embedded_fields]
+
+
+async def embed_references(
+    document: Dict,
+    config: Config = CONFIG,
+    only_top_level: bool = False,
+    selection: Optional[FieldSelection] = None,
+    embedding: EmbeddingPlan = EMBED_ALL,
+    budget: Optional[EmbeddingBudget] = None,
+) -> Dict:
+    """Given a document and a document type, identify the references in ``document``
+    and query the metadata store. After retrieving the referenced objects,
+    embed them in place of the reference in the parent document.
+
+    Args:
+        document: The document that has one or more references
+
+    Returns
+        The denormalize/embedded document
+
+    """
+    (parent_document,) = await embed_references_many(
+        [document],
+        config=config,
+        only_top_level=only_top_level,
+        selection=selection,
+        embedding=embedding,
+        budget=budget,
+    )
+    return parent_document
+
+
+# a document to embed the references of, with its field selection and embedding plan
+Node = Tuple[Dict, Optional[FieldSelection], EmbeddingPlan]
+
+# the field selection and embedding plan of the documents of a target
+Plan = Tuple[Optional[FieldSelection], EmbeddingPlan]
+
+# a reference field of a document, with the target of its references
+Slot = Tuple[Dict, str, Tuple]
+
+
+async def embed_references_many(
+    documents: List[Dict],
+    config: Config = CONFIG,
+    only_top_level: bool = False,
+    selection: Optional[FieldSelection] = None,
+    embedding: EmbeddingPlan = EMBED_ALL,
+    budget: Optional[EmbeddingBudget] = None,
+) -> List[Dict]:
+    """Given a list of documents, embed the referenced objects in place of the
+    references, in the same way as ``embed_references``.
+
+    References are resolved breadth-first: all references of one depth are
+    collected per target collection and fetched with a single query per collection,
+    the queries for the different collections being run concurrently.
+
+    Each referenced document is fetched and embedded at most once per call: an
+    identity map keyed by collection name and ID hands out the same embedded
+    object for every occurrence of a reference, so graphs with shared entities
+    cost one query result per distinct entity rather than one per reference.
+    The embedded documents must therefore be treated as read-only.
+
+    With a field selection, only the references of the selected fields are
+    resolved, and only the selected fields of the referenced documents are
+    retrieved, so that no query is made for the collections that are not needed.
+    Likewise, an embedding plan restricts the resolved references to the planned
+    reference fields and levels.
+
+    With a budget, references are embedded level by level until the budget is
+    exhausted, the reference fields with fewer references first, so that a huge
+    array of references does not crowd out the others. Arrays of references are
+    truncated where the budget ran out.
+
+    Args:
+        documents: The documents that have one or more references
+        config: Runtime configuration
+        only_top_level: Whether to only embed the references of ``documents``
+            themselves, rather than resolving the references recursively.
+        selection: The fields to embed, all by default
+        embedding: The references to embed, all by default
+        budget: The budget for embedding references, unlimited by default
+
+    Returns
+        The denormalize/embedded documents
+
+    """
+    if only_top_level:
+        embedding = embedding._replace(
+            depth=1 if embedding.depth is None else min(embedding.depth, 1)
+        )
+    parent_documents = copy.deepcopy(documents)
+    identity_map: Dict[Tuple[Tuple, str], Optional[Dict]] = {}
+    level: List[Node] = [
+        (document, selection, embedding) for document in parent_documents
+    ]
+    while level:
+        slots, plans = _get_level_slots(level)
+        if budget is not None:
+            slots.sort(key=lambda slot: len(_get_slot_references(slot)))
+        references = _get_new_references(slots, identity_map, budget)
+        docs_by_target = await _get_target_references(references, plans, config)
+        next_level = _add_referenced_documents(
+            slots, references, docs_by_target, plans, identity_map, budget
+        )
+        for (node, field, target) in slots:
+            _embed_slot_references(node, field, target, identity_map)
+        level = next_level
+    return parent_documents
+
+
+def _get_level_slots(level: List[Node]) -> Tuple[List[Slot], Dict[Tuple, Plan]]:
+    """
+    Get the reference fields to embed in the documents of one level, with the
+    target of their references, and the field selection and embedding plan of the
+    referenced documents per target. The referenced documents are retrieved per
+    target, i.e. per collection, field selection and embedding plan; field
+    selections and planned relations are parts of the same trees and are
+    identified by object identity.
+    """
+    slots: List[Slot] = []
+    plans: Dict[Tuple, Plan] = {}
+    for node, node_selection, node_embedding in level:
+        for field, value in node.items():
+            cname = get_reference_collection(field)
+            if cname is None or (
+                node_selection is not None and field not in node_selection
+            ):
+                continue
+            field_embedding = node_embedding.follow(field)
+            if field_embedding is None or not isinstance(
+                value, (str, list, set, tuple)
+            ):
+                continue
+            field_selection = None if node_selection is None else node_selection[field]
+            target = (
+                cname,
+                id(field_selection),
+                id(field_embedding.relations),
+                field_embedding.depth,
+            )
+            plans[target] = (field_selection, field_embedding)
+            slots.append((node, field, target))
+    return slots, plans
+
+
+def _get_new_references(
+    slots: List[Slot],
+    identity_map: Dict[Tuple[Tuple, str], Optional[Dict]],
+    budget: Optional[EmbeddingBudget],
+) -> Dict[Tuple, Set[str]]:
+    """
+    Get the references of the slots that are not in the identity map yet, keyed
+    by target, taking a node of the budget for each of them until it is exhausted.
+    """
+    references: Dict[Tuple, Set[str]] = {}
+    for slot in slots:
+        target = slot[2]
+        for ref in _get_slot_references(slot):
+            if (target, ref) in identity_map or ref in references.get(target, ()):
+                continue
+            if budget is not None and not budget.take_node():
+                break
+            references.setdefault(target, set()).add(ref)
+    return references
+
+
+async def _get_target_references(
+    references: Dict[Tuple, Set[str]], plans: Dict[Tuple, Plan], config: Config
+) -> Dict[Tuple, Dict[str, Dict]]:
+    """
+    Retrieve the referenced documents with one query per target, the queries
+    being run concurrently, and return them keyed by target and ID.
+    """
+    targets = [target for target, refs in references.items() if refs]
+    results = await asyncio.gather(
+        *[
+            _get_references(
+                references[target],
+                target[0],
+                config=config,
+                projection=get_projection(plans[target][0]),
+            )
+            for target in targets
+        ]
+    )
+    return dict(zip(targets, results))
+
+
+def _add_referenced_documents(
+    slots: List[Slot],
+    references: Dict[Tuple, Set[str]],
+    docs_by_target: Dict[Tuple, Dict[str, Dict]],
+    plans: Dict[Tuple, Plan],
+    identity_map: Dict[Tuple[Tuple, str], Optional[Dict]],
+    budget: Optional[EmbeddingBudget],
+) -> List[Node]:
+    """
+    Add the retrieved documents to the identity map, taking their size from the
+    budget, with ``None`` for the references that cannot be resolved, and return
+    the added documents as the next level to embed the references of.
+    """
+    next_level: List[Node] = []
+    for slot in slots:
+        target = slot[2]
+        docs_by_id = docs_by_target.get(target, {})
+        for ref in _get_slot_references(slot):
+            if (target, ref) in identity_map or ref not in references.get(target, ()):
+                continue
+            referenced_doc = docs_by_id.get(ref)
+            if referenced_doc:
+                if budget is not None and not budget.take_bytes(referenced_doc):
+                    continue
+                # a shallow copy suffices as the references of the copy are
+                # replaced by assigning new values to its fields
+                referenced_doc = dict(referenced_doc)
+                next_level.append((referenced_doc, *plans[target]))
+            identity_map[(target, ref)] = referenced_doc
+    return next_level
+
+
+def _get_slot_references(slot: Slot) -> List[str]:
+    """Get the references in the field of a document"""
+    node, field, _ = slot
+    value = node[field]
+    if isinstance(value, str):
+        return [value]
+    return [ref for ref in value if isinstance(ref, str)]
+
+
+def _embed_slot_references(
+    node: Dict, field: str, target: Tuple, identity_map: Dict[Tuple, Optional[Dict]]
+):
+    """
+    Replace the references in the field of a document with the embedded documents
+    of the identity map. References that were not embedded due to the budget are
+    left as they are if the field has a single reference, or truncate the array
+    of references otherwise.
+    """
+    value = node[field]
+    if isinstance(value, str):
+        if (target, value) in identity_map:
+            node[field] = identity_map[(target, value)]
+        return
+    embedded_docs = []
+    for position, ref in enumerate(value):
+        if not isinstance(ref, str):
+            embedded_docs.append(None)
+        elif (target, ref) in identity_map:
+            embedded_docs.append(identity_map[(target, ref)])
+        else:
+            node.setdefault(CONTINUATIONS_FIELD, {})[field] = str(position)
+            node[field] = embedded_docs
+            return
+    if embedded_docs:
+        node[field] = embedded_docs
@@ -0,0 +1,354 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Look up entities by identifier, in batches and in pages"""
+
+# pylint: disable=too-many-arguments
+
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.embedding import (
+    EmbeddingBudget,
+    EmbeddingPlan,
+    FieldSelection,
+    embed_references,
+    embed_references_many,
+    get_embedded_entity_by_aggregation,
+    get_embedding_plan,
+    get_field_selection,
+    get_projection,
+    select_fields,
+)
+from metadata_repository_service.dao.utils import (
+    ACCESSIONED_ENTITIES,
+    MODEL_CLASSES,
+    build_model,
+)
+from metadata_repository_service.dao.versioning import add_version_fields
+from metadata_repository_service.page_models import (
+    EntityBatch,
+    EntityBatchItem,
+    EntityPage,
+)
+
+
+async def get_entity_document(
+    identifier: str,
+    field: str,
+    collection_name: str,
+    embedded: bool = False,
+    fields: Optional[List[str]] = None,
+    embed: Optional[List[str]] = None,
+    depth: Optional[int] = None,
+    budget: Optional[EmbeddingBudget] = None,
+    config: Config = CONFIG,
+) -> Optional[Dict]:
+    """
+    Given an identifier, field name and collection name, look up the
+    identifier in the provided field of a collection and return the
+    corresponding document as stored, served from the entity cache if enabled.
+
+    If fields are requested, only these fields are retrieved from the metadata
+    store, including the fields of embedded documents given as dotted paths, and
+    only the references needed for them are resolved. Such partial documents are
+    not cached, but are served from a cached full document. Documents with only
+    some of their references embedded are neither cached nor served from the cache,
+    neither are documents that were truncated to the embedding budget. Embedded
+    documents are cached per budget, which is not charged for cached documents. The update
+    date of each document is retrieved in any case, to get the version of the
+    document with ``get_document_version``.
+
+    Args:
+        identifier: The identifier
+        field: The name of the field
+        collection_name: The collection in the metadata store that has the document
+        embedded: Whether or not to embed references. ``False``, by default.
+        fields: The fields to return in addition to ``id``, all by default
+        embed: The reference fields to embed, all by default. Implies ``embedded``.
+        depth: The maximum number of levels of references to embed, unlimited by
+            default. Implies ``embedded``.
+        budget: The budget for embedding references, unlimited by default
+        config: Rumtime configuration
+
+    Returns
+        The document, which must be treated as read-only
+
+    Raises:
+        ValueError: If a field or reference field is unknown
+
+    """
+    model_class = MODEL_CLASSES.get(collection_name)
+    embedding = get_embedding_plan(embedded, embed, depth, model_class)
+    selection = add_version_fields(
+        get_field_selection(fields, model_class, embedding=embedding)
+    )
+    cache = get_entity_cache(config)
+    # a document that was embedded within a budget is only served to requests
+    # with the same budget, for which it is not truncated either
+    cache_key = (
+        collection_name,
+        field,
+        identifier,
+        embedding is not None,
+        None if embedding is None or budget is None else (budget.nodes, budget.bytes),
+    )
+    use_cache = cache.is_enabled(collection_name) and (
+        embedding is None or embedding.is_complete()
+    )
+    entity = cache.get(cache_key) if use_cache else None
+    if entity is not None:
+        return entity if selection is None else select_fields(entity, selection)
+    generation = cache.generation
+    entity = await _get_entity_document(
+        identifier=identifier,
+        field=field,
+        collection_name=collection_name,
+        embedding=embedding,
+        selection=selection,
+        budget=budget,
+        config=config,
+    )
+    if (
+        entity
+        and use_cache
+        and selection is None
+        and not (budget is not None and budget.exhausted)
+    ):
+        cache.put(cache_key, entity, generation=generation)
+    return entity
+
+
+async def get_entity(
+    identifier: str,
+    field: str,
+    collection_name: str,
+    model_class: Any = None,
+    embedded: bool = False,
+    config: Config = CONFIG,
+) -> Any:
+    """
+    Given an identifier, field name and collection name, look up the
+    identifier in the provided field of a collection and return the
+    corresponding document.
+
+    Args:
+        identifier: The identifier
+        field: The name of the field
+        collection_name: The collection in the metadata store that has the document
+        model_class: The model class
+        embedded: Whether or not to embed references. ``False``, by default.
+        config: Rumtime configuration
+
+    Returns
+        The document
+
+    """
+    entity = await get_entity_document(
+        identifier=identifier,
+        field=field,
+        collection_name=collection_name,
+        embedded=embedded,
+        config=config,
+    )
+    if model_class and entity:
+        entity_obj = build_model(model_class, entity)
+    else:
+        entity_obj = entity
+    return entity_obj
+
+
+async def get_entity_page(
+    collection_name: str,
+    model_class: Any,
+    limit: int,
+    after: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    config: Config = CONFIG,
+) -> EntityPage:
+    """
+    Get a page of the documents of a collection, in insertion order, restricted
+    to the given fields.
+
+    The documents are paginated by their ``_id``, so that any page is retrieved
+    with a bounded range scan of the ``_id`` index.
+
+    Args:
+        collection_name: The collection in the metadata store
+        model_class: The model class of the documents, used to validate the fields
+        limit: The maximum number of documents, capped at the configured maximum
+        after: The cursor returned with the previous page
+        fields: The fields to return in addition to ``id``
+        config: Rumtime configuration
+
+    Returns
+        The page of documents
+
+    Raises:
+        ValueError: If the cursor is invalid or a field is unknown
+
+    """
+    query: Dict[str, Any] = {}
+    if after is not None:
+        if not ObjectId.is_valid(after):
+            raise ValueError(f"Invalid cursor: '{after}'")
+        query["_id"] = {"$gt": ObjectId(after)}
+    projection = get_projection(get_field_selection(fields, model_class)) or {"id": 1}
+    limit = max(1, min(limit, config.list_max_page_size))
+
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    # fetch one more document to know whether there is a next page
+    documents = (
+        await collection.find(query, projection)
+        .sort("_id", ASCENDING)
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+    next_cursor = str(documents[limit - 1]["_id"]) if len(documents) > limit else None
+    items = documents[:limit]
+    for item in items:
+        del item["_id"]
+    return EntityPage(items=items, next_cursor=next_cursor)
+
+
+async def get_entity_batch(
+    identifiers: List[str],
+    collection_name: str,
+    model_class: Any,
+    embedded: bool = False,
+    fields: Optional[List[str]] = None,
+    embed: Optional[List[str]] = None,
+    depth: Optional[int] = None,
+    config: Config = CONFIG,
+) -> EntityBatch:
+    """
+    Given a list of IDs or accessions, look up the corresponding documents of a
+    collection with a single query and return them in the order of the identifiers.
+
+    Accessions are only looked up for the collections of ``ACCESSIONED_ENTITIES``,
+    so that the query can be answered from the ``id`` and ``accession`` indexes.
+    References are embedded for the whole batch at once, within one embedding
+    budget: arrays of references beyond the budget are truncated, recording a
+    cursor for the remaining references as for a single entity.
+
+    Args:
+        identifiers: The IDs or accessions
+        collection_name: The collection in the metadata store that has the documents
+        model_class: The model class
+        embedded: Whether or not to embed references. ``False``, by default.
+        fields: The fields to return in addition to ``id``, all by default. If
+            given, the documents are returned as stored, restricted to these fields.
+        embed: The reference fields to embed, all by default. Implies ``embedded``.
+        depth: The maximum number of levels of references to embed, unlimited by
+            default. Implies ``embedded``.
+        config: Rumtime configuration
+
+    Returns
+        The batch of documents as stored in the metadata store, to be rendered as
+        instances of the model class, with a marker for the identifiers not found
+
+    Raises:
+        ValueError: If there are more identifiers than the configured maximum,
+            or a field or reference field is unknown
+
+    """
+    if len(identifiers) > config.batch_max_ids:
+        raise ValueError(
+            f"Too many identifiers: {len(identifiers)}, "
+            + f"the maximum is {config.batch_max_ids}"
+        )
+    embedding = get_embedding_plan(embedded, embed, depth, model_class)
+    selection = get_field_selection(fields, model_class, embedding=embedding)
+    distinct_identifiers = list(dict.fromkeys(identifiers))
+    query: Dict[str, Any] = {"id": {"$in": distinct_identifiers}}
+    if collection_name in ACCESSIONED_ENTITIES:
+        query = {"$or": [query, {"accession": {"$in": distinct_identifiers}}]}
+
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    projection = get_projection(selection)
+    if projection is not None and collection_name in ACCESSIONED_ENTITIES:
+        projection["accession"] = 1
+    documents = await collection.find(query, projection).to_list(None)
+    if embedding is not None and documents:
+        documents = await embed_references_many(
+            documents,
+            config=config,
+            selection=selection,
+            embedding=embedding,
+            budget=EmbeddingBudget.from_config(config),
+        )
+
+    entities_by_identifier = {}
+    for document in documents:
+        entity = {key: value for key, value in document.items() if key != "_id"}
+        entities_by_identifier[document["id"]] = entity
+        if document.get("accession"):
+            entities_by_identifier[document["accession"]] = entity
+    items = []
+    for identifier in identifiers:
+        entity = entities_by_identifier.get(identifier)
+        items.append(
+            EntityBatchItem(
+                identifier=identifier, found=entity is not None, entity=entity
+            )
+        )
+    return EntityBatch(items=items)
+
+
+async def _get_entity_document(
+    identifier: str,
+    field: str,
+    collection_name: str,
+    embedding: Optional[EmbeddingPlan] = None,
+    selection: Optional[FieldSelection] = None,
+    budget: Optional[EmbeddingBudget] = None,
+    config: Config = CONFIG,
+) -> Optional[Dict]:
+    """
+    Look up the identifier in the provided field of a collection in the metadata
+    store and return the document, with its references embedded as planned.
+    """
+    if embedding is None:
+        client = await get_db_client(config)
+        collection = client[config.db_name][collection_name]
+        return await collection.find_one({field: identifier}, get_projection(selection))
+    if collection_name in config.embedding_aggregation_collections:
+        return await get_embedded_entity_by_aggregation(
+            identifier=identifier,
+            field=field,
+            collection_name=collection_name,
+            selection=selection,
+            embedding=embedding,
+            budget=budget,
+            config=config,
+        )
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    entity = await collection.find_one({field: identifier}, get_projection(selection))
+    if entity:
+        entity = await embed_references(
+            entity,
+            config=config,
+            selection=selection,
+            embedding=embedding,
+            budget=budget,
+        )
+    return entity
@@ -20,56 +20,12 @@ from typing import List
 
 from metadata_repository_service.config import CONFIG, Config
 from metadata_repository_service.dao.db import get_db_client
-from metadata_repository_service.dao.utils import embed_references, get_entity
+from metadata_repository_service.dao.embedding import embed_references_many
 from metadata_repository_service.models import Experiment
 
 COLLECTION_NAME = "Experiment"
 
 
-async def retrieve_experiments(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of Experiment object IDs from metadata store.
-
-    Args:
-        config: Rumtime configuration
-
-    Returns:
-        A list of Experiment object IDs.
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    experiments = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in experiments]
-
-
-async def get_experiment(
-    experiment_id: str, embedded: bool = False, config: Config = CONFIG
-) -> Experiment:
-    """
-    Given an Experiment ID, get the Experiment object from metadata store.
-
-    Args:
-        experiment_id: The Experiment ID
-        embedded: Whether or not to embed references. ``False``, by default.
-        config: Rumtime configuration
-
-    Returns:
-        The Experiment object
-
-    """
-    experiment = await get_entity(
-        identifier=experiment_id,
-        field="id",
-        collection_name=COLLECTION_NAME,
-        model_class=Experiment,
-        embedded=embedded,
-        config=config,
-    )
-    return experiment
-
-
 async def get_experiments_by_linked_files(
     file_id_list, embedded: bool = False, config: Config = CONFIG
 ) -> List[Experiment]:
@@ -90,8 +46,6 @@ async def get_experiments_by_linked_files(
     collection = client[config.db_name][COLLECTION_NAME]
     entities = await collection.find({"has_file": {"$in": file_id_list}}).to_list(None)
     if entities and embedded:
-        for experiment in entities:
-            experiment = await embed_references(experiment, config=config)
-    client.close()
+        entities = await embed_references_many(entities, config=config)
     experiment_entities = [Experiment(**x) for x in entities]
     return experiment_entities
@@ -0,0 +1,264 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Convenience methods for exporting records as newline-delimited JSON
+"""
+
+import asyncio
+import copy
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.embedding import embed_references_many
+from metadata_repository_service.dao.utils import get_reference_collection
+
+EXPORTABLE_COLLECTIONS = {
+    "Analysis",
+    "AnalysisProcess",
+    "Biospecimen",
+    "DataAccessCommittee",
+    "DataAccessPolicy",
+    "Dataset",
+    "Experiment",
+    "ExperimentProcess",
+    "File",
+    "Individual",
+    "Member",
+    "Project",
+    "Protocol",
+    "Publication",
+    "Sample",
+    "Study",
+    "Submission",
+    "Technology",
+    "Workflow",
+}
+
+# zstd requires the optional zstandard package
+COMPRESSION_METHODS = {"gzip", "zstd"}
+
+
+class _Encoder:
+    """Encodes batches of records as NDJSON, optionally compressed"""
+
+    def __init__(self, compression: Optional[str] = None):
+        if compression is not None and compression not in COMPRESSION_METHODS:
+            raise ValueError(f"Unsupported compression: '{compression}'")
+        self._compressor: Any = None
+        if compression == "gzip":
+            # wbits=31 produces a gzip container
+            self._compressor = zlib.compressobj(wbits=31)
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ValueError(
+                    "Compression 'zstd' is not available, "
+                    + "the zstandard package is not installed"
+                )
+            self._compressor = zstandard.ZstdCompressor().compressobj()
+
+    def encode(self, records: List[Dict]) -> bytes:
+        """Encode a batch of records"""
+        # dates are passed to str as before, instead of being encoded as ISO 8601
+        data = b"\n".join(
+            orjson.dumps(record, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME)
+            for record in records
+        )
+        if data:
+            data += b"\n"
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        return data
+
+    def flush(self) -> bytes:
+        """Get the remaining encoded data"""
+        return self._compressor.flush() if self._compressor is not None else b""
+
+
+async def _encode_batches(
+    batches: AsyncIterator[List[Dict]], encoder: _Encoder
+) -> AsyncIterator[bytes]:
+    """
+    Encode batches of records as NDJSON. The encoding runs in a worker thread,
+    so that serializing and compressing large batches does not block the event
+    loop.
+    """
+    loop = asyncio.get_running_loop()
+    async for batch in batches:
+        data = await loop.run_in_executor(None, encoder.encode, batch)
+        if data:
+            yield data
+    yield encoder.flush()
+
+
+async def _iter_batches(
+    collection_name: str,
+    query: Dict,
+    embedded: bool,
+    config: Config,
+) -> AsyncIterator[List[Dict]]:
+    """Iterate over the documents of a collection matching a query in batches"""
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    cursor = collection.find(query, {"_id": 0}).batch_size(config.export_batch_size)
+    batch: List[Dict] = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= config.export_batch_size:
+            yield await embed_references_many(batch, config) if embedded else batch
+            batch = []
+    if batch:
+        yield await embed_references_many(batch, config) if embedded else batch
+
+
+def _collect_new_references(
+    documents: List[Dict], seen: Set[Tuple[str, str]]
+) -> Dict[str, List[str]]:
+    """
+    Collect the IDs of the documents referenced by the given documents that
+    have not been seen yet, grouped by collection, and mark them as seen.
+    """
+    references: Dict[str, List[str]] = {}
+    for document in documents:
+        for field, value in document.items():
+            cname = get_reference_collection(field)
+            if cname is None or value is None:
+                continue
+            for document_id in value if isinstance(value, list) else [value]:
+                if (cname, document_id) not in seen:
+                    seen.add((cname, document_id))
+                    references.setdefault(cname, []).append(document_id)
+    return references
+
+
+async def _iter_ids_in_batches(
+    collection_name: str, document_ids: List[str], embedded: bool, config: Config
+) -> AsyncIterator[List[Dict]]:
+    """Iterate over the documents with the given IDs in batches"""
+    batch_size = config.export_batch_size
+    for start in range(0, len(document_ids), batch_size):
+        query = {"id": {"$in": document_ids[start : start + batch_size]}}
+        async for batch in _iter_batches(collection_name, query, embedded, config):
+            yield batch
+
+
+async def _iter_dataset_batches(
+    dataset: Dict, embedded: bool, config: Config
+) -> AsyncIterator[List[Dict]]:
+    """
+    Iterate over the records of the subgraph of a Dataset in batches.
+
+    Without embedding, the Dataset is followed by all documents that can be
+    reached through references, level by level and each only once. With
+    embedding, the Dataset and its directly referenced documents are exported
+    with their references embedded, which holds the documents of the deeper
+    levels, so these are not exported on lines of their own.
+    """
+    seen: Set[Tuple[str, str]] = set()
+    if embedded:
+        [embedded_dataset] = await embed_references_many(
+            [copy.deepcopy(dataset)], config
+        )
+        yield [{"collection": "Dataset", "document": embedded_dataset}]
+    else:
+        yield [{"collection": "Dataset", "document": dataset}]
+    pending = _collect_new_references([dataset], seen)
+    while pending:
+        next_pending: Dict[str, List[str]] = {}
+        for cname, document_ids in pending.items():
+            async for batch in _iter_ids_in_batches(
+                cname, document_ids, embedded, config
+            ):
+                yield [{"collection": cname, "document": doc} for doc in batch]
+                if embedded:
+                    continue
+                for next_cname, next_ids in _collect_new_references(
+                    batch, seen
+                ).items():
+                    next_pending.setdefault(next_cname, []).extend(next_ids)
+        pending = next_pending
+
+
+async def export_collection(
+    collection_name: str,
+    embedded: bool = False,
+    compression: Optional[str] = None,
+    config: Config = CONFIG,
+) -> AsyncIterator[bytes]:
+    """
+    Export all documents of a collection as NDJSON, one document per line.
+
+    Args:
+        collection_name: The collection in the metadata store
+        embedded: Whether or not to embed references. ``False``, by default.
+        compression: The compression method, or ``None`` for uncompressed output
+        config: Rumtime configuration
+
+    Returns:
+        An asynchronous iterator over the encoded chunks
+
+    Raises:
+        ValueError: If the collection cannot be exported or the compression
+            method is not supported
+
+    """
+    if collection_name not in EXPORTABLE_COLLECTIONS:
+        raise ValueError(f"Collection '{collection_name}' cannot be exported")
+    encoder = _Encoder(compression)
+    batches = _iter_batches(collection_name, {}, embedded, config)
+    return _encode_batches(batches, encoder)
+
+
+async def export_dataset(
+    dataset_id: str,
+    embedded: bool = False,
+    compression: Optional[str] = None,
+    config: Config = CONFIG,
+) -> Optional[AsyncIterator[bytes]]:
+    """
+    Export a Dataset together with the documents it references as NDJSON.
+    Every line is an object with the collection name and the document.
+
+    Args:
+        dataset_id: The Dataset ID
+        embedded: Whether or not to embed references. ``False``, by default.
+        compression: The compression method, or ``None`` for uncompressed output
+        config: Rumtime configuration
+
+    Returns:
+        An asynchronous iterator over the encoded chunks, or ``None`` if the
+        Dataset does not exist
+
+    Raises:
+        ValueError: If the compression method is not supported
+
+    """
+    encoder = _Encoder(compression)
+    client = await get_db_client(config)
+    dataset = await client[config.db_name]["Dataset"].find_one(
+        {"id": dataset_id}, {"_id": 0}
+    )
+    if dataset is None:
+        return None
+    batches = _iter_dataset_batches(dataset, embedded, config)
+    return _encode_batches(batches, encoder)
@@ -0,0 +1,262 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Declarative registry of the indexes of the metadata store
+"""
+
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from metadata_repository_service.admin_models import IndexReport
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.accession import (
+    ACCESSION_COUNTER_COLLECTION,
+    ACCESSION_TRACKER_COLLECTION,
+)
+from metadata_repository_service.dao.change_stream import RESUME_TOKEN_COLLECTION
+from metadata_repository_service.dao.dataset_summary import (
+    SUMMARY_COLLECTION_NAME,
+    SUMMARY_REFERENCE_PATHS,
+)
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.utils import (
+    ACCESSIONED_ENTITIES,
+    REFERENCE_COLLECTION_NAME,
+)
+
+# the collections of entities that are looked up by their ID
+ENTITY_COLLECTIONS = (
+    "Analysis",
+    "AnalysisProcess",
+    "Biospecimen",
+    "DataAccessCommittee",
+    "DataAccessPolicy",
+    "Dataset",
+    "Experiment",
+    "ExperimentProcess",
+    "File",
+    "Individual",
+    "Member",
+    "Project",
+    "Protocol",
+    "Publication",
+    "Sample",
+    "Study",
+    "Submission",
+    "Technology",
+    "Workflow",
+)
+
+
+class IndexSpec(NamedTuple):
+    """The specification of an index of a collection"""
+
+    collection_name: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    sparse: bool = False
+    # only the documents matching this filter are indexed
+    partial_filter: Optional[Dict] = None
+
+    @property
+    def name(self) -> str:
+        """The name of the index, as generated by MongoDB"""
+        return "_".join(f"{field}_{direction}" for (field, direction) in self.keys)
+
+    def matches(self, index_info: Dict) -> bool:
+        """Whether an existing index, as listed by MongoDB, matches the spec"""
+        return (
+            tuple(index_info["key"].items()) == self.keys
+            and bool(index_info.get("unique")) == self.unique
+            and bool(index_info.get("sparse")) == self.sparse
+            and index_info.get("partialFilterExpression") == self.partial_filter
+        )
+
+    def to_index_model(self) -> IndexModel:
+        """The index model for creating the index"""
+        # MongoDB rejects the sparse option together with a partial filter
+        options: Dict = {"name": self.name, "unique": self.unique}
+        if self.sparse:
+            options["sparse"] = True
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        return IndexModel(list(self.keys), **options)
+
+
+def _index(
+    collection_name: str,
+    field: str,
+    unique: bool = False,
+    sparse: bool = False,
+    partial_filter: Optional[Dict] = None,
+) -> IndexSpec:
+    """The specification of an ascending index on a single field"""
+    return IndexSpec(
+        collection_name, ((field, ASCENDING),), unique, sparse, partial_filter
+    )
+
+
+INDEX_REGISTRY: List[IndexSpec] = [
+    # lookups by ID and accession
+    *(_index(cname, "id", unique=True) for cname in ENTITY_COLLECTIONS),
+    # documents without an accession, which may store it as null, are not indexed
+    *(
+        _index(
+            cname,
+            "accession",
+            unique=True,
+            partial_filter={"accession": {"$type": "string"}},
+        )
+        for cname in sorted(ACCESSIONED_ENTITIES)
+    ),
+    # get_member_by_email
+    _index("Member", "email"),
+    # get_experiments_by_linked_files and get_analysis_by_linked_files
+    _index("Experiment", "has_file"),
+    _index("Analysis", "has_file"),
+    # the Datasets whose summaries depend on a changed entity
+    *(
+        _index(cname, field)
+        for paths in SUMMARY_REFERENCE_PATHS.values()
+        for (cname, field) in paths
+    ),
+    _index(SUMMARY_COLLECTION_NAME, "id", unique=True),
+    # the pages of get_referencing_entities, and replacing the references of
+    # an entity
+    IndexSpec(
+        REFERENCE_COLLECTION_NAME,
+        (
+            ("target_collection", ASCENDING),
+            ("target_id", ASCENDING),
+            ("_id", ASCENDING),
+        ),
+    ),
+    IndexSpec(
+        REFERENCE_COLLECTION_NAME, (("collection", ASCENDING), ("id", ASCENDING))
+    ),
+    _index(ACCESSION_TRACKER_COLLECTION, "accession", unique=True),
+    _index(ACCESSION_COUNTER_COLLECTION, "prefix", unique=True),
+    _index(RESUME_TOKEN_COLLECTION, "consumer", unique=True),
+]
+
+
+def get_index_specs(
+    collection_names: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, IndexSpec]]:
+    """
+    Get the registered indexes.
+
+    Args:
+        collection_names: Only get the indexes of these collections. All
+            indexes, by default.
+
+    Returns:
+        The index specifications keyed by collection name and index name
+
+    """
+    selected = None if collection_names is None else set(collection_names)
+    specs: Dict[str, Dict[str, IndexSpec]] = {}
+    for spec in INDEX_REGISTRY:
+        if selected is None or spec.collection_name in selected:
+            specs.setdefault(spec.collection_name, {})[spec.name] = spec
+    return specs
+
+
+async def reconcile_indexes(
+    config: Config = CONFIG,
+    create_missing: bool = True,
+    drop_extra: bool = False,
+    collection_names: Optional[Iterable[str]] = None,
+) -> IndexReport:
+    """
+    Compare the indexes of the metadata store with the registered indexes,
+    create the missing ones and optionally drop the ones that are not registered.
+
+    Indexes that exist with the name of a registered index but different
+    options are reported as mismatched and left untouched.
+
+    Args:
+        config: Runtime configuration
+        create_missing: Whether to create the missing indexes
+        drop_extra: Whether to drop the indexes that are not registered
+        collection_names: Only reconcile the indexes of these collections. All
+            collections with registered indexes, by default.
+
+    Returns:
+        The report of the missing, created, failed, mismatched, extra and dropped
+        indexes, as "<collection>.<index>"
+
+    """
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    report = IndexReport()
+    for (collection_name, specs) in get_index_specs(collection_names).items():
+        collection = database[collection_name]
+        existing = {
+            index_info["name"]: index_info
+            async for index_info in collection.list_indexes()
+        }
+        missing = [spec for (name, spec) in specs.items() if name not in existing]
+        report.missing.extend(f"{collection_name}.{x.name}" for x in missing)
+        report.mismatched.extend(
+            f"{collection_name}.{name}"
+            for (name, spec) in specs.items()
+            if name in existing and not spec.matches(existing[name])
+        )
+        extra = [name for name in existing if name not in specs and name != "_id_"]
+        report.extra.extend(f"{collection_name}.{name}" for name in extra)
+        if create_missing:
+            for spec in missing:
+                # e.g. existing documents violate a unique index
+                try:
+                    await collection.create_indexes([spec.to_index_model()])
+                except OperationFailure as error:
+                    logging.warning(
+                        "Could not create index %s.%s: %s",
+                        collection_name,
+                        spec.name,
+                        error,
+                    )
+                    report.failed.append(f"{collection_name}.{spec.name}")
+                else:
+                    report.created.append(f"{collection_name}.{spec.name}")
+        if drop_extra:
+            for name in extra:
+                await collection.drop_index(name)
+                report.dropped.append(f"{collection_name}.{name}")
+    return report
+
+
+async def ensure_indexes(config: Config = CONFIG):
+    """
+    Create the missing registered indexes and log the indexes that do not
+    match the registry.
+
+    Args:
+        config: Runtime configuration
+
+    """
+    report = await reconcile_indexes(config)
+    if report.created:
+        logging.info("Created indexes: %s", ", ".join(report.created))
+    if report.mismatched:
+        logging.warning(
+            "Indexes with unexpected options: %s", ", ".join(report.mismatched)
+        )
+    if report.extra:
+        logging.info("Indexes that are not registered: %s", ", ".join(report.extra))
@@ -16,37 +16,17 @@
 Convenience methods for retrieving Member records
 """
 
-from typing import List
-
 from metadata_repository_service.config import CONFIG, Config
 from metadata_repository_service.core.utils import generate_uuid, get_timestamp
 from metadata_repository_service.creation_models import CreateMember
 from metadata_repository_service.dao.db import get_db_client
-from metadata_repository_service.dao.utils import get_entity
+from metadata_repository_service.dao.entities import get_entity
+from metadata_repository_service.dao.utils import add_references
 from metadata_repository_service.models import Member
 
 COLLECTION_NAME = "Member"
 
 
-async def retrieve_members(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of Member object IDs from metadata store.
-
-    Args:
-        config: Rumtime configuration
-
-    Returns:
-        A list of Member object IDs.
-        config: Rumtime configuration
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    members = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in members]
-
-
 async def get_member(
     member_id: str, embedded: bool = False, config: Config = CONFIG
 ) -> Member:
@@ -118,6 +98,6 @@ async def create_member(member_obj: CreateMember, config: Config = CONFIG) -> Me
     member_entity["creation_date"] = await get_timestamp()
     member_entity["update_date"] = member_entity["creation_date"]
     await collection.insert_one(member_entity)
-    client.close()
+    await add_references({COLLECTION_NAME: [member_entity]}, config)
     member = await get_member(member_entity["id"], config=config)
     return member
@@ -0,0 +1,216 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Look up the entities that reference a given entity, and page through the
+entities that an entity references
+"""
+
+import logging
+import time
+from typing import Any, List, Optional
+
+from bson import ObjectId
+from pydantic.fields import SHAPE_LIST
+from pymongo import ASCENDING
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.embedding import (
+    EmbeddingBudget,
+    embed_references_many,
+)
+from metadata_repository_service.dao.indexes import ENTITY_COLLECTIONS
+from metadata_repository_service.dao.utils import (
+    MODEL_CLASSES,
+    REFERENCE_COLLECTION_NAME,
+    add_references,
+    get_reference_collection,
+)
+from metadata_repository_service.page_models import EntityPage, ReferencePage
+
+
+async def get_referencing_entities(
+    collection_name: str,
+    document_id: str,
+    limit: int,
+    after: Optional[str] = None,
+    referencing_collection: Optional[str] = None,
+    config: Config = CONFIG,
+) -> Optional[ReferencePage]:
+    """
+    Get a page of the references to an entity from other entities, in the
+    order in which they were stored.
+
+    Args:
+        collection_name: The collection of the referenced entity
+        document_id: The ID of the referenced entity
+        limit: The maximum number of references, capped at the configured maximum
+        after: The cursor returned with the previous page
+        referencing_collection: Only get the references from entities of this
+            collection. All collections, by default.
+        config: Rumtime configuration
+
+    Returns
+        The page of references, or ``None`` if the entity does not exist
+
+    Raises:
+        ValueError: If the cursor is invalid
+
+    """
+    query = {"target_collection": collection_name, "target_id": document_id}
+    if referencing_collection is not None:
+        query["collection"] = referencing_collection
+    if after is not None:
+        if not ObjectId.is_valid(after):
+            raise ValueError(f"Invalid cursor: '{after}'")
+        query["_id"] = {"$gt": ObjectId(after)}
+    limit = max(1, min(limit, config.list_max_page_size))
+
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    if not await database[collection_name].find_one({"id": document_id}, {"_id": 1}):
+        return None
+    # fetch one more reference to know whether there is a next page
+    references = (
+        await database[REFERENCE_COLLECTION_NAME]
+        .find(query, {"collection": 1, "id": 1, "field": 1})
+        .sort("_id", ASCENDING)
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+    next_cursor = str(references[limit - 1]["_id"]) if len(references) > limit else None
+    return ReferencePage(items=references[:limit], next_cursor=next_cursor)
+
+
+def is_reference_array(model_class: Any, field: str) -> bool:
+    """Whether a field of a model class is an array of references"""
+    model_field = model_class.__fields__.get(field)
+    if model_field is None or get_reference_collection(field) is None:
+        return False
+    return any(
+        x.shape == SHAPE_LIST for x in [model_field, *(model_field.sub_fields or [])]
+    )
+
+
+async def get_referenced_entities(
+    collection_name: str,
+    document_id: str,
+    field: str,
+    limit: int,
+    after: Optional[str] = None,
+    embedded: bool = False,
+    config: Config = CONFIG,
+) -> Optional[EntityPage]:
+    """
+    Get a page of the entities referenced by an array of references of an entity,
+    in the order of the array, e.g. to walk an array that was truncated when
+    embedding the entity.
+
+    Only the requested slice of the array is retrieved from the metadata store.
+    References that cannot be resolved are skipped.
+
+    Args:
+        collection_name: The collection of the referencing entity
+        document_id: The ID of the referencing entity
+        field: The name of the field with the array of references
+        limit: The maximum number of entities, capped at the configured maximum
+        after: The cursor returned with the previous page or with a truncated array
+        embedded: Whether or not to embed the references of the entities, within
+            the embedding budget. ``False``, by default.
+        config: Rumtime configuration
+
+    Returns
+        The page of entities, or ``None`` if the referencing entity does not exist
+
+    Raises:
+        ValueError: If the field is not an array of references or the cursor is
+            invalid
+
+    """
+    model_class = MODEL_CLASSES[collection_name]
+    if not is_reference_array(model_class, field):
+        raise ValueError(
+            f"Unknown array of references for {model_class.__name__}: '{field}'"
+        )
+    offset = 0
+    if after is not None:
+        if not after.isdigit():
+            raise ValueError(f"Invalid cursor: '{after}'")
+        offset = int(after)
+    limit = max(1, min(limit, config.list_max_page_size))
+
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    # fetch one more reference to know whether there is a next page
+    document = await database[collection_name].find_one(
+        {"id": document_id}, {"_id": 0, "id": 1, field: {"$slice": [offset, limit + 1]}}
+    )
+    if document is None:
+        return None
+    references = document.get(field) or []
+    next_cursor = str(offset + limit) if len(references) > limit else None
+    references = [x for x in references[:limit] if isinstance(x, str)]
+
+    referenced_collection = database[get_reference_collection(field)]
+    entities_by_id = {
+        entity["id"]: entity
+        async for entity in referenced_collection.find({"id": {"$in": references}})
+    }
+    items = [entities_by_id[x] for x in references if x in entities_by_id]
+    if embedded and items:
+        items = await embed_references_many(
+            items, config=config, budget=EmbeddingBudget.from_config(config)
+        )
+    return EntityPage(items=items, next_cursor=next_cursor)
+
+
+async def rebuild_references(
+    collection_names: Optional[List[str]] = None, config: Config = CONFIG
+) -> int:
+    """
+    Replace the reverse references of all entities with the references found in
+    the stored entities, e.g. after the metadata store was populated directly.
+
+    Args:
+        collection_names: The collections of the referencing entities. All entity
+            collections, by default.
+        config: Rumtime configuration
+
+    Returns
+        The number of stored references
+
+    """
+    client = await get_db_client(config)
+    database = client[config.db_name]
+    reference_collection = database[REFERENCE_COLLECTION_NAME]
+    batch_size = max(config.ingestion_batch_size, 1)
+    start = time.perf_counter()
+    count = 0
+    for collection_name in collection_names or ENTITY_COLLECTIONS:
+        await reference_collection.delete_many({"collection": collection_name})
+        batch = []
+        async for document in database[collection_name].find({}, {"_id": 0}):
+            batch.append(document)
+            if len(batch) == batch_size:
+                await add_references({collection_name: batch}, config)
+                batch = []
+        await add_references({collection_name: batch}, config)
+        count += await reference_collection.count_documents(
+            {"collection": collection_name}
+        )
+    logging.info(
+        "Rebuilt %d references in %.1f ms", count, (time.perf_counter() - start) * 1000
+    )
+    return count
@@ -17,44 +17,34 @@ Convenience methods for retrieving Submission records
 """
 
 import copy
-from typing import Dict, List
+from typing import Dict
 
 from pymongo import ReturnDocument
 
 from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.core.utils import get_timestamp
 from metadata_repository_service.creation_models import CreateSubmission
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.dataset_summary import (
+    update_submission_dataset_summaries,
+)
 from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.embedding import EmbeddingBudget, embed_references
+from metadata_repository_service.dao.entities import get_entity_document
+from metadata_repository_service.dao.submission_planner import plan_submission
 from metadata_repository_service.dao.utils import (
-    delete_document,
-    embed_references,
-    get_timestamp,
-    link_embedded,
-    parse_document,
+    add_references,
+    get_embedded_documents,
     store_document,
-    update_document,
+    store_document_changes,
 )
 from metadata_repository_service.models import Submission
 from metadata_repository_service.patch_models import SubmissionStatusPatch
 
 COLLECTION_NAME = "Submission"
 
-
-async def retrieve_submissions(config: Config = CONFIG) -> List[str]:
-    """
-    Retrieve a list of Submission object IDs from metadata store.
-
-    Args:
-        config: Runtime configuration
-
-    Returns:
-        A list of Submission object IDs.
-
-    """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    submissions = await collection.find().to_list(None)
-    client.close()
-    return [x["id"] for x in submissions]
+# only the entities of a Submission are embedded, not their references
+SUBMISSION_EMBEDDING_DEPTH = 1
 
 
 async def get_submission(
@@ -72,13 +62,15 @@ async def get_submission(
         The Submission object
 
     """
-    client = await get_db_client(config)
-    collection = client[config.db_name][COLLECTION_NAME]
-    submission = await collection.find_one({"id": submission_id})
-    if submission and embedded:
-        submission = await embed_references(submission, config, True)
-    client.close()
-    return Submission(**submission)
+    submission = await get_entity_document(
+        identifier=submission_id,
+        field="id",
+        collection_name=COLLECTION_NAME,
+        depth=SUBMISSION_EMBEDDING_DEPTH if embedded else None,
+        budget=EmbeddingBudget.from_config(config),
+        config=config,
+    )
+    return Submission(**submission) if submission else None
 
 
 async def add_submission(
@@ -93,9 +85,7 @@ async def add_submission(
 
     """
     document = input_submission.dict()
-    docs = await parse_document(document)
-    docs = await link_embedded(docs)
-    docs = await update_document(document, docs)
+    docs = await plan_submission(document)
 
     await store_document(docs, config)
 
@@ -116,7 +106,7 @@ async def insert_submission(submission: Submission, config: Config = CONFIG):
     client = await get_db_client(config)
     collection = client[config.db_name][COLLECTION_NAME]
     await collection.insert_one(submission)
-    client.close()
+    await add_references({COLLECTION_NAME: [submission]}, config)
 
 
 async def patch_submission(
@@ -162,7 +152,7 @@ async def update_submission_values(
         upsert=True,
         return_document=ReturnDocument.AFTER,
     )
-    client.close()
+    get_entity_cache(config).invalidate(COLLECTION_NAME, [submission_id])
 
     return submission
 
@@ -173,6 +163,10 @@ async def update_submission(
     """
     Updates a Submission object into metadata store.
 
+    Entities are matched with the stored entities of the Submission by alias.
+    Matched entities keep their ID and accession, and only the entities that
+    were added, changed or removed are written.
+
     Args:
         submission: Submission object to be updated
         input_submission: New submission object
@@ -181,11 +175,12 @@ async def update_submission(
     """
     document = input_submission.dict()
     old_document = copy.deepcopy(submission.dict())
-    await delete_document(old_document, "Submission", config=config)
-    docs = await parse_document(document)
-    docs = await link_embedded(docs)
-    docs = await update_document(document, docs, old_document)
-    await store_document(docs, config)
+    old_docs = await get_embedded_documents(old_document, config)
+    docs = await plan_submission(document, old_document, old_docs)
+    await store_document_changes(docs, old_docs, old_document, config)
+    if not config.change_stream_enabled:
+        # otherwise the change stream listener takes care of this
+        await update_submission_dataset_summaries(old_document, config=config)
     updated_submission = await embed_references(docs["parent"][1], config, True)
 
     return updated_submission
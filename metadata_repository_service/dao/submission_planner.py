@@ -0,0 +1,282 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Planning of the documents to store for a Submission
+"""
+
+import typing
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+import stringcase
+from pydantic import BaseModel
+
+from metadata_repository_service import creation_models
+from metadata_repository_service.core.utils import generate_uuid, get_timestamp
+from metadata_repository_service.dao.utils import embedded_fields
+
+
+class ModelPlan:
+    """
+    The fields of one or more creation models that are handled when planning
+    a Submission, computed once per model.
+
+    Attributes:
+        reference_fields: The fields that reference other entities by alias
+        nested_fields: The fields with nested entities that are stored as part
+            of the document, together with the plan for the nested entities
+    """
+
+    __slots__ = ("reference_fields", "nested_fields")
+
+    def __init__(self):
+        self.reference_fields: Tuple[str, ...] = ()
+        self.nested_fields: Tuple[Tuple[str, "ModelPlan"], ...] = ()
+
+
+class SubmissionField(NamedTuple):
+    """A field of a Submission that holds entities of a collection"""
+
+    name: str
+    collection_name: str
+    is_list: bool
+    plan: ModelPlan
+
+
+def get_model_classes(annotation) -> Iterator[Type[BaseModel]]:
+    """Get the model classes that are part of a type annotation"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        yield annotation
+        return
+    for argument in typing.get_args(annotation):
+        yield from get_model_classes(argument)
+
+
+def _is_list(annotation) -> bool:
+    """Whether a type annotation allows lists"""
+    if typing.get_origin(annotation) is list:
+        return True
+    return any(_is_list(argument) for argument in typing.get_args(annotation))
+
+
+_MODEL_PLANS: Dict[Tuple[Type[BaseModel], ...], ModelPlan] = {}
+
+
+def get_model_plan(model_classes: Tuple[Type[BaseModel], ...]) -> ModelPlan:
+    """
+    Get the plan for documents of the given creation models.
+
+    Args:
+        model_classes: The creation models a document can be an instance of
+
+    Returns:
+        The plan, computed on first use
+
+    """
+    plan = _MODEL_PLANS.get(model_classes)
+    if plan is not None:
+        return plan
+    # registered before it is filled in, as models can nest themselves
+    plan = _MODEL_PLANS[model_classes] = ModelPlan()
+    reference_fields: Dict[str, None] = {}
+    nested_fields: Dict[str, ModelPlan] = {}
+    for model_class in model_classes:
+        for field_name, field in model_class.__fields__.items():
+            if not field_name.startswith("has_") or field_name in {"has_attribute"}:
+                continue
+            if field_name in embedded_fields:
+                reference_fields[field_name] = None
+                continue
+            nested_classes = tuple(get_model_classes(field.outer_type_))
+            if nested_classes:
+                nested_fields[field_name] = get_model_plan(nested_classes)
+    plan.reference_fields = tuple(reference_fields)
+    plan.nested_fields = tuple(nested_fields.items())
+    return plan
+
+
+def _get_submission_fields() -> Tuple[SubmissionField, ...]:
+    """Get the fields of a Submission that hold entities"""
+    submission_fields = []
+    for field_name, field in creation_models.CreateSubmission.__fields__.items():
+        if field_name not in embedded_fields:
+            continue
+        submission_fields.append(
+            SubmissionField(
+                name=field_name,
+                collection_name=stringcase.pascalcase(field_name.split("_", 1)[1]),
+                is_list=_is_list(field.outer_type_),
+                plan=get_model_plan(tuple(get_model_classes(field.outer_type_))),
+            )
+        )
+    return tuple(submission_fields)
+
+
+SUBMISSION_FIELDS = _get_submission_fields()
+
+
+def get_references(document: Dict, plan: ModelPlan) -> Iterator[str]:
+    """
+    Get the aliases that are referenced by a document.
+
+    Args:
+        document: The document
+        plan: The plan for the document
+
+    Returns:
+        The referenced aliases
+
+    """
+    for field in plan.reference_fields:
+        value = document.get(field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            yield from value
+        else:
+            yield value
+
+
+async def annotate_document(
+    document: Dict,
+    plan: ModelPlan,
+    timestamp: str,
+    old_document: Optional[Dict] = None,
+):
+    """
+    Add the identifier and creation/update date to a document and the entities
+    nested in it, and remove the "Create" prefix from their schema types.
+
+    Args:
+        document: The document
+        plan: The plan for the document
+        timestamp: The creation/update date
+        old_document: The stored document that the document replaces. Its
+            identifier, creation date and accession are kept.
+
+    """
+    if old_document is None:
+        document["id"] = await generate_uuid()
+        document["creation_date"] = timestamp
+    else:
+        document["id"] = old_document["id"]
+        document["creation_date"] = old_document["creation_date"]
+        if old_document.get("accession"):
+            document["accession"] = old_document["accession"]
+    document["update_date"] = timestamp
+    schema_type = document.get("schema_type")
+    if schema_type and schema_type.startswith("Create"):
+        document["schema_type"] = schema_type.replace("Create", "", 1)
+    for (field, nested_plan) in plan.nested_fields:
+        value = document.get(field)
+        if value is None:
+            continue
+        for nested_document in value if isinstance(value, list) else [value]:
+            if isinstance(nested_document, dict):
+                await annotate_document(nested_document, nested_plan, timestamp)
+
+
+def _resolve_reference(alias, ids: Dict[str, str], document: Dict, field: str):
+    """Get the ID of the entity with the given alias"""
+    if alias not in ids:
+        raise ValueError(
+            f"'{document['alias']}' references the alias '{alias}' in {field}, "
+            + "which is not defined in the Submission"
+        )
+    return ids[alias]
+
+
+async def plan_submission(
+    document: Dict,
+    old_document: Optional[Dict] = None,
+    old_docs: Optional[Dict] = None,
+) -> Dict:
+    """
+    Plan the documents to store for a Submission.
+
+    The entities of the Submission are annotated and their aliases mapped to
+    IDs in a single traversal, guided by the precomputed fields of each model,
+    and the references by alias are then replaced by IDs.
+
+    Args:
+        document: The Submission, with the entities embedded
+        old_document: The stored Submission that the Submission replaces
+        old_docs: The stored entities of the replaced Submission, with alias as
+            a key. Entities with the same alias keep their ID, creation date and
+            accession.
+
+    Returns:
+        The dictionary of entity documents with alias as a key and the
+        Submission document with key "parent"
+
+    Raises:
+        ValueError: If an alias is used more than once or is referenced but
+            not defined in the Submission
+
+    """
+    timestamp = await get_timestamp()
+    old_docs = old_docs or {}
+    docs: Dict = {}
+    ids: Dict[str, str] = {}
+    references: List[Tuple[Dict, str]] = []
+
+    for submission_field in SUBMISSION_FIELDS:
+        value = document.get(submission_field.name)
+        if value is None:
+            continue
+        cname = submission_field.collection_name
+        parent_ids = []
+        for doc in value if isinstance(value, list) else [value]:
+            if not isinstance(doc, dict):
+                raise ValueError(
+                    f"The entities in {submission_field.name} must be embedded"
+                )
+            alias = doc["alias"]
+            if alias in docs:
+                raise ValueError(f"The alias '{alias}' is used more than once")
+            old = old_docs.get(alias)
+            await annotate_document(
+                doc,
+                submission_field.plan,
+                timestamp,
+                old[1] if old is not None and old[0] == cname else None,
+            )
+            docs[alias] = (cname, doc)
+            ids[alias] = doc["id"]
+            parent_ids.append(doc["id"])
+            references.extend(
+                (doc, field)
+                for field in submission_field.plan.reference_fields
+                if doc.get(field) is not None
+            )
+        document[submission_field.name] = (
+            parent_ids if submission_field.is_list else parent_ids[0]
+        )
+
+    for (doc, field) in references:
+        if isinstance(doc[field], list):
+            doc[field] = [
+                _resolve_reference(alias, ids, doc, field) for alias in doc[field]
+            ]
+        else:
+            doc[field] = _resolve_reference(doc[field], ids, doc, field)
+
+    if old_document is None:
+        await annotate_document(document, ModelPlan(), timestamp)
+        document["submission_status"] = "in_progress"
+    else:
+        await annotate_document(document, ModelPlan(), timestamp, old_document)
+        document["submission_status"] = old_document["submission_status"]
+    docs["parent"] = ["Submission", document]
+    return docs
@@ -0,0 +1,452 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Ingestion of Submissions that are streamed as newline-delimited JSON records
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, ValidationError
+
+from metadata_repository_service import creation_models
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.core.utils import get_timestamp
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.submission_planner import (
+    SUBMISSION_FIELDS,
+    ModelPlan,
+    SubmissionField,
+    annotate_document,
+    get_model_classes,
+    get_references,
+)
+from metadata_repository_service.dao.utils import assign_accessions, insert_records
+
+SUBMISSION_SCHEMA_TYPE = "CreateSubmission"
+
+# maximum number of parameters in a single SQLite query
+SQLITE_MAX_PARAMETERS = 900
+
+SUBMISSION_FIELDS_BY_NAME = {field.name: field for field in SUBMISSION_FIELDS}
+
+T = TypeVar("T")
+
+
+def _get_record_types() -> Dict[str, Tuple[SubmissionField, Type[BaseModel]]]:
+    """
+    Get the Submission field and the model class for the schema type of each
+    entity that can be part of a Submission.
+    """
+    record_types = {}
+    for submission_field in SUBMISSION_FIELDS:
+        field = creation_models.CreateSubmission.__fields__[submission_field.name]
+        for model_class in get_model_classes(field.outer_type_):
+            record_types[model_class.__name__] = (submission_field, model_class)
+    return record_types
+
+
+RECORD_TYPES = _get_record_types()
+
+
+class AliasTable:
+    """
+    A temporary on-disk table of the records of a streamed Submission.
+
+    The validated records are spilled to an SQLite database together with the
+    UUIDs assigned to their aliases and the aliases they reference, so that
+    the references can be resolved without holding the Submission in memory.
+    The statements are run on a worker thread of the table, which owns the
+    SQLite connection, so that they do not block the event loop.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = tempfile.TemporaryDirectory(dir=directory)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    async def create(cls, directory: Optional[str] = None) -> "AliasTable":
+        """
+        Create a table.
+
+        Args:
+            directory: The directory of the temporary database, the default
+                temporary directory by default
+
+        Returns:
+            The table
+        """
+        alias_table = cls(directory)
+        await alias_table._run(alias_table._create)
+        return alias_table
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a function on the worker thread of the table"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    def _create(self):
+        """Create the database"""
+        self._connection = sqlite3.connect(
+            os.path.join(self._directory.name, "aliases.sqlite3")
+        )
+        self._connection.executescript(
+            """
+            CREATE TABLE aliases (
+                alias TEXT PRIMARY KEY, id TEXT NOT NULL, field TEXT NOT NULL
+            );
+            CREATE TABLE records (
+                line INTEGER PRIMARY KEY, field TEXT NOT NULL, document TEXT
+            );
+            CREATE TABLE refs (alias TEXT NOT NULL, line INTEGER NOT NULL);
+            """
+        )
+
+    async def close(self):
+        """Close and delete the table"""
+        if self._connection is not None:
+            await self._run(self._connection.close)
+        self._executor.shutdown()
+        self._directory.cleanup()
+
+    async def add_records(self, records: List[Tuple[int, str, Dict]]):
+        """
+        Add annotated records.
+
+        Args:
+            records: The line number, Submission field and document of each record
+
+        Raises:
+            ValueError: If an alias is used more than once
+        """
+        existing = await self.resolve([doc["alias"] for (_, _, doc) in records])
+        seen = set()
+        for (line, _, doc) in records:
+            if doc["alias"] in existing or doc["alias"] in seen:
+                raise ValueError(
+                    f"Line {line} uses the alias '{doc['alias']}' which is "
+                    + "already used by another record"
+                )
+            seen.add(doc["alias"])
+        await self._run(self._insert_records, records)
+
+    def _insert_records(self, records: List[Tuple[int, str, Dict]]):
+        """Insert records with their aliases and references"""
+        self._connection.executemany(
+            "INSERT INTO aliases VALUES (?, ?, ?)",
+            [(doc["alias"], doc["id"], field) for (_, field, doc) in records],
+        )
+        self._connection.executemany(
+            "INSERT INTO records VALUES (?, ?, ?)",
+            [(line, field, json.dumps(doc)) for (line, field, doc) in records],
+        )
+        self._connection.executemany(
+            "INSERT INTO refs VALUES (?, ?)",
+            [
+                (alias, line)
+                for (line, field, doc) in records
+                for alias in get_references(doc, SUBMISSION_FIELDS_BY_NAME[field].plan)
+            ],
+        )
+
+    async def check_references(self):
+        """
+        Check that all referenced aliases are defined.
+
+        Raises:
+            ValueError: If an alias is referenced but not defined
+        """
+        dangling = await self._run(self._get_dangling_reference)
+        if dangling is not None:
+            raise ValueError(
+                f"Line {dangling[1]} references the alias '{dangling[0]}' "
+                + "which is not defined in the Submission"
+            )
+
+    def _get_dangling_reference(self) -> Optional[Tuple[str, int]]:
+        """Get a referenced alias that is not defined, with the line of the
+        reference"""
+        return self._connection.execute(
+            "SELECT refs.alias, refs.line FROM refs LEFT JOIN aliases "
+            + "ON refs.alias = aliases.alias WHERE aliases.alias IS NULL LIMIT 1"
+        ).fetchone()
+
+    async def resolve(self, aliases: List[str]) -> Dict[str, str]:
+        """
+        Get the UUIDs of aliases.
+
+        Args:
+            aliases: The aliases
+
+        Returns:
+            The UUIDs keyed by alias
+        """
+        return await self._run(self._resolve, aliases)
+
+    def _resolve(self, aliases: List[str]) -> Dict[str, str]:
+        """Look up the UUIDs of aliases"""
+        ids = {}
+        unique_aliases = list(set(aliases))
+        for offset in range(0, len(unique_aliases), SQLITE_MAX_PARAMETERS):
+            chunk = unique_aliases[offset : offset + SQLITE_MAX_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            ids.update(
+                self._connection.execute(
+                    f"SELECT alias, id FROM aliases WHERE alias IN ({placeholders})",  # nosec
+                    chunk,
+                )
+            )
+        return ids
+
+    async def iter_records(
+        self, batch_size: int
+    ) -> AsyncIterator[List[Tuple[str, Dict]]]:
+        """
+        Iterate over the records in batches, in the order they were added.
+
+        Args:
+            batch_size: The number of records per batch
+
+        Yields:
+            Batches of Submission fields and documents
+        """
+        cursor = await self._run(
+            self._connection.execute,
+            "SELECT field, document FROM records ORDER BY line",
+        )
+        while True:
+            rows = await self._run(cursor.fetchmany, batch_size)
+            if not rows:
+                return
+            yield [(field, json.loads(document)) for (field, document) in rows]
+
+    async def get_ids(self, field: str) -> List[str]:
+        """
+        Get the UUIDs of the records of a Submission field.
+
+        Args:
+            field: The Submission field
+
+        Returns:
+            The UUIDs in the order the records were added
+        """
+        return await self._run(self._get_ids, field)
+
+    def _get_ids(self, field: str) -> List[str]:
+        """Look up the UUIDs of the records of a Submission field"""
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT id FROM aliases WHERE field = ? ORDER BY rowid", (field,)
+            )
+        ]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a stream of byte chunks into lines.
+
+    Args:
+        chunks: The byte chunks
+
+    Yields:
+        The lines, without line breaks
+    """
+    remainder = b""
+    async for chunk in chunks:
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line
+    if remainder:
+        yield remainder
+
+
+def _parse_record(line: bytes, line_number: int) -> Tuple[str, Dict]:
+    """
+    Validate a record of a streamed Submission.
+
+    Returns:
+        The Submission field of the record and the annotated document
+
+    """
+    try:
+        record = json.loads(line)
+        schema_type = record["schema_type"]
+    except (ValueError, TypeError, KeyError) as error:
+        raise ValueError(
+            f"Line {line_number} is not a JSON object with a schema_type"
+        ) from error
+    if schema_type == SUBMISSION_SCHEMA_TYPE:
+        model_class: Type[BaseModel] = creation_models.CreateSubmission
+        field = ""
+    elif schema_type in RECORD_TYPES:
+        (submission_field, model_class) = RECORD_TYPES[schema_type]
+        field = submission_field.name
+    else:
+        raise ValueError(f"Line {line_number} has unknown schema_type '{schema_type}'")
+    try:
+        document = model_class(**record).dict()
+    except ValidationError as error:
+        raise ValueError(f"Line {line_number} is invalid: {error}") from error
+    if field and not document.get("alias"):
+        raise ValueError(f"Line {line_number} has no alias")
+    return (field, document)
+
+
+async def _spill_records(
+    lines: AsyncIterator[bytes],
+    alias_table: AliasTable,
+    batch_size: int,
+    timestamp: str,
+) -> Dict:
+    """
+    Validate and annotate the records of a streamed Submission and add them to
+    the alias table in batches.
+
+    Returns:
+        The Submission record
+
+    """
+    submission: Optional[Dict] = None
+    batch: List[Tuple[int, str, Dict]] = []
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        (field, document) = _parse_record(line, line_number)
+        if not field:
+            if submission is not None:
+                raise ValueError(f"Line {line_number} is a second Submission record")
+            if any(document[x.name] is not None for x in SUBMISSION_FIELDS):
+                raise ValueError(
+                    f"Line {line_number}: the entities of a Submission must be "
+                    + "separate records"
+                )
+            submission = document
+            continue
+        plan = SUBMISSION_FIELDS_BY_NAME[field].plan
+        await annotate_document(document, plan, timestamp)
+        batch.append((line_number, field, document))
+        if len(batch) >= batch_size:
+            await alias_table.add_records(batch)
+            batch = []
+    if batch:
+        await alias_table.add_records(batch)
+    if submission is None:
+        submission = {"schema_type": SUBMISSION_SCHEMA_TYPE}
+    return submission
+
+
+async def _store_records(
+    alias_table: AliasTable, batch_size: int, config: Config = CONFIG
+):
+    """Resolve the references of the spilled records and store them in batches"""
+    cache = get_entity_cache(config)
+    async for batch in alias_table.iter_records(batch_size):
+        ids = await alias_table.resolve(
+            [
+                alias
+                for (field, doc) in batch
+                for alias in get_references(doc, SUBMISSION_FIELDS_BY_NAME[field].plan)
+            ]
+        )
+        records: Dict[str, List] = {}
+        for (field, doc) in batch:
+            submission_field = SUBMISSION_FIELDS_BY_NAME[field]
+            for reference_field in submission_field.plan.reference_fields:
+                value = doc.get(reference_field)
+                if value is None:
+                    continue
+                if isinstance(value, list):
+                    doc[reference_field] = [ids[alias] for alias in value]
+                else:
+                    doc[reference_field] = ids[value]
+            records.setdefault(submission_field.collection_name, []).append(doc)
+        await assign_accessions(records, config)
+        for (collection_name, record_list) in records.items():
+            await insert_records(collection_name, record_list, config)
+            cache.invalidate(collection_name, [doc["id"] for doc in record_list])
+
+
+async def ingest_submission_stream(
+    lines: AsyncIterator[bytes], config: Config = CONFIG
+) -> Dict:
+    """
+    Add a Submission that is streamed as newline-delimited JSON records into
+    metadata store.
+
+    Every line is an entity of the Submission, typed by its ``schema_type``
+    (e.g. ``CreateFile``), that references other entities by alias. An
+    optional record of schema type ``CreateSubmission`` holds the fields of
+    the Submission itself. The records are validated and spilled to a
+    temporary alias table in a first pass, and stored in batches of
+    ``config.ingestion_batch_size`` records with resolved references in a
+    second pass, so that memory use does not grow with the Submission.
+
+    Args:
+        lines: The lines of the stream
+        config: Runtime configuration
+
+    Returns:
+        The Submission document, with references to the entities by ID
+
+    Raises:
+        ValueError: If a record is invalid, an alias is used more than once
+            or an alias is referenced but not defined. Nothing is stored then.
+    """
+    batch_size = max(config.ingestion_batch_size, 1)
+    timestamp = await get_timestamp()
+    alias_table = await AliasTable.create(config.ingestion_spill_dir)
+    try:
+        submission = await _spill_records(lines, alias_table, batch_size, timestamp)
+        await alias_table.check_references()
+        for submission_field in SUBMISSION_FIELDS:
+            ids = await alias_table.get_ids(submission_field.name)
+            if submission_field.is_list:
+                submission[submission_field.name] = ids
+            elif len(ids) > 1:
+                raise ValueError(
+                    f"A Submission has at most one {submission_field.collection_name}"
+                )
+            else:
+                submission[submission_field.name] = ids[0] if ids else None
+        await _store_records(alias_table, batch_size, config)
+    finally:
+        await alias_table.close()
+
+    await annotate_document(submission, ModelPlan(), timestamp)
+    submission["submission_status"] = "in_progress"
+    await insert_records("Submission", [submission], config)
+    get_entity_cache(config).invalidate("Submission", [submission["id"]])
+    submission.pop("_id", None)
+    return submission
@@ -16,16 +16,22 @@
 
 # pylint: disable=too-many-arguments
 
-import copy
+import asyncio
+import contextlib
 import logging
-import random
-from typing import Any, Dict, List, Set
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Type
 
 import stringcase
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pydantic import BaseModel
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateOne
 
+from metadata_repository_service import models
 from metadata_repository_service.config import CONFIG, Config
-from metadata_repository_service.core.utils import generate_uuid, get_timestamp
-from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.accession import generate_accessions
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.db import get_db_client, supports_transactions
 
 embedded_fields: Set = {
     "has_analysis",
@@ -48,6 +54,11 @@ embedded_fields: Set = {
 }
 
 
+# one document per reference from an entity to another entity, to look up the
+# entities that reference a given entity
+REFERENCE_COLLECTION_NAME = "_references_"
+
+
 ACCESSIONED_ENTITIES = {
     "Dataset",
     "Study",
@@ -63,386 +74,522 @@ ACCESSIONED_ENTITIES = {
 }
 
 
-async def _get_reference(
-    document_id: str, collection_name: str, config: Config = CONFIG
-) -> Dict:
-    """Given a document ID and a collection name, query the metadata store
-    and return the document.
+# the model classes of the metadata schema, keyed by the schema type of their
+# instances, to build the model object of a document without looking up its class
+MODEL_CLASSES: Dict[str, Type[BaseModel]] = {
+    name: value
+    for (name, value) in vars(models).items()
+    if isinstance(value, type)
+    and issubclass(value, BaseModel)
+    and value.__module__ == models.__name__
+}
+
+
+def build_model(model_class: Any, document: Dict) -> Any:
+    """
+    Build the model object of a document. If the schema type of the document is
+    a subclass of the model class, e.g. a SequencingProtocol for the Protocol
+    model class, an instance of the subclass is built.
 
     Args:
-        document_id: The ID of the document
-        collection_name: The collection in the metadata store that has the document
+        model_class: The model class of the collection of the document
+        document: The document
 
     Returns
-        The document corresponding to ``document_id``
+        The model object
 
     """
-    client = await get_db_client(config)
-    collection = client[config.db_name][collection_name]
-    doc = await collection.find_one({"id": document_id})
-    if not doc:
-        logging.warning(
-            "Reference with ID %s not found in collection %s",
-            document_id,
-            collection_name,
-        )
-    return doc
+    schema_class = MODEL_CLASSES.get(document.get("schema_type"))
+    if schema_class is not None and issubclass(schema_class, model_class):
+        return schema_class(**document)
+    return model_class(**document)
 
 
-async def get_entity(
-    identifier: str,
-    field: str,
-    collection_name: str,
-    model_class: Any = None,
-    embedded: bool = False,
-    config: Config = CONFIG,
-) -> Any:
+def get_reference_collection(field: str) -> Optional[str]:
+    """Given a field name, return the name of the collection that the field
+    references, or ``None`` if the field is not an embeddable reference.
     """
-    Given an identifier, field name and collection name, look up the
-    identifier in the provided field of a collection and return the
-    corresponding document.
+    if field not in embedded_fields:
+        return None
+    cname = field.split("_", 1)[1]
+    return stringcase.pascalcase(cname)
+
+
+def get_reference_edges(collection_name: str, document: Dict) -> List[Dict]:
+    """
+    Get the references of a document to other entities as documents of the
+    reverse-reference collection.
 
     Args:
-        identifier: The identifier
-        field: The name of the field
-        collection_name: The collection in the metadata store that has the document
-        model_class: The model class
-        embedded: Whether or not to embed references. ``False``, by default.
-        config: Rumtime configuration
+        collection_name: The collection of the document
+        document: The document with unembedded references
 
     Returns
-        The document
+        One document per referenced entity and field, with the collection and
+        ID of the referenced entity and the collection, ID and field of the
+        referencing entity
 
     """
-    client = await get_db_client(config)
-    collection = client[config.db_name][collection_name]
-    entity = await collection.find_one({field: identifier})
-    if entity and embedded:
-        entity = await embed_references(entity, config=config)
-    client.close()
-    if model_class and entity:
-        entity_obj = model_class(**entity)
-    else:
-        entity_obj = entity
-    return entity_obj
-
-
-async def get_schema_type(
-    identifier: str,
-    field: str,
-    collection_name: str,
-    property_name: str,
-    config: Config = CONFIG,
-) -> str:
+    edges = []
+    for field, value in document.items():
+        target_collection = get_reference_collection(field)
+        if target_collection is None or value is None:
+            continue
+        refs = value if isinstance(value, list) else [value]
+        for ref in dict.fromkeys(ref for ref in refs if isinstance(ref, str)):
+            edges.append(
+                {
+                    "target_collection": target_collection,
+                    "target_id": ref,
+                    "collection": collection_name,
+                    "id": document["id"],
+                    "field": field,
+                }
+            )
+    return edges
+
+
+async def add_references(documents: Dict[str, List[Dict]], config: Config = CONFIG):
     """
-    Given an identifier, field name and collection name, return the property,
-    e.g. schema type of the object.
+    Store the reverse references of newly written documents.
 
     Args:
-        identifier: The identifier
-        field: The name of the field
-        collection_name: The collection in the metadata store that has the document
-        property_name: The name of the property to return
-        config: Rumtime configuration
-
-    Returns
-        The value of the property
+        documents: The documents with unembedded references, keyed by collection
+        config: Runtime configuration
 
     """
+    edges = [
+        edge
+        for (collection_name, document_list) in documents.items()
+        for document in document_list
+        for edge in get_reference_edges(collection_name, document)
+    ]
+    if not edges:
+        return
     client = await get_db_client(config)
-    collection = client[config.db_name][collection_name]
-    entity = await collection.find_one({field: identifier})
-    return entity[property_name]
+    collection = client[config.db_name][REFERENCE_COLLECTION_NAME]
+    batch_size = max(config.ingestion_batch_size, 1)
+    for offset in range(0, len(edges), batch_size):
+        batch = edges[offset : offset + batch_size]
+        await collection.bulk_write([InsertOne(edge) for edge in batch], ordered=False)
 
 
-async def embed_references(
-    document: Dict, config: Config = CONFIG, only_top_level: bool = False
-) -> Dict:
-    """Given a document and a document type, identify the references in ``document``
-    and query the metadata store. After retrieving the referenced objects,
-    embed them in place of the reference in the parent document.
+def get_model_field_names(model_class: Any) -> Set[str]:
+    """Get the field names of a model class and of all its subclasses"""
+    field_names = set(model_class.__fields__)
+    for subclass in model_class.__subclasses__():
+        field_names.update(get_model_field_names(subclass))
+    return field_names
+
+
+def get_embedded_ids(parent_document: Dict) -> Dict[str, List[str]]:
+    """Get the IDs of the documents embedded in a parent document.
 
     Args:
-        document: The document that has one or more references
+        parent_document: The parent document
 
     Returns
-        The denormalize/embedded document
+        The IDs of the embedded documents keyed by collection name
 
     """
-    parent_document = copy.deepcopy(document)
+    embedded_ids: Dict[str, List[str]] = {}
     for field in parent_document.keys():
         if field.startswith("has_") and field not in {"has_attribute"}:
             if field not in embedded_fields:
                 continue
-            cname = field.split("_", 1)[1]
-            formatted_cname = stringcase.pascalcase(cname)
-            if isinstance(parent_document[field], str):
-                referenced_doc = await get_referenced_doc(
-                    parent_document[field],
-                    formatted_cname,
-                    config=config,
-                    only_top_level=only_top_level,
-                )
-                parent_document[field] = referenced_doc
-            elif isinstance(parent_document[field], (list, set, tuple)):
-                docs = []
-                for ref in parent_document[field]:
-                    referenced_doc = await get_referenced_doc(
-                        ref,
-                        formatted_cname,
-                        config=config,
-                        only_top_level=only_top_level,
-                    )
-                    docs.append(referenced_doc)
-                if docs:
-                    parent_document[field] = docs
-    return parent_document
-
-
-async def get_referenced_doc(
-    ref: str,
-    collection_name: str,
-    config: Config = CONFIG,
-    only_top_level: bool = False,
-) -> Dict:
-    """Retrieve the referenced document"""
-    referenced_doc = await _get_reference(ref, collection_name, config=config)
-    if referenced_doc:
-        if not only_top_level:
-            referenced_doc = await embed_references(referenced_doc, config=config)
-    return referenced_doc
-
+            if parent_document[field] is None:
+                continue
+            cname = stringcase.pascalcase(field.split("_", 1)[1])
+            doc_ids = parent_document[field]
+            if not isinstance(doc_ids, list):
+                doc_ids = [doc_ids]
+            embedded_ids.setdefault(cname, []).extend(doc_ids)
+    return embedded_ids
 
-async def generate_accession(collection_name: str, config: Config = CONFIG) -> str:
-    """
-    Generate a unique accession.
 
-    The uniqueness of the accession is ensured by checking the metadata store
-    to see if a generated accession already exists.
+async def get_embedded_documents(
+    parent_document: Dict, config: Config = CONFIG
+) -> Dict:
+    """Get the documents embedded in a parent document from the database.
 
     Args:
-        collection_name: The name of the collection
+        parent_document: The parent document
         config: Runtime configuration
 
-    Returns:
-        A new accession
+    Returns
+        The dictionary of embedded documents with alias as a key
 
     """
     client = await get_db_client(config)
-    collection = client[config.db_name]["_accession_tracker_"]
-    accession = await _generate_accession(collection_name=collection_name)
-    accession_tracker_obj = await collection.find_one({"accession": accession})
-    if accession_tracker_obj:
-        accession = await generate_accession(
-            collection_name=collection_name, config=config
-        )
-    else:
-        accession_tracker_obj = {
-            "accession": accession,
-            "timestamp": await get_timestamp(),
+    embedded_docs = {}
+    for (cname, doc_ids) in get_embedded_ids(parent_document).items():
+        collection = client[config.db_name][cname]
+        async for doc in collection.find({"id": {"$in": doc_ids}}, {"_id": 0}):
+            embedded_docs[doc["alias"]] = (cname, doc)
+    return embedded_docs
+
+
+def _without_generated_fields(value: Any) -> Any:
+    """Remove the fields that are generated on each write from a document,
+    including the documents nested in it, to compare its content."""
+    if isinstance(value, dict):
+        return {
+            key: _without_generated_fields(item)
+            for key, item in value.items()
+            if key not in {"_id", "id", "creation_date", "update_date"}
         }
-        await collection.insert_one(accession_tracker_obj)
-    client.close()
-    return accession
+    if isinstance(value, list):
+        return [_without_generated_fields(item) for item in value]
+    return value
 
 
-async def _generate_accession(collection_name: str) -> str:
+def _is_changed(doc: Dict, old_doc: Dict) -> bool:
+    """Whether the content of a document differs from the stored document"""
+    if doc["id"] != old_doc["id"]:
+        return True
+    return _without_generated_fields(doc) != _without_generated_fields(old_doc)
+
+
+async def assign_accessions(
+    records: Dict[str, List],
+    config: Config = CONFIG,
+    session: Optional[AsyncIOMotorClientSession] = None,
+):
     """
-    Generate an accession for a collection.
+    Assign new accessions to the records that do not have one yet, allocating
+    the accessions of all collections concurrently, or one collection after the
+    other within a transaction.
 
     Args:
-        collection_name: The name of the collection
-
-    Returns:
-        A new accession
+        records: The records keyed by collection name
+        config: Runtime configuration
+        session: The session of the transaction in which the accessions are
+            recorded, if any
 
     """
-    special_accession_prefix = {
-        "DataAccessPolicy": "DAP",
-        "DataAccessCommittee": "DAC",
+    unaccessioned_records = {
+        key: [x for x in record_list if not x.get("accession")]
+        for (key, record_list) in records.items()
+        if key in ACCESSIONED_ENTITIES
     }
-    reference = random.randint(1, 999_999_999_999)  # nosec
-    if collection_name in special_accession_prefix:
-        collection_abbr = special_accession_prefix.get(collection_name)
+    if session is None:
+        accession_lists = await asyncio.gather(
+            *(
+                generate_accessions(
+                    collection_name=key, count=len(record_list), config=config
+                )
+                for (key, record_list) in unaccessioned_records.items()
+            )
+        )
     else:
-        collection_abbr = collection_name[:3].upper()
-    accession = f"GHGA:{collection_abbr}{str(reference).zfill(12)}"
-    return accession
-
-
-async def parse_document(document: Dict) -> Dict:
-    """Given a document, identify the embeded documents and extract them
-    as the separate documents. Add the identifier and creation/update date to each
-    of the objects.
+        # the operations of a transaction cannot run concurrently
+        accession_lists = [
+            await generate_accessions(
+                collection_name=key,
+                count=len(record_list),
+                config=config,
+                session=session,
+            )
+            for (key, record_list) in unaccessioned_records.items()
+        ]
+    for record_list, accessions in zip(unaccessioned_records.values(), accession_lists):
+        for record, accession in zip(record_list, accessions):
+            record["accession"] = accession
+
+
+@contextlib.asynccontextmanager
+async def _write_transaction(
+    config: Config = CONFIG,
+) -> AsyncIterator[Optional[AsyncIOMotorClientSession]]:
+    """
+    Start a transaction for the writes of a Submission update and yield its
+    session. If ``config.submission_update_transactions`` is not set or the
+    server is a standalone server, which does not support transactions, ``None``
+    is yielded and the writes are done without a transaction.
 
     Args:
-        document: The original document
-
-    Returns
-        The dictionary of embedded documents with alias as a key
+        config: Runtime configuration
 
     """
-    embedded_docs = {}
-    for field in document.keys():
-        if field.startswith("has_") and field not in {"has_attribute"}:
-            if field not in embedded_fields:
-                continue
-            cname = field.split("_", 1)[1]
-            formatted_cname = stringcase.pascalcase(cname)
-            if document[field] is None:
-                continue
-            if not isinstance(document[field], list):
-                doc = document[field]
-                embedded_docs[doc["alias"]] = (
-                    formatted_cname,
-                    await add_create_fields(doc),
-                )
-            else:
-                for doc in document[field]:
-                    embedded_docs[doc["alias"]] = (
-                        formatted_cname,
-                        await add_create_fields(doc),
-                    )
+    if not (
+        config.submission_update_transactions and await supports_transactions(config)
+    ):
+        yield None
+        return
+    client = await get_db_client(config)
+    async with await client.start_session() as session:
+        async with session.start_transaction():
+            yield session
 
-    return embedded_docs
 
+async def _bulk_write(
+    operations: Dict[str, List],
+    config: Config = CONFIG,
+    session: Optional[AsyncIOMotorClientSession] = None,
+):
+    """
+    Apply write operations with one unordered bulk write per collection.
 
-async def link_embedded(docs: Dict) -> Dict:
-    """Given a dictionary of embedded documents linked by the alias,
-    substitute the alias references by UUID references.
+    Within a transaction, the bulk writes are done one after the other,
+    otherwise concurrently.
 
     Args:
-        docs: The dictionary of documents linked by alias
-
-    Returns
-        The dictionary of documents linked by UUID ids
+        operations: The write operations keyed by collection name
+        config: Runtime configuration
+        session: The session of the transaction, if any
 
     """
+    client = await get_db_client(config)
+    operations = {key: value for (key, value) in operations.items() if value}
+    if session is not None:
+        for (cname, operation_list) in operations.items():
+            await client[config.db_name][cname].bulk_write(
+                operation_list, ordered=False, session=session
+            )
+    else:
+        await asyncio.gather(
+            *(
+                client[config.db_name][cname].bulk_write(operation_list, ordered=False)
+                for (cname, operation_list) in operations.items()
+            )
+        )
 
-    for alias in docs.keys():
-        (doc_type, doc) = docs[alias]
-        for field in doc.keys():
-            if field.startswith("has_") and field not in {"has_attribute"}:
-                if field not in embedded_fields:
-                    continue
-                doc[field] = await replace_reference(doc[field], docs)
-        docs[alias] = (doc_type, doc)
 
-    return docs
+def _get_reference_edge_changes(
+    collection_name: str, document: Optional[Dict], old_document: Optional[Dict]
+) -> List:
+    """
+    Get the write operations on the reverse-reference collection for the
+    reference edges that were added or removed by a write of a document.
 
+    Args:
+        collection_name: The collection of the document
+        document: The written document, ``None`` if it was deleted
+        old_document: The stored document, ``None`` if it was inserted
 
-async def replace_reference(reference, docs: Dict) -> Dict:
-    """Given a reference/list of references via aliases ,
-    substitute the alias references by UUID references.
+    Returns:
+        The write operations
+
+    """
+    if document is None:
+        return [DeleteMany({"collection": collection_name, "id": old_document["id"]})]
+    edges = get_reference_edges(collection_name, document)
+    if old_document is None:
+        return [InsertOne(edge) for edge in edges]
+    # the fields of the edges are strings, so their items can be compared as sets
+    new_edges = {tuple(edge.items()) for edge in edges}
+    old_edges = {
+        tuple(edge.items())
+        for edge in get_reference_edges(collection_name, old_document)
+    }
+    return [DeleteMany(dict(edge)) for edge in old_edges - new_edges] + [
+        InsertOne(dict(edge)) for edge in new_edges - old_edges
+    ]
+
+
+def _get_field_changes(document: Dict, old_document: Dict) -> Dict:
+    """Get the update of a stored document to the fields of a new document"""
+    changes: Dict[str, Dict] = {}
+    for (key, value) in document.items():
+        if key != "_id" and (key not in old_document or old_document[key] != value):
+            changes.setdefault("$set", {})[key] = value
+    for key in old_document.keys():
+        if key != "_id" and key not in document:
+            changes.setdefault("$unset", {})[key] = ""
+    return changes
+
+
+def _get_embedded_document_changes(
+    docs: Dict,
+    old_docs: Dict,
+    operations: Dict[str, List],
+    changed_ids: Dict[str, List],
+    counts: Dict[str, int],
+) -> Dict[str, List]:
+    """
+    Add the write operations for the embedded documents of a Submission that were
+    changed or removed, and get the documents that were added.
 
     Args:
-        reference: Reference by alias
-        docs: The dictionary of documents linked by alias
+        docs: Dictionary of new documents, including the parent document
+        old_docs: Dictionary of stored embedded documents
+        operations: The write operations keyed by collection name, to add to
+        changed_ids: The IDs of the written documents keyed by collection name,
+            to add to
+        counts: The numbers of inserted, replaced and deleted documents, to
+            add to
 
-    Returns
-        References by UUID ids
+    Returns:
+        The added documents keyed by collection name
 
     """
-    new_reference = reference
-    if isinstance(reference, str):
-        if reference in docs.keys():
-            (_, referenced_doc) = docs[reference]
-            new_reference = referenced_doc["id"]
-    elif isinstance(reference, list):
-        new_list = []
-        for ref in reference:
-            if ref in docs.keys():
-                (_, referenced_doc) = docs[ref]
-                new_list.append(referenced_doc["id"])
-        new_reference = new_list
-
-    return new_reference
-
-
-async def update_document(parent_document, docs: Dict, old_document=None) -> Dict:
-    """Given a parent document and a dictionary of embedded documents,
-    update the embedded documents within the parent one,
-    then add the parent document to the dictionary.
+    edge_operations = operations[REFERENCE_COLLECTION_NAME]
+    new_records: Dict[str, List] = {}
+    new_ids: Set[str] = set()
+    for alias, (cname, doc) in docs.items():
+        if alias == "parent":
+            continue
+        new_ids.add(doc["id"])
+        old = old_docs.get(alias)
+        if old is None or old[1]["id"] != doc["id"]:
+            new_records.setdefault(cname, []).append(doc)
+        elif _is_changed(doc, old[1]):
+            operations.setdefault(cname, []).append(ReplaceOne({"id": doc["id"]}, doc))
+            edge_operations.extend(_get_reference_edge_changes(cname, doc, old[1]))
+            changed_ids.setdefault(cname, []).append(doc["id"])
+            counts["replaced"] += 1
+
+    for (cname, old_doc) in old_docs.values():
+        if old_doc["id"] not in new_ids:
+            operations.setdefault(cname, []).append(DeleteOne({"id": old_doc["id"]}))
+            edge_operations.extend(_get_reference_edge_changes(cname, None, old_doc))
+            changed_ids.setdefault(cname, []).append(old_doc["id"])
+            counts["deleted"] += 1
+    return new_records
+
+
+def _add_new_records(
+    new_records: Dict[str, List],
+    operations: Dict[str, List],
+    changed_ids: Dict[str, List],
+    counts: Dict[str, int],
+):
+    """Add the write operations for the added documents, which have accessions"""
+    edge_operations = operations[REFERENCE_COLLECTION_NAME]
+    for (cname, record_list) in new_records.items():
+        operations.setdefault(cname, []).extend(InsertOne(x) for x in record_list)
+        for record in record_list:
+            edge_operations.extend(_get_reference_edge_changes(cname, record, None))
+        changed_ids.setdefault(cname, []).extend(x["id"] for x in record_list)
+        counts["inserted"] += len(record_list)
+
+
+def _add_parent_changes(
+    parent: Tuple[str, Dict],
+    old_parent_document: Dict,
+    operations: Dict[str, List],
+    changed_ids: Dict[str, List],
+    counts: Dict[str, int],
+):
+    """
+    Add the write operation for the changed fields of the parent document. The
+    update date of the parent records every change of the Submission, including
+    changes of its embedded documents only, so it is written whenever any
+    document changed; it is then the only field that is set. If nothing changed,
+    the stored update date is kept.
+    """
+    (parent_cname, parent_document) = parent
+    if not (changed_ids or _is_changed(parent_document, old_parent_document)):
+        parent_document["update_date"] = old_parent_document["update_date"]
+        return
+    operations.setdefault(parent_cname, []).append(
+        UpdateOne(
+            {"id": parent_document["id"]},
+            _get_field_changes(parent_document, old_parent_document),
+        )
+    )
+    operations[REFERENCE_COLLECTION_NAME].extend(
+        _get_reference_edge_changes(parent_cname, parent_document, old_parent_document)
+    )
+    changed_ids.setdefault(parent_cname, []).append(parent_document["id"])
+    counts["replaced"] += 1
+
+
+async def store_document_changes(
+    docs: Dict, old_docs: Dict, old_parent_document: Dict, config: Config = CONFIG
+) -> Dict:
+    """
+    Stores the changes of submission documents to metadata store
+
+    The new documents are compared with the stored documents by alias, and
+    only the documents that were added, changed or removed are written, with
+    one bulk write per collection. Only the changed fields of the parent
+    document and the added or removed reverse references are written. All
+    writes, including the accessions handed out to the new documents, are done
+    in a single transaction unless the server does not support transactions
+    (see ``_write_transaction``).
 
     Args:
-        parent_document: The parent document
+        docs: Dictionary of new documents, including the parent document
+        old_docs: Dictionary of stored embedded documents
+        old_parent_document: The stored parent document
+        config: Runtime configuration
 
     Returns
-        The dictionary of all documents (parent and embedded documents)
+        The number of inserted, replaced and deleted documents
 
     """
-    if old_document is None:
-        parent_document = await add_create_fields(parent_document)
-        parent_document["submission_status"] = "in_progress"
-    else:
-        parent_document = await add_update_fields(parent_document, old_document)
-        parent_document["submission_status"] = old_document["submission_status"]
-
-    for field in parent_document.keys():
-        if field.startswith("has_") and field not in {"has_attribute"}:
-            if field not in embedded_fields:
-                continue
-            if parent_document[field] is None:
-                continue
-            if not isinstance(parent_document[field], list):
-                doc = parent_document[field]
-                if not isinstance(doc, Dict):
-                    doc = doc.dict()
-                (_, referenced_doc) = docs[doc["alias"]]
-                parent_document[field] = referenced_doc["id"]
-            else:
-                new_list = []
-                for doc in parent_document[field]:
-                    if not isinstance(doc, Dict):
-                        doc = doc.dict()
-                    (_, referenced_doc) = docs[doc["alias"]]
-                    new_list.append(referenced_doc["id"])
-                parent_document[field] = new_list
-    docs["parent"] = ["Submission", parent_document]
-    return docs
-
-
-async def delete_document(
-    parent_document: Dict, parent_cname: str, config: Config = CONFIG
+    operations: Dict[str, List] = {REFERENCE_COLLECTION_NAME: []}
+    changed_ids: Dict[str, List] = {}
+    counts = {"inserted": 0, "replaced": 0, "deleted": 0}
+    new_records = _get_embedded_document_changes(
+        docs, old_docs, operations, changed_ids, counts
+    )
+
+    start = time.perf_counter()
+    async with _write_transaction(config) as session:
+        await assign_accessions(new_records, config, session=session)
+        _add_new_records(new_records, operations, changed_ids, counts)
+        _add_parent_changes(
+            docs["parent"], old_parent_document, operations, changed_ids, counts
+        )
+        await _bulk_write(operations, config, session=session)
+    logging.info(
+        "Stored %d inserted, %d replaced and %d deleted records in %.1f ms",
+        counts["inserted"],
+        counts["replaced"],
+        counts["deleted"],
+        (time.perf_counter() - start) * 1000,
+    )
+
+    cache = get_entity_cache(config)
+    for (cname, doc_ids) in changed_ids.items():
+        cache.invalidate(cname, doc_ids)
+    return counts
+
+
+async def insert_records(
+    collection_name: str, records: List[Dict], config: Config = CONFIG
 ):
-    """Deletes a parent document together with embedded documents from the database.
+    """
+    Insert records into a collection with unordered bulk writes of at most
+    ``config.ingestion_batch_size`` records, store their reverse references,
+    and log the time it took.
 
     Args:
-        parent_document: The parent document
+        collection_name: The name of the collection
+        records: The records to insert
+        config: Runtime configuration
 
     """
-
     client = await get_db_client(config)
-
-    collection = client[config.db_name][parent_cname]
-    collection.delete_one({"id": parent_document["id"]})
-
-    for field in parent_document.keys():
-        if field.startswith("has_") and field not in {"has_attribute"}:
-            if field not in embedded_fields:
-                continue
-            if parent_document[field] is None:
-                continue
-            cname = field.split("_", 1)[1]
-            formatted_cname = stringcase.pascalcase(cname)
-            collection = client[config.db_name][formatted_cname]
-            if not isinstance(parent_document[field], list):
-                doc_id = parent_document[field]
-                await collection.delete_one({"id": doc_id})
-            else:
-                for doc_id in parent_document[field]:
-                    await collection.delete_one({"id": doc_id})
-
-    client.close()
+    collection = client[config.db_name][collection_name]
+    batch_size = max(config.ingestion_batch_size, 1)
+    start = time.perf_counter()
+    for offset in range(0, len(records), batch_size):
+        batch = records[offset : offset + batch_size]
+        await collection.bulk_write(
+            [InsertOne(record) for record in batch], ordered=False
+        )
+    await add_references({collection_name: records}, config)
+    logging.info(
+        "Inserted %d records into %s in %.1f ms",
+        len(records),
+        collection_name,
+        (time.perf_counter() - start) * 1000,
+    )
 
 
 async def store_document(docs: Dict, config: Config = CONFIG):
     """
     Stores submission documents to metadata store
 
+    The accessions of all records are allocated up front, and the records of
+    the different collections are then inserted concurrently in batches.
 
     Args:
         docs: Dictionary of documents to be stored
+        config: Runtime configuration
 
     """
 
@@ -453,75 +600,22 @@ async def store_document(docs: Dict, config: Config = CONFIG):
             records[cname] = []
         records[cname].append(record)
 
-    client = await get_db_client(config)
-    for (key, record_list) in records.items():
-        if key in ACCESSIONED_ENTITIES:
-            for record in record_list:
-                if "accession" in record and record["accession"]:
-                    continue
-                accession = await generate_accession(collection_name=key, config=config)
-                record["accession"] = accession
+    await assign_accessions(records, config)
 
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            insert_records(collection_name=key, records=record_list, config=config)
+            for (key, record_list) in records.items()
+        )
+    )
+    logging.info(
+        "Stored %d records in %d collections in %.1f ms",
+        sum(len(record_list) for record_list in records.values()),
+        len(records),
+        (time.perf_counter() - start) * 1000,
+    )
+
+    cache = get_entity_cache(config)
     for (key, record_list) in records.items():
-        collection = client[config.db_name][key]
-        if len(record_list) == 1:
-            await collection.insert_one(record_list[0])
-        else:
-            await collection.insert_many(record_list)
-
-    client.close()
-
-
-async def add_create_fields(document: Dict) -> Dict:
-    """Add uuid identifier and create/update date to a document
-
-     Args:
-        document: Original document
-
-    Returns
-        Annotated document
-
-    """
-    if not isinstance(document, Dict):
-        document = document.__dict__
-    document["id"] = await generate_uuid()
-    document["creation_date"] = await get_timestamp()
-    document["update_date"] = document["creation_date"]
-    if document["schema_type"].startswith("Create"):
-        document["schema_type"] = document["schema_type"].replace("Create", "", 1)
-    for field in document.keys():
-        if (
-            field.startswith("has_")
-            and field not in {"has_attribute"}
-            and field not in embedded_fields
-        ):
-            if document[field] is None:
-                continue
-            if not isinstance(document[field], list):
-                if not isinstance(document[field], str):
-                    document[field] = await add_create_fields(document[field])
-            else:
-                if not isinstance(document[field][0], str):
-                    new_list = []
-                    for doc in document[field]:
-                        doc = await add_create_fields(doc)
-                        new_list.append(doc)
-                    document[field] = new_list
-    return document
-
-
-async def add_update_fields(document, old_document: Dict) -> Dict:
-    """Add current update date to a document,
-    uuid and create date are taken from the original document
-
-     Args:
-        document: Original document
-
-    Returns
-        Annotated document
-
-    """
-    document["id"] = old_document["id"]
-    document["creation_date"] = old_document["creation_date"]
-    document["update_date"] = await get_timestamp()
-    return document
+        cache.invalidate(key, [record["id"] for record in record_list])
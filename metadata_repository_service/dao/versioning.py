@@ -0,0 +1,326 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Versions of the representations of entities, for conditional requests"""
+
+# pylint: disable=too-many-arguments
+
+import datetime
+import hashlib
+import json
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from metadata_repository_service.config import CONFIG, Config
+from metadata_repository_service.dao.db import get_db_client
+from metadata_repository_service.dao.embedding import (
+    CONTINUATIONS_FIELD,
+    EmbeddingBudget,
+    EmbeddingPlan,
+    FieldSelection,
+    embed_references_many,
+    get_embedding_plan,
+    get_field_selection,
+    get_projection,
+)
+from metadata_repository_service.dao.utils import (
+    MODEL_CLASSES,
+    get_model_field_names,
+    get_reference_collection,
+)
+
+
+class EntityVersion(NamedTuple):
+    """The version of the representation of an entity, for conditional requests"""
+
+    # the strong entity tag, quoted as in the ``ETag`` header
+    etag: str
+    # the latest update date of the entity and of its embedded entities, if known
+    last_modified: Optional[datetime.datetime]
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime.datetime]:
+    """
+    Parse an ISO 8601 timestamp as stored in the metadata store.
+
+    Args:
+        value: The timestamp, naive timestamps being taken to be in UTC
+
+    Returns:
+        The timestamp in UTC, or ``None`` if the value is not a valid timestamp
+
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        timestamp = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp.astimezone(datetime.timezone.utc)
+
+
+async def get_entity_version(
+    identifier: str,
+    field: str,
+    collection_name: str,
+    embedded: bool = False,
+    fields: Optional[List[str]] = None,
+    embed: Optional[List[str]] = None,
+    depth: Optional[int] = None,
+    config: Config = CONFIG,
+) -> Optional[EntityVersion]:
+    """
+    Given an identifier, field name and collection name, get the version of the
+    representation of the corresponding document that ``get_entity_document``
+    would return for the same arguments, to answer conditional requests without
+    retrieving the document itself.
+
+    The references are resolved as by ``get_entity_document``, within the same
+    budget of embedded documents, but only the ID, the update date and the
+    references to embed are retrieved for each document. The sizes of the documents are not known, so that the version differs from the
+    version of a document that was truncated to the byte budget.
+
+    Args:
+        identifier: The identifier
+        field: The name of the field
+        collection_name: The collection in the metadata store that has the document
+        embedded: Whether or not to embed references. ``False``, by default.
+        fields: The fields to return in addition to ``id``, all by default
+        embed: The reference fields to embed, all by default. Implies ``embedded``.
+        depth: The maximum number of levels of references to embed, unlimited by
+            default. Implies ``embedded``.
+        config: Rumtime configuration
+
+    Returns
+        The version, or ``None`` if the document does not exist
+
+    Raises:
+        ValueError: If a field or reference field is unknown
+
+    """
+    model_class = MODEL_CLASSES.get(collection_name)
+    embedding = get_embedding_plan(embedded, embed, depth, model_class)
+    selection = get_field_selection(fields, model_class, embedding=embedding)
+    version_selection = _get_version_selection(
+        collection_name, selection, embedding, {}
+    )
+    client = await get_db_client(config)
+    collection = client[config.db_name][collection_name]
+    document = await collection.find_one(
+        {field: identifier}, {"_id": 0, **get_projection(version_selection)}
+    )
+    if document is None:
+        return None
+    if embedding is not None:
+        [document] = await embed_references_many(
+            [document],
+            config=config,
+            selection=version_selection,
+            embedding=embedding,
+            budget=EmbeddingBudget(
+                max_nodes=config.embedding_max_nodes, max_bytes=sys.maxsize
+            ),
+        )
+    return _get_version(collection_name, field, document, selection, embedding, config)
+
+
+def get_document_version(
+    document: Dict,
+    field: str,
+    collection_name: str,
+    embedded: bool = False,
+    fields: Optional[List[str]] = None,
+    embed: Optional[List[str]] = None,
+    depth: Optional[int] = None,
+    config: Config = CONFIG,
+) -> EntityVersion:
+    """
+    Get the version of a document that ``get_entity_document`` returned, which is
+    the version that ``get_entity_version`` gets for the same arguments unless
+    the document was truncated to the byte budget.
+
+    Args:
+        document: The document
+        field: The name of the field the document was looked up by
+        collection_name: The collection in the metadata store that has the document
+        embedded: Whether or not references were embedded. ``False``, by default.
+        fields: The fields requested in addition to ``id``, all by default
+        embed: The reference fields embedded, all by default. Implies ``embedded``.
+        depth: The maximum number of levels of references embedded, unlimited by
+            default. Implies ``embedded``.
+        config: Rumtime configuration
+
+    Returns
+        The version
+
+    Raises:
+        ValueError: If a field or reference field is unknown
+
+    """
+    model_class = MODEL_CLASSES.get(collection_name)
+    embedding = get_embedding_plan(embedded, embed, depth, model_class)
+    selection = get_field_selection(fields, model_class, embedding=embedding)
+    return _get_version(collection_name, field, document, selection, embedding, config)
+
+
+def add_version_fields(
+    selection: Optional[FieldSelection],
+) -> Optional[FieldSelection]:
+    """
+    Add the update date to a field selection and to the selections of the
+    documents embedded in place of its references, to get the version of the
+    selected documents
+    """
+    if selection is None:
+        return None
+    return {
+        "update_date": None,
+        **{
+            field_name: add_version_fields(subselection)
+            for field_name, subselection in selection.items()
+        },
+    }
+
+
+def _get_version_selection(
+    collection_name: str,
+    selection: Optional[FieldSelection],
+    embedding: Optional[EmbeddingPlan],
+    version_selections: Dict[Tuple, FieldSelection],
+) -> FieldSelection:
+    """
+    Get the selection of the fields that determine the version of the documents
+    of a collection: the update date and the references to embed, with the
+    selections for the embedded documents. A version selection is built once per
+    field selection and embedding plan, so that the referenced documents are
+    retrieved per version selection as they are per field selection.
+    """
+    key = (
+        collection_name,
+        id(selection),
+        None if embedding is None else (id(embedding.relations), embedding.depth),
+    )
+    version_selection = version_selections.get(key)
+    if version_selection is not None:
+        return version_selection
+    version_selection = {"update_date": None}
+    model_class = MODEL_CLASSES.get(collection_name)
+    if embedding is not None and model_class is not None:
+        for field_name in get_model_field_names(model_class):
+            referenced_cname = get_reference_collection(field_name)
+            field_embedding = embedding.follow(field_name)
+            if referenced_cname is None or field_embedding is None:
+                continue
+            if selection is not None and field_name not in selection:
+                continue
+            version_selection[field_name] = _get_version_selection(
+                referenced_cname,
+                None if selection is None else selection[field_name],
+                field_embedding,
+                version_selections,
+            )
+    version_selections[key] = version_selection
+    return version_selection
+
+
+def _get_version(
+    collection_name: str,
+    field: str,
+    document: Dict,
+    selection: Optional[FieldSelection],
+    embedding: Optional[EmbeddingPlan],
+    config: Config,
+) -> EntityVersion:
+    """
+    Get the version of a document with its embedded documents: the entity tag is
+    a hash of the requested representation, of the IDs and update dates of the
+    documents, and of the embedded references, so that it changes whenever one of
+    the documents is updated or a reference is added or removed.
+    """
+    versions: Set[Tuple[str, str, str]] = set()
+    edges: Set[Tuple[str, str, str, Tuple[str, ...], str]] = set()
+    _collect_versions(collection_name, document, embedding, versions, edges)
+    digest = hashlib.sha256(
+        json.dumps(
+            [
+                [
+                    collection_name,
+                    field,
+                    None if embedding is None else list(embedding),
+                    selection,
+                    None
+                    if embedding is None
+                    else [config.embedding_max_nodes, config.embedding_max_bytes],
+                ],
+                sorted(versions),
+                sorted(edges),
+            ],
+            sort_keys=True,
+        ).encode()
+    ).hexdigest()
+    timestamps = [
+        timestamp
+        for timestamp in (_parse_timestamp(x[2]) for x in versions)
+        if timestamp is not None
+    ]
+    return EntityVersion(
+        etag=f'"{digest[:32]}"',
+        last_modified=max(timestamps) if timestamps else None,
+    )
+
+
+def _collect_versions(
+    collection_name: str,
+    document: Dict,
+    embedding: Optional[EmbeddingPlan],
+    versions: Set[Tuple[str, str, str]],
+    edges: Set[Tuple[str, str, str, Tuple[str, ...], str]],
+):
+    """
+    Collect the IDs and update dates of a document and of the documents embedded
+    in it, and the references to embed, with the cursor of the array of references
+    if it was truncated. References that were not embedded are given by their ID,
+    unresolved references as empty strings.
+    """
+    versions.add(
+        (collection_name, document["id"], str(document.get("update_date") or ""))
+    )
+    if embedding is None:
+        return
+    continuations = document.get(CONTINUATIONS_FIELD, {})
+    for field_name, value in document.items():
+        referenced_cname = get_reference_collection(field_name)
+        field_embedding = embedding.follow(field_name)
+        if referenced_cname is None or field_embedding is None:
+            continue
+        references = []
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, dict):
+                references.append(item["id"])
+                _collect_versions(
+                    referenced_cname, item, field_embedding, versions, edges
+                )
+            else:
+                references.append("" if item is None else str(item))
+        edges.add(
+            (
+                collection_name,
+                document["id"],
+                field_name,
+                tuple(references),
+                continuations.get(field_name, ""),
+            )
+        )
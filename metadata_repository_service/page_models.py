@@ -0,0 +1,93 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Models for paginated lists and batches of entities and their references"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class EntityPage(BaseModel):
+    """
+    A page of entities, restricted to the requested fields.
+    """
+
+    items: List[Dict[str, Any]] = Field(
+        ..., description="The entities of the page, with the requested fields only."
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="The cursor to pass as 'after' to get the next page. "
+        + "Not set on the last page.",
+    )
+
+
+class EntityBatchRequest(BaseModel):
+    """
+    The IDs or accessions of a batch of entities.
+    """
+
+    ids: List[str] = Field(
+        ..., description="The IDs or accessions of the entities to look up."
+    )
+
+
+class EntityBatchItem(BaseModel):
+    """
+    The result of looking up one ID or accession of a batch.
+    """
+
+    identifier: str = Field(..., description="The ID or accession that was looked up.")
+    found: bool = Field(..., description="Whether a matching entity was found.")
+    entity: Optional[Dict[str, Any]] = Field(
+        None, description="The entity. Not set if it was not found."
+    )
+
+
+class EntityBatch(BaseModel):
+    """
+    A batch of entities, in the order of the requested IDs or accessions.
+    """
+
+    items: List[EntityBatchItem] = Field(
+        ...,
+        description="One item per requested ID or accession, in the order of "
+        + "the request.",
+    )
+
+
+class EntityReference(BaseModel):
+    """
+    A reference from an entity to another entity.
+    """
+
+    collection: str = Field(
+        ..., description="The collection of the referencing entity."
+    )
+    id: str = Field(..., description="The ID of the referencing entity.")
+    field: str = Field(..., description="The field of the reference.")
+
+
+class ReferencePage(BaseModel):
+    """
+    A page of the references to an entity from other entities.
+    """
+
+    items: List[EntityReference] = Field(..., description="The references of the page.")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="The cursor to pass as 'after' to get the next page. "
+        + "Not set on the last page.",
+    )
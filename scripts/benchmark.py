@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks for performance critical code paths of the service.
+
+The benchmarks write synthetic metadata to a dedicated database
+that is dropped afterwards.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from functools import partial
+from typing import Awaitable, Callable, Dict, List
+
+import typer
+from fastapi.encoders import jsonable_encoder
+
+from metadata_repository_service.api.responses import entity_response
+from metadata_repository_service.config import Config
+from metadata_repository_service.creation_models import CreateSubmission
+from metadata_repository_service.dao.dataset_summary import compute_dataset_summary
+from metadata_repository_service.dao.db import close_db, get_db_client
+from metadata_repository_service.dao.entities import get_entity, get_entity_document
+from metadata_repository_service.dao.submission import add_submission
+from metadata_repository_service.dao.submission_planner import plan_submission
+from metadata_repository_service.dao.utils import build_model
+from metadata_repository_service.models import Dataset
+
+cli = typer.Typer()
+
+
+def _new_record(schema_type: str, **fields) -> Dict:
+    """Create a synthetic record of the given type"""
+    record_id = str(uuid.uuid4())
+    record = {
+        "id": record_id,
+        "alias": f"{schema_type}:{record_id}",
+        "schema_type": schema_type,
+        "creation_date": "2022-01-01T00:00:00",
+        "update_date": "2022-01-01T00:00:00",
+    }
+    record.update(fields)
+    return record
+
+
+def generate_dataset_graph(n_files: int, n_samples: int) -> Dict[str, List[Dict]]:
+    """
+    Generate the records of a Dataset and of a Submission that both reference
+    ``n_files`` Files and ``n_samples`` Samples, together with the Experiments,
+    Individuals, Biospecimens, Protocols and Studies that link them.
+
+    Returns:
+        The records keyed by collection name
+
+    """
+    records: Dict[str, List[Dict]] = {}
+
+    def add(collection_name: str, record: Dict) -> Dict:
+        records.setdefault(collection_name, []).append(record)
+        return record
+
+    project = add("Project", _new_record("Project", title="Benchmark project"))
+    publications = [
+        add("Publication", _new_record("Publication", title=f"Publication {i}"))
+        for i in range(2)
+    ]
+    study = add(
+        "Study",
+        _new_record(
+            "Study",
+            title="Benchmark study",
+            has_project=project["id"],
+            has_publication=[x["id"] for x in publications],
+        ),
+    )
+    members = [
+        add("Member", _new_record("Member", email=f"member{i}@example.org"))
+        for i in range(3)
+    ]
+    dac = add(
+        "DataAccessCommittee",
+        _new_record("DataAccessCommittee", has_member=[x["id"] for x in members]),
+    )
+    dap = add(
+        "DataAccessPolicy",
+        _new_record("DataAccessPolicy", has_data_access_committee=dac["id"]),
+    )
+    protocols = [
+        add("Protocol", _new_record("LibraryPreparationProtocol", library_name="lib")),
+        add("Protocol", _new_record("SequencingProtocol", instrument_model="model")),
+    ]
+    files = [
+        add("File", _new_record("File", name=f"file{i}.bam", format="bam", size=i))
+        for i in range(n_files)
+    ]
+    samples = []
+    experiments = []
+    for i in range(n_samples):
+        individual = add("Individual", _new_record("Individual", sex="female"))
+        biospecimen = add(
+            "Biospecimen",
+            _new_record("Biospecimen", has_individual=individual["id"]),
+        )
+        sample = add(
+            "Sample",
+            _new_record(
+                "Sample",
+                name=f"Sample {i}",
+                has_individual=individual["id"],
+                has_biospecimen=biospecimen["id"],
+            ),
+        )
+        samples.append(sample)
+        experiments.append(
+            add(
+                "Experiment",
+                _new_record(
+                    "Experiment",
+                    has_study=study["id"],
+                    has_sample=[sample["id"]],
+                    has_protocol=[x["id"] for x in protocols],
+                    has_file=[x["id"] for x in files[i::n_samples]],
+                ),
+            )
+        )
+    add(
+        "Dataset",
+        _new_record(
+            "Dataset",
+            title="Benchmark dataset",
+            has_study=[study["id"]],
+            has_experiment=[x["id"] for x in experiments],
+            has_sample=[x["id"] for x in samples],
+            has_file=[x["id"] for x in files],
+            has_data_access_policy=dap["id"],
+            has_publication=[x["id"] for x in publications],
+        ),
+    )
+    add(
+        "Submission",
+        _new_record(
+            "Submission",
+            has_study=study["id"],
+            has_project=project["id"],
+            has_sample=[x["id"] for x in samples],
+            has_biospecimen=[x["id"] for x in records["Biospecimen"]],
+            has_individual=[x["id"] for x in records["Individual"]],
+            has_experiment=[x["id"] for x in experiments],
+            has_protocol=[x["id"] for x in protocols],
+            has_file=[x["id"] for x in files],
+            has_publication=[x["id"] for x in publications],
+        ),
+    )
+    return records
+
+
+def generate_submission(n_entities: int) -> Dict:
+    """
+    Generate a Submission with about ``n_entities`` new entities: a Study,
+    a Project and two Protocols, together with Individuals, Biospecimens,
+    Samples, Experiments and Files in equal numbers.
+
+    Returns:
+        The Submission in the format expected by ``POST /submissions``
+
+    """
+
+    def alias() -> str:
+        return str(uuid.uuid4())
+
+    study_alias = alias()
+    project_alias = alias()
+    protocols = [
+        {
+            "alias": alias(),
+            "schema_type": "CreateLibraryPreparationProtocol",
+            "description": "Library preparation",
+            "library_name": "lib",
+            "library_layout": "paired-end",
+            "library_type": "WGS",
+            "library_selection": "RANDOM",
+            "library_preparation": "Benchmark",
+            "library_preparation_kit_retail_name": "Benchmark",
+            "library_preparation_kit_manufacturer": "Benchmark",
+        },
+        {
+            "alias": alias(),
+            "schema_type": "CreateSequencingProtocol",
+            "description": "Sequencing",
+            "instrument_model": "model",
+        },
+    ]
+    submission: Dict = {
+        "schema_type": "CreateSubmission",
+        "has_study": {
+            "alias": study_alias,
+            "schema_type": "CreateStudy",
+            "title": "Benchmark study",
+            "description": "Benchmark study",
+            "type": "other",
+            "has_project": project_alias,
+        },
+        "has_project": {
+            "alias": project_alias,
+            "schema_type": "CreateProject",
+            "title": "Benchmark project",
+            "description": "Benchmark project",
+        },
+        "has_protocol": protocols,
+        "has_individual": [],
+        "has_biospecimen": [],
+        "has_sample": [],
+        "has_experiment": [],
+        "has_file": [],
+    }
+    for i in range(max((n_entities - 4) // 5, 1)):
+        individual = {"alias": alias(), "schema_type": "CreateIndividual"}
+        biospecimen = {
+            "alias": alias(),
+            "schema_type": "CreateBiospecimen",
+            "has_individual": individual["alias"],
+        }
+        sample = {
+            "alias": alias(),
+            "schema_type": "CreateSample",
+            "name": f"Sample {i}",
+            "has_individual": individual["alias"],
+            "has_biospecimen": biospecimen["alias"],
+        }
+        file = {
+            "alias": alias(),
+            "schema_type": "CreateFile",
+            "name": f"file{i}.bam",
+            "format": "bam",
+            "size": i,
+            "checksum": "0" * 32,
+            "checksum_type": "MD5",
+        }
+        experiment = {
+            "alias": alias(),
+            "schema_type": "CreateExperiment",
+            "title": f"Experiment {i}",
+            "description": f"Experiment {i}",
+            "has_study": study_alias,
+            "has_sample": [sample["alias"]],
+            "has_protocol": [x["alias"] for x in protocols],
+            "has_file": [file["alias"]],
+        }
+        submission["has_individual"].append(individual)
+        submission["has_biospecimen"].append(biospecimen)
+        submission["has_sample"].append(sample)
+        submission["has_file"].append(file)
+        submission["has_experiment"].append(experiment)
+    return submission
+
+
+async def _store_records(records: Dict[str, List[Dict]], config: Config):
+    """Write the records to the benchmark database"""
+    client = await get_db_client(config)
+    for collection_name, record_list in records.items():
+        collection = client[config.db_name][collection_name]
+        await collection.create_index("id", unique=True)
+        await collection.insert_many(record_list)
+
+
+async def _drop_database(config: Config):
+    """Drop the benchmark database"""
+    client = await get_db_client(config)
+    await client.drop_database(config.db_name)
+    await close_db()
+
+
+async def _time(func: Callable[[], Awaitable], repeat: int) -> List[float]:
+    """Run ``func`` ``repeat`` times and return the durations in seconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _report(label: str, durations: List[float]):
+    """Print the timing statistics of a benchmark"""
+    typer.echo(
+        f"  {label:<40} median {statistics.median(durations) * 1000:9.1f} ms"
+        + f"   min {min(durations) * 1000:9.1f} ms"
+    )
+
+
+async def _benchmark_embedding(config: Config, n_files: int, n_samples: int, repeat):
+    """Compare the strategies for embedding Dataset and Submission graphs"""
+    records = generate_dataset_graph(n_files=n_files, n_samples=n_samples)
+    await _store_records(records, config)
+    try:
+        for collection_name in ("Dataset", "Submission"):
+            entity_id = records[collection_name][0]["id"]
+            typer.echo(f"{collection_name} {entity_id}:")
+            strategies = {
+                "client-side resolver": [],
+                "aggregation pipeline": [collection_name],
+            }
+            for label, aggregation_collections in strategies.items():
+                strategy_config = config.copy(
+                    update={
+                        "embedding_aggregation_collections": aggregation_collections
+                    }
+                )
+
+                get_embedded = partial(
+                    get_entity,
+                    identifier=entity_id,
+                    field="id",
+                    collection_name=collection_name,
+                    embedded=True,
+                    config=strategy_config,
+                )
+                _report(label, await _time(get_embedded, repeat))
+    finally:
+        await _drop_database(config)
+
+
+async def _benchmark_dataset_summary(
+    config: Config, n_files: int, n_samples: int, repeat: int
+):
+    """Compare the strategies for computing a Dataset summary"""
+    records = generate_dataset_graph(n_files=n_files, n_samples=n_samples)
+    await _store_records(records, config)
+    try:
+        dataset_id = records["Dataset"][0]["id"]
+        typer.echo(f"Dataset {dataset_id}:")
+        for strategy in ("embedding", "aggregation"):
+            strategy_config = config.copy(update={"dataset_summary_strategy": strategy})
+            compute_summary = partial(
+                compute_dataset_summary, dataset_id=dataset_id, config=strategy_config
+            )
+            _report(strategy, await _time(compute_summary, repeat))
+    finally:
+        await _drop_database(config)
+
+
+async def _benchmark_submission_ingestion(
+    config: Config, sizes: List[int], repeat: int
+):
+    """Measure the throughput of storing new Submissions"""
+    try:
+        for n_entities in sizes:
+            submissions = [
+                CreateSubmission(**generate_submission(n_entities))
+                for _ in range(repeat)
+            ]
+            durations = []
+            for submission in submissions:
+                start = time.perf_counter()
+                await add_submission(submission, config=config)
+                durations.append(time.perf_counter() - start)
+            throughput = n_entities / statistics.median(durations)
+            _report(f"{n_entities} entities ({throughput:.0f}/s)", durations)
+    finally:
+        await _drop_database(config)
+
+
+async def _benchmark_submission_planner(sizes: List[int], repeat: int):
+    """Measure the time for planning the documents of new Submissions"""
+    for n_entities in sizes:
+        submission = CreateSubmission(**generate_submission(n_entities))
+        durations = []
+        for _ in range(repeat):
+            # the planner annotates the document in place
+            document = submission.dict()
+            start = time.perf_counter()
+            await plan_submission(document)
+            durations.append(time.perf_counter() - start)
+        throughput = n_entities / statistics.median(durations)
+        _report(f"{n_entities} entities ({throughput:.0f}/s)", durations)
+
+
+def _validated_response_body(document: Dict) -> bytes:
+    """Build the model object of a document and serialize it the way FastAPI
+    serializes a response model"""
+    content = jsonable_encoder(build_model(Dataset, document))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _trusted_response_body(document: Dict) -> bytes:
+    """Render a document without validation, as done by the GET routes"""
+    return entity_response(Dataset, document).body
+
+
+async def _benchmark_response_serialization(
+    config: Config, n_files: int, n_samples: int, repeat: int
+):
+    """Compare the CPU time for serializing an embedded Dataset response"""
+    records = generate_dataset_graph(n_files=n_files, n_samples=n_samples)
+    await _store_records(records, config)
+    try:
+        dataset_id = records["Dataset"][0]["id"]
+        document = await get_entity_document(
+            identifier=dataset_id,
+            field="id",
+            collection_name="Dataset",
+            embedded=True,
+            config=config,
+        )
+        typer.echo(f"Dataset {dataset_id}:")
+        for label, serialize in (
+            ("validated response model", _validated_response_body),
+            ("trusted rendering", _trusted_response_body),
+        ):
+            durations = []
+            for _ in range(repeat):
+                start = time.process_time()
+                body = serialize(document)
+                durations.append(time.process_time() - start)
+            _report(f"{label} ({len(body) / 1e6:.1f} MB)", durations)
+    finally:
+        await _drop_database(config)
+
+
+@cli.command()
+def embedding(
+    db_url: str = "mongodb://localhost:27017",
+    db_name: str = "metadata-store-benchmark",
+    n_files: int = 2000,
+    n_samples: int = 500,
+    repeat: int = 5,
+):
+    """
+    Compare the client-side resolver with the server-side aggregation pipeline
+    for retrieving fully embedded Dataset and Submission entities.
+    """
+    config = Config(db_url=db_url, db_name=db_name)
+    typer.echo(
+        f"Embedding benchmark with {n_files} files and {n_samples} samples "
+        + f"({repeat} repetitions):"
+    )
+    asyncio.run(_benchmark_embedding(config, n_files, n_samples, repeat))
+
+
+@cli.command()
+def dataset_summary(
+    db_url: str = "mongodb://localhost:27017",
+    db_name: str = "metadata-store-benchmark",
+    n_files: int = 20000,
+    n_samples: int = 2000,
+    repeat: int = 5,
+):
+    """
+    Compare computing a Dataset summary from the embedded Dataset with computing
+    it in an aggregation pipeline.
+    """
+    config = Config(db_url=db_url, db_name=db_name)
+    typer.echo(
+        f"Dataset summary benchmark with {n_files} files and {n_samples} samples "
+        + f"({repeat} repetitions):"
+    )
+    asyncio.run(_benchmark_dataset_summary(config, n_files, n_samples, repeat))
+
+
+@cli.command()
+def submission_ingestion(
+    db_url: str = "mongodb://localhost:27017",
+    db_name: str = "metadata-store-benchmark",
+    sizes: List[int] = typer.Option([1000, 10000, 100000]),
+    repeat: int = 3,
+    batch_size: int = 1000,
+):
+    """
+    Measure the throughput of storing new Submissions of different sizes,
+    as done by ``POST /submissions``.
+    """
+    config = Config(db_url=db_url, db_name=db_name, ingestion_batch_size=batch_size)
+    typer.echo(
+        f"Submission ingestion benchmark with batches of {batch_size} records "
+        + f"({repeat} repetitions):"
+    )
+    asyncio.run(_benchmark_submission_ingestion(config, sizes, repeat))
+
+
+@cli.command()
+def submission_planner(
+    sizes: List[int] = typer.Option([100000]),
+    repeat: int = 5,
+):
+    """
+    Measure the time for annotating the entities of new Submissions and
+    linking them by alias, without writing to a database.
+    """
+    typer.echo(f"Submission planner benchmark ({repeat} repetitions):")
+    asyncio.run(_benchmark_submission_planner(sizes, repeat))
+
+
+@cli.command()
+def response_serialization(
+    db_url: str = "mongodb://localhost:27017",
+    db_name: str = "metadata-store-benchmark",
+    n_files: int = 2000,
+    n_samples: int = 500,
+    repeat: int = 5,
+):
+    """
+    Compare the CPU time for serializing an embedded Dataset response through
+    the validated response model with rendering the stored document directly.
+    """
+    config = Config(db_url=db_url, db_name=db_name)
+    typer.echo(
+        f"Response serialization benchmark with {n_files} files and {n_samples} "
+        + f"samples ({repeat} repetitions):"
+    )
+    asyncio.run(_benchmark_response_serialization(config, n_files, n_samples, repeat))
+
+
+if __name__ == "__main__":
+    cli()
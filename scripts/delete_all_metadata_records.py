@@ -29,6 +29,7 @@ CollectionTypes = Literal[
     "DataAccessCommittee",
     "DataAccessPolicy",
     "Dataset",
+    "DatasetSummary",
     "Experiment",
     "File",
     "Individual",
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add a Submission from a file of newline-delimited JSON records"""
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+import typer
+
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao.db import close_db
+from metadata_repository_service.dao.indexes import ensure_indexes
+from metadata_repository_service.dao.submission_stream import ingest_submission_stream
+
+
+async def read_lines(path: Path) -> AsyncIterator[bytes]:
+    """Read the lines of a file"""
+    with open(path, "rb") as file:
+        for line in file:
+            yield line.rstrip(b"\r\n")
+
+
+async def ingest(path: Path, config: Config) -> str:
+    """Add the Submission and close the database connection"""
+    try:
+        await ensure_indexes(config)
+        submission = await ingest_submission_stream(read_lines(path), config=config)
+        return submission["id"]
+    finally:
+        await close_db()
+
+
+def main(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False),
+    db_url: str = "mongodb://localhost:27017",
+    db_name: str = "metadata-store",
+    batch_size: int = 1000,
+):
+    """
+    Add a Submission from a file of newline-delimited JSON records, one record
+    per entity, without loading the whole Submission into memory.
+    """
+
+    typer.echo(f"Adding Submission from '{path}' to db '{db_name}' at URL {db_url}.")
+
+    config = Config(db_url=db_url, db_name=db_name, ingestion_batch_size=batch_size)
+    try:
+        submission_id = asyncio.run(ingest(path, config))
+    except ValueError as error:
+        typer.echo(f"Invalid Submission: {error}", err=True)
+        raise typer.Exit(code=1) from error
+
+    typer.echo(f"Done. Added Submission {submission_id}.")
+
+
+if __name__ == "__main__":
+    typer.run(main)
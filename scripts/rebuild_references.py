@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rebuild the references between the entities in the database"""
+
+import asyncio
+
+import typer
+
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao.db import close_db
+from metadata_repository_service.dao.indexes import ensure_indexes
+from metadata_repository_service.dao.references import rebuild_references
+
+
+async def rebuild(config: Config) -> int:
+    """Rebuild all references and close the database connection"""
+    try:
+        await ensure_indexes(config)
+        return await rebuild_references(config=config)
+    finally:
+        await close_db()
+
+
+def main(db_url: str = "mongodb://localhost:27017", db_name: str = "metadata-store"):
+    """Rebuild the references between the entities in the database"""
+
+    typer.echo(f"Rebuilding Dataset summaries in db '{db_name}' at URL {db_url}.")
+
+    config = Config(db_url=db_url, db_name=db_name)
+    count = asyncio.run(rebuild(config))
+
+    typer.echo(f"Done. Stored {count} references.")
+
+
+if __name__ == "__main__":
+    typer.run(main)
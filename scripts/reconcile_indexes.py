@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the indexes of the metadata store with the registered indexes"""
+
+import asyncio
+
+import typer
+
+from metadata_repository_service.admin_models import IndexReport
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao.db import close_db
+from metadata_repository_service.dao.indexes import reconcile_indexes
+
+
+async def reconcile(config: Config, check: bool, drop_extra: bool) -> IndexReport:
+    """Reconcile the indexes and close the database connection"""
+    try:
+        return await reconcile_indexes(
+            config=config, create_missing=not check, drop_extra=drop_extra
+        )
+    finally:
+        await close_db()
+
+
+def main(
+    db_url: str = "mongodb://localhost:27017",
+    db_name: str = "metadata-store",
+    check: bool = typer.Option(
+        False, help="Only report the differences, without creating indexes."
+    ),
+    drop_extra: bool = typer.Option(
+        False, help="Drop the indexes that are not registered."
+    ),
+):
+    """
+    Create the registered indexes that are missing from the metadata store and
+    report the indexes that differ from or are not in the registry.
+    """
+
+    typer.echo(f"Reconciling indexes in db '{db_name}' at URL {db_url}.")
+
+    config = Config(db_url=db_url, db_name=db_name)
+    report = asyncio.run(reconcile(config, check=check, drop_extra=drop_extra))
+
+    for label, indexes in (
+        ("Missing", report.missing),
+        ("Created", report.created),
+        ("Failed", report.failed),
+        ("Mismatched", report.mismatched),
+        ("Not registered", report.extra),
+        ("Dropped", report.dropped),
+    ):
+        for index in indexes:
+            typer.echo(f"  {label}: {index}")
+
+    if report.failed or (check and (report.missing or report.mismatched)):
+        raise typer.Exit(code=1)
+    typer.echo("Done.")
+
+
+if __name__ == "__main__":
+    typer.run(main)
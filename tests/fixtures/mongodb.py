@@ -64,9 +64,10 @@ def mongo_app_fixture1():
                 db_client[config.db_name][collection_name].insert_many(objects)
 
         app.dependency_overrides[get_config] = lambda: config
-        app_client = TestClient(app)
-
-        yield MongoAppFixture(app_client=app_client, config=config)
+        # run the app lifespan so that a single event loop (and therefore a single
+        # pooled database client) is used for all requests of a test:
+        with TestClient(app) as app_client:
+            yield MongoAppFixture(app_client=app_client, config=config)
 
 
 @pytest.fixture(scope="function")
@@ -99,9 +100,10 @@ def mongo_app_fixture2():
                 db_client[config.db_name][collection_name].insert_many(objects)
 
         app.dependency_overrides[get_config] = lambda: config
-        app_client = TestClient(app)
-
-        yield MongoAppFixture(app_client=app_client, config=config)
+        # run the app lifespan so that a single event loop (and therefore a single
+        # pooled database client) is used for all requests of a test:
+        with TestClient(app) as app_client:
+            yield MongoAppFixture(app_client=app_client, config=config)
 
 
 @pytest.fixture(scope="function")
@@ -115,6 +117,7 @@ def mongo_app_fixture3():
         config = Config(db_url=connection_url, db_name="test")
 
         app.dependency_overrides[get_config] = lambda: config
-        app_client = TestClient(app)
-
-        yield MongoAppFixture(app_client=app_client, config=config)
+        # run the app lifespan so that a single event loop (and therefore a single
+        # pooled database client) is used for all requests of a test:
+        with TestClient(app) as app_client:
+            yield MongoAppFixture(app_client=app_client, config=config)
@@ -15,10 +15,19 @@
 
 """Test the api module"""
 
+import importlib.util
+import json
+
 import pytest
 from fastapi import status
 
-from ..fixtures.mongodb import MongoAppFixture, mongo_app_fixture1  # noqa: F401
+from metadata_repository_service.dao.cache import get_entity_cache
+
+from ..fixtures.mongodb import (  # noqa: F401
+    MongoAppFixture,
+    mongo_app_fixture1,
+    mongo_app_fixture2,
+)
 
 
 def test_index(mongo_app_fixture1: MongoAppFixture):  # noqa: F811
@@ -75,3 +84,443 @@ def test_get_entity_by_id(
     assert "id" in data and data["id"] == entity_id
     for key, value in check_conditions.items():
         assert key in data and data[key] == value
+
+
+@pytest.mark.parametrize(
+    "route,entity_id",
+    [
+        ("experiments", "bff27a01-fc20-439b-81a6-639f217c46fc"),
+        ("samples", "2efbf6ed-a3c3-4b74-9b3f-fd72d4a6c33f"),
+    ],
+)
+def test_get_embedded_entity_by_aggregation(
+    mongo_app_fixture2: MongoAppFixture,  # noqa: F811
+    route,
+    entity_id,
+):
+    """Test that embedding by aggregation yields the same result as the resolver"""
+    client = mongo_app_fixture2.app_client
+    config = mongo_app_fixture2.config
+
+    response = client.get(f"/{route}/{entity_id}?embedded=true")
+    assert response.status_code == status.HTTP_200_OK
+    resolved = response.json()
+
+    config.embedding_aggregation_collections = ["Experiment", "Sample"]
+    response = client.get(f"/{route}/{entity_id}?embedded=true")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == resolved
+
+
+@pytest.mark.parametrize("aggregation", [False, True])
+def test_get_entity_fields(
+    mongo_app_fixture2: MongoAppFixture, aggregation  # noqa: F811
+):
+    """Test that requested fields select from the entity and its embedded references"""
+    client = mongo_app_fixture2.app_client
+    experiment_id = "bff27a01-fc20-439b-81a6-639f217c46fc"
+    if aggregation:
+        mongo_app_fixture2.config.embedding_aggregation_collections = ["Experiment"]
+
+    full = client.get(f"/experiments/{experiment_id}?embedded=true").json()
+    fields = ["accession,title", "has_sample.name", "has_sample.has_biospecimen.name"]
+    params = {"embedded": True, "fields": fields}
+    response = client.get(f"/experiments/{experiment_id}", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "id": experiment_id,
+        "accession": full["accession"],
+        "title": full["title"],
+        "has_sample": [
+            {
+                "id": sample["id"],
+                "name": sample["name"],
+                "has_biospecimen": {
+                    "id": sample["has_biospecimen"]["id"],
+                    "name": sample["has_biospecimen"]["name"],
+                },
+            }
+            for sample in full["has_sample"]
+        ],
+    }
+
+    response = client.post(
+        "/experiments/batch", json={"ids": [experiment_id]}, params=params
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert (
+        response.json()["items"][0]["entity"]
+        == client.get(f"/experiments/{experiment_id}", params=params).json()
+    )
+
+    for invalid_params in (
+        {"fields": ["not_a_field"]},
+        {"fields": ["has_sample.name"]},
+        {"fields": ["title.name"], "embedded": True},
+    ):
+        response = client.get(f"/experiments/{experiment_id}", params=invalid_params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def _collapse_references(entity, relations, depth):
+    """Replace the embedded references that are not planned by their IDs"""
+    collapsed = dict(entity)
+    for field, value in entity.items():
+        if field == "has_attribute" or not field.startswith("has_"):
+            continue
+        if depth == 0 or (relations is not None and field not in relations):
+            collapse = lambda x: x["id"] if isinstance(x, dict) else x  # noqa: E731
+        else:
+            subrelations = None if relations is None else relations[field]
+            subdepth = None if depth is None else depth - 1
+            collapse = lambda x: (  # noqa: E731
+                _collapse_references(x, subrelations, subdepth)
+                if isinstance(x, dict)
+                else x
+            )
+        if isinstance(value, list):
+            collapsed[field] = [collapse(x) for x in value]
+        else:
+            collapsed[field] = collapse(value)
+    return collapsed
+
+
+@pytest.mark.parametrize("aggregation", [False, True])
+@pytest.mark.parametrize(
+    "params,relations,depth",
+    [
+        ({"embed": ["has_sample"]}, {"has_sample": {}}, None),
+        (
+            {"embed": ["has_sample.has_biospecimen,has_study"]},
+            {"has_sample": {"has_biospecimen": {}}, "has_study": {}},
+            None,
+        ),
+        ({"depth": 1}, None, 1),
+        ({"depth": 0, "embedded": True}, None, 0),
+        ({"embed": ["has_sample.has_biospecimen"], "depth": 1}, {"has_sample": {}}, 1),
+    ],
+)
+def test_get_entity_selective_embedding(
+    mongo_app_fixture2: MongoAppFixture,  # noqa: F811
+    aggregation,
+    params,
+    relations,
+    depth,
+):
+    """Test embedding only the requested references, up to the requested depth"""
+    client = mongo_app_fixture2.app_client
+    experiment_id = "bff27a01-fc20-439b-81a6-639f217c46fc"
+    if aggregation:
+        mongo_app_fixture2.config.embedding_aggregation_collections = ["Experiment"]
+
+    full = client.get(f"/experiments/{experiment_id}?embedded=true").json()
+    response = client.get(f"/experiments/{experiment_id}", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == _collapse_references(full, relations, depth)
+
+    response = client.post(
+        "/experiments/batch", json={"ids": [experiment_id]}, params=params
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["items"][0]["entity"] == _collapse_references(
+        full, relations, depth
+    )
+
+
+def test_get_entity_selective_embedding_invalid_request(
+    mongo_app_fixture2: MongoAppFixture,  # noqa: F811
+):
+    """Test that unknown reference fields and unembedded field paths are rejected"""
+    client = mongo_app_fixture2.app_client
+    experiment_id = "bff27a01-fc20-439b-81a6-639f217c46fc"
+
+    for params in (
+        {"embed": ["title"]},
+        {"embed": ["has_sample.name"]},
+        {"depth": -1},
+        {"depth": 1, "fields": ["has_sample.has_biospecimen.name"]},
+        {"embed": ["has_study"], "fields": ["has_sample.name"]},
+    ):
+        response = client.get(f"/experiments/{experiment_id}", params=params)
+        assert response.status_code in (
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+
+@pytest.mark.parametrize(
+    "budget", [{"embedding_max_nodes": 4}, {"embedding_max_bytes": 2300}]
+)
+def test_get_entity_embedding_budget(
+    mongo_app_fixture1: MongoAppFixture, budget  # noqa: F811
+):
+    """Test truncating embedded arrays to the budget and paging through the rest"""
+    client = mongo_app_fixture1.app_client
+    dataset_id = "12461315-7bd4-40ff-9c2f-0e0fa4cd6c66"
+    experiment_ids = client.get(f"/datasets/{dataset_id}").json()["has_experiment"]
+    batch = client.post("/experiments/batch", json={"ids": experiment_ids}).json()
+    stored_ids = {item["identifier"] for item in batch["items"] if item["found"]}
+    for name, value in budget.items():
+        setattr(mongo_app_fixture1.config, name, value)
+
+    response = client.get(f"/datasets/{dataset_id}?embedded=true")
+    assert response.status_code == status.HTTP_200_OK
+    dataset = response.json()
+    count = len(dataset["has_experiment"])
+    assert 0 < count < len(experiment_ids)
+    assert dataset["_continuations"] == {"has_experiment": str(count)}
+    assert [x["id"] for x in dataset["has_experiment"] if x] == [
+        x for x in experiment_ids[:count] if x in stored_ids
+    ]
+
+    # a document truncated to the node budget is not modified, while a document
+    # truncated to the byte budget never matches the version looked up ahead of it
+    response = client.get(
+        f"/datasets/{dataset_id}?embedded=true",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    expected_status = (
+        status.HTTP_200_OK
+        if "embedding_max_bytes" in budget
+        else status.HTTP_304_NOT_MODIFIED
+    )
+    assert response.status_code == expected_status
+
+    walked_ids = []
+    params = {"after": dataset["_continuations"]["has_experiment"], "limit": 20}
+    while True:
+        response = client.get(
+            f"/datasets/{dataset_id}/references/has_experiment", params=params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        walked_ids.extend(experiment["id"] for experiment in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+    assert walked_ids == [x for x in experiment_ids[count:] if x in stored_ids]
+
+    response = client.post(
+        "/datasets/batch", json={"ids": [dataset_id]}, params={"embedded": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    batched_dataset = response.json()["items"][0]["entity"]
+    assert batched_dataset["_continuations"] == {"has_experiment": str(count)}
+    assert len(batched_dataset["has_experiment"]) == count
+
+
+def test_get_entity_cache_embedding_budget(
+    mongo_app_fixture1: MongoAppFixture,  # noqa: F811
+):
+    """Test serving cached embedded entities only within the same budget"""
+    client = mongo_app_fixture1.app_client
+    dataset_id = "12461315-7bd4-40ff-9c2f-0e0fa4cd6c66"
+    cache = get_entity_cache(mongo_app_fixture1.config)
+    cache.collections.add("Dataset")
+    try:
+        response = client.get(f"/datasets/{dataset_id}?embedded=true")
+        assert "_continuations" not in response.json()
+        assert cache.stats()["entries"] == 1
+
+        mongo_app_fixture1.config.embedding_max_nodes = 4
+        response = client.get(f"/datasets/{dataset_id}?embedded=true")
+        assert "_continuations" in response.json()
+    finally:
+        cache.collections.discard("Dataset")
+        cache.clear()
+
+
+def test_list_referenced_entities_invalid_request(
+    mongo_app_fixture1: MongoAppFixture,  # noqa: F811
+):
+    """Test that unknown arrays of references, invalid cursors and entities are
+    rejected"""
+    client = mongo_app_fixture1.app_client
+    dataset_id = "85b322c5-7890-446a-ba85-067fdbfa7bbc"
+
+    response = client.get(f"/datasets/{dataset_id}/references/title")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.get(f"/datasets/{dataset_id}/references/has_data_access_policy")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.get(
+        f"/datasets/{dataset_id}/references/has_experiment", params={"after": "-1"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.get("/datasets/does-not-exist/references/has_experiment")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "route,expected_count",
+    [("datasets", 3), ("studies", 3), ("samples", 10)],
+)
+def test_list_entities(
+    mongo_app_fixture1: MongoAppFixture,  # noqa: F811
+    route,
+    expected_count,
+):
+    """Test paging through all records of a collection"""
+    client = mongo_app_fixture1.app_client
+    mongo_app_fixture1.config.list_max_page_size = 2
+
+    items = []
+    params = {"limit": 100, "fields": ["accession"]}
+    while True:
+        response = client.get(f"/{route}", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 2
+        items.extend(page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert len(items) == expected_count
+    assert len({item["id"] for item in items}) == expected_count
+    assert all(set(item).issubset({"id", "accession"}) for item in items)
+
+
+def test_list_entities_invalid_request(
+    mongo_app_fixture1: MongoAppFixture,  # noqa: F811
+):
+    """Test that unknown fields and invalid cursors are rejected"""
+    client = mongo_app_fixture1.app_client
+
+    response = client.get("/datasets", params={"fields": ["not_a_field"]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.get("/datasets", params={"after": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_entity_batch(mongo_app_fixture2: MongoAppFixture):  # noqa: F811
+    """Test getting a batch of records by ID and accession, in request order"""
+    client = mongo_app_fixture2.app_client
+    experiments = client.get("/experiments", params={"fields": ["accession"]})
+    experiments = experiments.json()["items"]
+    identifiers = [
+        experiments[1]["id"],
+        "not-an-experiment",
+        experiments[0]["accession"],
+    ]
+
+    response = client.post(
+        "/experiments/batch", json={"ids": identifiers}, params={"embedded": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert [item["identifier"] for item in items] == identifiers
+    assert [item["found"] for item in items] == [True, False, True]
+    assert items[1]["entity"] is None
+    for item, experiment in ((items[0], experiments[1]), (items[2], experiments[0])):
+        response = client.get(f"/experiments/{experiment['id']}?embedded=true")
+        assert item["entity"] == response.json()
+
+    mongo_app_fixture2.config.batch_max_ids = 2
+    response = client.post("/experiments/batch", json={"ids": identifiers})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_referenced_by(mongo_app_fixture1: MongoAppFixture):  # noqa: F811
+    """Test paging through the references to an entity after a rebuild"""
+    client = mongo_app_fixture1.app_client
+    study_id = "595c6fe1-1908-4596-b72a-ac89b7960375"
+
+    response = client.post("/admin/rebuild_references")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["count"] > 0
+
+    items = []
+    params = {"limit": 1}
+    while True:
+        response = client.get(f"/studies/{study_id}/referenced_by", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 1
+        items.extend(page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+    assert {
+        "collection": "Dataset",
+        "id": "12461315-7bd4-40ff-9c2f-0e0fa4cd6c66",
+        "field": "has_study",
+    } in items
+
+    response = client.get(
+        f"/studies/{study_id}/referenced_by", params={"collection": "Dataset"}
+    )
+    assert {item["collection"] for item in response.json()["items"]} == {"Dataset"}
+
+    response = client.get("/studies/not-a-study/referenced_by")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_export_collection(
+    mongo_app_fixture1: MongoAppFixture, compression  # noqa: F811
+):
+    """Test exporting all records of a collection as NDJSON"""
+    client = mongo_app_fixture1.app_client
+
+    params = {"compression": compression} if compression else {}
+    response = client.get("/export/Sample", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers.get("content-encoding") == compression
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 10
+    assert all("_id" not in record for record in records)
+
+    response = client.get("/export/_accession_tracker_")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_export_compression_unavailable(
+    mongo_app_fixture1: MongoAppFixture,  # noqa: F811
+):
+    """Test that unsupported or unavailable compressions are rejected"""
+    client = mongo_app_fixture1.app_client
+
+    response = client.get("/export/Sample", params={"compression": "brotli"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    if importlib.util.find_spec("zstandard") is not None:
+        pytest.skip("the zstandard package is installed")
+    response = client.get("/export/Sample", params={"compression": "zstd"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_export_dataset(mongo_app_fixture1: MongoAppFixture):  # noqa: F811
+    """Test exporting a Dataset together with the records it references"""
+    client = mongo_app_fixture1.app_client
+    dataset_id = "12461315-7bd4-40ff-9c2f-0e0fa4cd6c66"
+
+    response = client.get(f"/datasets/{dataset_id}/export")
+    assert response.status_code == status.HTTP_200_OK
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["collection"] == "Dataset"
+    assert records[0]["document"]["id"] == dataset_id
+    keys = [(x["collection"], x["document"]["id"]) for x in records]
+    assert len(keys) == len(set(keys))
+
+    response = client.get(f"/datasets/{dataset_id}/export", params={"embedded": "true"})
+    assert response.status_code == status.HTTP_200_OK
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["collection"] == "Dataset"
+    assert all(isinstance(study, dict) for study in records[0]["document"]["has_study"])
+
+    response = client.get("/datasets/does-not-exist/export")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_index_report(mongo_app_fixture1: MongoAppFixture):  # noqa: F811
+    """Test that the registered indexes are created when the service starts"""
+    client = mongo_app_fixture1.app_client
+
+    response = client.get("/admin/indexes")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["missing"] == []
+    assert report["mismatched"] == []
+    assert report["created"] == []
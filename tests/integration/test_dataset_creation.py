@@ -14,6 +14,8 @@
 # limitations under the License.
 """Test the creation of dataset via the API"""
 
+import pytest
+
 from ..fixtures.mongodb import MongoAppFixture, mongo_app_fixture2  # noqa: F401
 
 
@@ -147,3 +149,88 @@ def test_create_dataset(mongo_app_fixture2: MongoAppFixture):  # noqa: F811
     patched_dataset = response.json()
     assert patched_dataset["release_status"] == dataset_patch["release_status"]
     assert patched_dataset["creation_date"] != patched_dataset["update_date"]
+
+
+@pytest.mark.parametrize("strategy", ["embedding", "aggregation"])
+def test_dataset_summary(
+    mongo_app_fixture2: MongoAppFixture, strategy: str  # noqa: F811
+):
+    """Test that the summary of a Dataset is stored on creation and can be rebuilt"""
+    client = mongo_app_fixture2.app_client
+    mongo_app_fixture2.config.dataset_summary_strategy = strategy
+    dac_data = {
+        "name": "Test DAC",
+        "description": "A Data Access Committee for sharing test datasets",
+        "main_contact": {
+            "organization": "GHGA",
+            "email": "foo@ghga.de",
+        },
+        "has_member": [{"organization": "GHGA", "email": "foo@ghga.de"}],
+    }
+    response = client.post("/data_access_committees", json=dac_data)
+    dap_data = {
+        "name": "New DAP",
+        "policy_text": "Some text that explains the access restrictions",
+        "has_data_access_committee": response.json()["accession"],
+    }
+    response = client.post("/data_access_policies", json=dap_data)
+    dataset_data = {
+        "has_file": ["GHGA:FIL000000000001", "GHGA:FIL000000000002"],
+        "has_data_access_policy": response.json()["accession"],
+    }
+    response = client.post("/datasets", json=dataset_data)
+    dataset_entity = response.json()
+
+    response = client.get(f"/dataset_summary/{dataset_entity['id']}")
+    dataset_summary = response.json()
+    assert dataset_summary["accession"] == dataset_entity["accession"]
+    assert dataset_summary["file_summary"]["count"] == 2
+    assert dataset_summary["experiment_summary"]["count"] == 2
+    assert dataset_summary["sample_summary"]["count"] == 1
+    assert dataset_summary["sample_summary"]["stats"] == {
+        "sex": {"male": 0, "female": 0, "unkown": 0},
+        "tissues": 0,
+        "phenotypes": 22,
+    }
+    assert dataset_summary["study_summary"]["count"] == 1
+
+    response = client.post("/admin/rebuild_dataset_summaries")
+    assert response.json() == {"count": 1}
+    response = client.get(f"/dataset_summary/{dataset_entity['id']}")
+    assert response.json() == dataset_summary
+
+    response = client.get("/dataset_summary/does-not-exist")
+    assert response.status_code == 404
+
+
+def test_create_dataset_missing_references(
+    mongo_app_fixture2: MongoAppFixture,  # noqa: F811
+):
+    """Test that a Dataset referencing missing entities is not created"""
+    client = mongo_app_fixture2.app_client
+    dataset_data = {
+        "has_file": ["GHGA:FIL000000000001", "GHGA:FIL999999999999"],
+        "has_data_access_policy": "GHGA:DAP999999999999",
+    }
+    response = client.post("/datasets", json=dataset_data)
+    assert response.status_code == 404
+    assert "GHGA:DAP999999999999" in response.json()["detail"]
+
+    dac_data = {
+        "name": "Test DAC",
+        "description": "A Data Access Committee for sharing test datasets",
+        "main_contact": {"organization": "GHGA", "email": "foo@ghga.de"},
+        "has_member": [{"organization": "GHGA", "email": "foo@ghga.de"}],
+    }
+    response = client.post("/data_access_committees", json=dac_data)
+    dap_data = {
+        "name": "New DAP",
+        "policy_text": "Some text that explains the access restrictions",
+        "has_data_access_committee": response.json()["accession"],
+    }
+    response = client.post("/data_access_policies", json=dap_data)
+    dataset_data["has_data_access_policy"] = response.json()["accession"]
+    response = client.post("/datasets", json=dataset_data)
+    assert response.status_code == 404
+    assert "['GHGA:FIL999999999999']" in response.json()["detail"]
+    assert client.get("/datasets").json()["items"] == []
@@ -15,6 +15,7 @@
 """Test the creation of submission via the API"""
 
 import json
+import re
 
 from ..fixtures.mongodb import (  # noqa: F401
     BASE_DIR,
@@ -52,11 +53,48 @@ def test_create_submission(mongo_app_fixture3: MongoAppFixture):  # noqa: F811
     assert "library_name" in submission_entity["has_protocol"][0]
     assert "instrument_model" in submission_entity["has_protocol"][1]
 
+    # Protocols are retrieved as instances of their schema type
+    protocol_ids = [x["id"] for x in submission_entity["has_protocol"]]
+    response = client.get(f"/protocols/{protocol_ids[1]}")
+    assert response.json()["instrument_model"] == (
+        submission_entity["has_protocol"][1]["instrument_model"]
+    )
+    response = client.post("/protocols/batch", json={"ids": protocol_ids})
+    items = response.json()["items"]
+    assert "library_name" in items[0]["entity"]
+    assert "instrument_model" in items[1]["entity"]
+    response = client.get("/protocols/not-a-protocol")
+    assert response.status_code == 404
+
     response = client.get(f"/submissions/{submission_entity['id']}?embedded=false")
     full_submission_entity = response.json()
     assert "submission_status" in full_submission_entity
     assert full_submission_entity["submission_status"] == "in_progress"
 
+    # a batch embeds the entities of a Submission in the same way as a single GET
+    response = client.get(f"/submissions/{submission_entity['id']}?embedded=true")
+    embedded_submission_entity = response.json()
+    response = client.post(
+        "/submissions/batch",
+        json={"ids": [submission_entity["id"]]},
+        params={"embedded": True},
+    )
+    assert response.json()["items"][0]["entity"] == embedded_submission_entity
+
+    # the references of the entities are embedded on request
+    response = client.get(
+        f"/submissions/{submission_entity['id']}",
+        params={"embed": ["has_study.has_project"]},
+    )
+    selectively_embedded_entity = response.json()
+    assert isinstance(selectively_embedded_entity["has_study"]["has_project"], dict)
+    assert isinstance(selectively_embedded_entity["has_project"], str)
+    response = client.get(
+        f"/submissions/{submission_entity['id']}", params={"depth": 2}
+    )
+    assert isinstance(response.json()["has_study"]["has_project"], dict)
+    assert isinstance(embedded_submission_entity["has_study"]["has_project"], str)
+
     submission_patch = {"submission_status": "completed"}
     response = client.patch(
         f"/submissions/{submission_entity['id']}", json=submission_patch
@@ -83,3 +121,212 @@ def test_create_submission(mongo_app_fixture3: MongoAppFixture):  # noqa: F811
     assert updated_submission["creation_date"] == submission_entity["creation_date"]
     assert updated_submission["creation_date"] != updated_submission["update_date"]
     assert updated_submission["update_date"] != patched_submission["update_date"]
+
+
+def test_submission_accessions(mongo_app_fixture3: MongoAppFixture):  # noqa: F811
+    """Test that the entities of a Submission are assigned unique accessions"""
+    client = mongo_app_fixture3.app_client
+
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_json = json.load(file)
+
+    accessions = []
+    for _ in range(2):
+        response = client.post("/submissions", json=submission_json)
+        submission_entity = response.json()
+        accessions.extend(x["accession"] for x in submission_entity["has_file"])
+        accessions.extend(x["accession"] for x in submission_entity["has_experiment"])
+        accessions.append(submission_entity["has_study"]["accession"])
+
+    assert len(accessions) == len(set(accessions))
+    for accession in accessions:
+        assert re.fullmatch(r"GHGA:(FIL|EXP|STU)\d{12}", accession)
+
+
+def test_update_submission_diff(mongo_app_fixture3: MongoAppFixture):  # noqa: F811
+    """Test that updating a Submission keeps the IDs and accessions of the
+    unchanged entities and removes the entities that are no longer part of it"""
+    client = mongo_app_fixture3.app_client
+
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_json = json.load(file)
+    response = client.post("/submissions", json=submission_json)
+    submission_entity = response.json()
+
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission_update.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_update = json.load(file)
+    removed_file = submission_entity["has_file"][-1]
+    response = client.get(f"/files/{removed_file['id']}/referenced_by")
+    references = {(x["collection"], x["field"]) for x in response.json()["items"]}
+    assert references == {("Submission", "has_file"), ("Experiment", "has_file")}
+
+    submission_update["has_file"] = [
+        x for x in submission_update["has_file"] if x["alias"] != removed_file["alias"]
+    ]
+    for experiment in submission_update["has_experiment"]:
+        experiment["has_file"] = [
+            x for x in experiment["has_file"] if x != removed_file["alias"]
+        ]
+
+    response = client.put(
+        f"/submissions/{submission_entity['id']}", json=submission_update
+    )
+    updated_submission = response.json()
+    assert updated_submission["has_project"]["id"] == (
+        submission_entity["has_project"]["id"]
+    )
+    assert updated_submission["has_project"]["title"] == (
+        submission_update["has_project"]["title"]
+    )
+    assert updated_submission["has_study"]["accession"] == (
+        submission_entity["has_study"]["accession"]
+    )
+    assert [(x["id"], x["accession"]) for x in updated_submission["has_file"]] == [
+        (x["id"], x["accession"]) for x in submission_entity["has_file"][:-1]
+    ]
+
+    response = client.get(f"/files/{removed_file['id']}")
+    assert response.status_code == 404
+
+    # the references of the replaced Submission are not duplicated
+    kept_file = submission_entity["has_file"][0]
+    response = client.get(
+        f"/files/{kept_file['id']}/referenced_by", params={"collection": "Submission"}
+    )
+    assert response.json()["items"] == [
+        {"collection": "Submission", "id": submission_entity["id"], "field": "has_file"}
+    ]
+
+
+def test_create_submission_from_stream(
+    mongo_app_fixture3: MongoAppFixture,  # noqa: F811
+):
+    """Test that a Submission can be streamed as NDJSON records"""
+    client = mongo_app_fixture3.app_client
+
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_json = json.load(file)
+
+    records = []
+    for field in list(submission_json.keys()):
+        if field.startswith("has_"):
+            value = submission_json.pop(field)
+            records.extend(value if isinstance(value, list) else [value])
+    records.append(submission_json)
+    body = "\n".join(json.dumps(record) for record in records)
+
+    response = client.post(
+        "/submissions/stream",
+        data=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    submission_entity = response.json()
+    assert submission_entity["submission_status"] == "in_progress"
+    assert len(submission_entity["has_file"]) == 3
+    assert len(submission_entity["has_protocol"]) == 2
+
+    response = client.get(f"/submissions/{submission_entity['id']}?embedded=true")
+    full_submission_entity = response.json()
+    experiment = full_submission_entity["has_experiment"][0]
+    assert experiment["has_study"] == submission_entity["has_study"]
+    assert set(experiment["has_file"]) <= set(submission_entity["has_file"])
+    assert full_submission_entity["has_file"][0]["accession"].startswith("GHGA:FIL")
+
+    records[0]["has_individual"] = "unknown-alias"
+    body = "\n".join(json.dumps(record) for record in records)
+    response = client.post(
+        "/submissions/stream",
+        data=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 422
+    assert "unknown-alias" in response.json()["detail"]
+
+
+def test_create_submission_dangling_alias(
+    mongo_app_fixture3: MongoAppFixture,  # noqa: F811
+):
+    """Test that a Submission referencing an undefined alias is rejected"""
+    client = mongo_app_fixture3.app_client
+
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_json = json.load(file)
+    submission_json["has_experiment"][0]["has_sample"] = ["unknown-alias"]
+
+    response = client.post("/submissions", json=submission_json)
+    assert response.status_code == 422
+    assert "unknown-alias" in response.json()["detail"]
+
+
+def test_conditional_get(mongo_app_fixture3: MongoAppFixture):  # noqa: F811
+    """Test answering conditional requests for entities with 304 Not Modified"""
+    client = mongo_app_fixture3.app_client
+
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_json = json.load(file)
+    submission_entity = client.post("/submissions", json=submission_json).json()
+    study_url = f"/studies/{submission_entity['has_study']['id']}"
+
+    response = client.get(study_url, params={"embedded": True})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    assert etag.startswith('"')
+
+    response = client.get(
+        study_url, params={"embedded": True}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    response = client.get(
+        study_url,
+        params={"embedded": True},
+        headers={"If-Modified-Since": last_modified},
+    )
+    assert response.status_code == 304
+    response = client.get(
+        study_url,
+        params={"embedded": True},
+        headers={"If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT"},
+    )
+    assert response.status_code == 200
+
+    # the entity tag is specific to the representation
+    for params in (
+        {},
+        {"fields": "title"},
+        {"depth": 1},
+        {"embed": "has_project", "fields": "has_project.title"},
+    ):
+        response = client.get(study_url, params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        response = client.get(
+            study_url,
+            params=params,
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert response.status_code == 304
+
+    # updating an embedded entity changes the entity tag
+    file_path = BASE_DIR / "test_data" / "submission_example" / "submission_update.json"
+    with open(file_path, "r", encoding="utf8") as file:
+        submission_update = json.load(file)
+    client.put(f"/submissions/{submission_entity['id']}", json=submission_update)
+    response = client.get(
+        study_url, params={"embedded": True}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    assert client.get("/studies/not-a-study").status_code == 404
+    response = client.get(study_url, params={"fields": "not_a_field"})
+    assert response.status_code == 400
@@ -0,0 +1,198 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An in-memory stand-in for the change streams of a MongoDB replica set"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+
+def _matches(document: Dict, query: Dict) -> bool:
+    """Whether a document matches a query of equalities, ``$or`` and ``$lt``"""
+    for key, value in query.items():
+        if key == "$or":
+            if not any(_matches(document, x) for x in value):
+                return False
+        elif isinstance(value, dict) and "$lt" in value:
+            if document.get(key) is None or not document[key] < value["$lt"]:
+                return False
+        elif document.get(key) != value:
+            return False
+    return True
+
+
+class UpdateResultStandIn:
+    """The result of an update"""
+
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+
+
+class TokenCollectionStandIn:
+    """
+    Stores documents in memory, supporting the queries used for resume tokens and
+    leases. The ``consumer`` field is unique once a unique index is created on it.
+    """
+
+    def __init__(self):
+        self.documents: List[Dict] = []
+        self.unique_fields: List[str] = []
+
+    async def create_index(self, field: str, unique: bool = False) -> str:
+        """Create an index on a field, which is only enforced if unique"""
+        if unique and field not in self.unique_fields:
+            self.unique_fields.append(field)
+        return f"{field}_1"
+
+    def _find(self, query: Dict) -> Optional[Dict]:
+        for document in self.documents:
+            if _matches(document, query):
+                return document
+        return None
+
+    def _upsert(self, query: Dict) -> Dict:
+        for field in self.unique_fields:
+            if any(x.get(field) == query.get(field) for x in self.documents):
+                raise DuplicateKeyError(f"Duplicate {field}")
+        document = {key: value for key, value in query.items() if key[0] != "$"}
+        self.documents.append(document)
+        return document
+
+    async def find_one(self, query: Dict) -> Optional[Dict]:
+        """Find the first document matching the query"""
+        return self._find(query)
+
+    async def find_one_and_update(
+        self, query: Dict, update: Dict, upsert: bool = False, **kwargs: Any
+    ) -> Optional[Dict]:
+        """Update the first document matching the query, returning it as updated"""
+        document = self._find(query)
+        if document is None:
+            if not upsert:
+                return None
+            document = self._upsert(query)
+        document.update(update["$set"])
+        return dict(document)
+
+    async def update_one(
+        self, query: Dict, update: Dict, upsert: bool = False
+    ) -> UpdateResultStandIn:
+        """Update the first document matching the query"""
+        document = self._find(query)
+        if document is None:
+            if not upsert:
+                return UpdateResultStandIn(0)
+            document = self._upsert(query)
+        document.update(update["$set"])
+        return UpdateResultStandIn(1)
+
+
+class ChangeStreamStandIn:
+    """A change stream replaying the changes recorded by a database stand-in"""
+
+    def __init__(self, database: "ReplicaSetDatabaseStandIn", position: int):
+        self._database = database
+        self._position = position
+        self.resume_token: Optional[Dict] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict:
+        while self._position >= len(self._database.changes):
+            await self._database.wait_for_change()
+        return self._next()
+
+    async def try_next(self) -> Optional[Dict]:
+        """Get the next change, or ``None`` if there is none yet"""
+        if self._position >= len(self._database.changes):
+            await asyncio.sleep(0)
+            return None
+        return self._next()
+
+    def _next(self) -> Dict:
+        change = self._database.changes[self._position]
+        self._position += 1
+        self.resume_token = change["_id"]
+        return change
+
+
+class ReplicaSetDatabaseStandIn:
+    """
+    Records change events and serves them as change streams, like a database of
+    a replica set. Changes older than ``oplog_start`` are no longer available.
+    """
+
+    def __init__(self):
+        self.changes: List[Dict] = []
+        self.oplog_start = 0
+        self.watch_calls: List[Dict] = []
+        self.collections: Dict[str, TokenCollectionStandIn] = {}
+        self._changed = asyncio.Event()
+
+    def __getitem__(self, name: str) -> TokenCollectionStandIn:
+        return self.collections.setdefault(name, TokenCollectionStandIn())
+
+    def add_change(
+        self,
+        operation: str,
+        collection_name: Optional[str] = None,
+        document: Optional[Dict] = None,
+        document_before_change: Optional[Dict] = None,
+    ):
+        """Record a change event"""
+        change: Dict = {
+            "_id": {"_data": str(len(self.changes))},
+            "operationType": operation,
+            "ns": {"db": "metadata-store"},
+        }
+        if collection_name is not None:
+            change["ns"]["coll"] = collection_name
+        if document is not None:
+            change["fullDocument"] = document
+        if document_before_change is not None:
+            change["fullDocumentBeforeChange"] = document_before_change
+        self.changes.append(change)
+        self._changed.set()
+
+    async def wait_for_change(self):
+        """Wait until a new change is recorded"""
+        self._changed.clear()
+        await self._changed.wait()
+
+    def watch(
+        self,
+        pipeline: List[Dict],
+        resume_after: Optional[Dict] = None,
+        **kwargs: Any,
+    ) -> ChangeStreamStandIn:
+        """Open a change stream starting after the given resume token"""
+        self.watch_calls.append(
+            {"pipeline": pipeline, "resume_after": resume_after, **kwargs}
+        )
+        if resume_after is None:
+            return ChangeStreamStandIn(self, len(self.changes))
+        position = int(resume_after["_data"]) + 1
+        if position < self.oplog_start:
+            raise OperationFailure("Resume point no longer in the oplog", code=286)
+        return ChangeStreamStandIn(self, position)
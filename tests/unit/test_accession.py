@@ -0,0 +1,47 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the allocation of accessions"""
+
+import asyncio
+
+from metadata_repository_service.dao.accession import (
+    _get_lock,
+    format_accession,
+    get_accession_prefix,
+)
+
+
+def test_accession_format():
+    """Test that accessions keep the GHGA:<PREFIX><12 digits> format"""
+
+    assert get_accession_prefix("File") == "FIL"
+    assert get_accession_prefix("Dataset") == "DAT"
+    assert get_accession_prefix("DataAccessPolicy") == "DAP"
+    assert get_accession_prefix("DataAccessCommittee") == "DAC"
+    assert format_accession("FIL", 42) == "GHGA:FIL000000000042"
+
+
+def test_accession_lock_per_loop():
+    """Test that the lock of an accession pool is created in each event loop"""
+
+    async def get_locks():
+        return (_get_lock("pool"), _get_lock("pool"), _get_lock("other"))
+
+    (first, same, other) = asyncio.run(get_locks())
+    assert first is same
+    assert first is not other
+    (second, _, _) = asyncio.run(get_locks())
+    assert second is not first
@@ -0,0 +1,137 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the in-memory entity cache"""
+
+import bson
+
+from metadata_repository_service.dao.cache import EntityCache
+
+
+def test_entity_cache_lru_eviction():
+    """Test that the least recently used entries are evicted first"""
+
+    cache = EntityCache(max_entries=2, ttl=60, collections=["Dataset"])
+    cache.put(("Dataset", "id", "a", False, None), {"id": "a"})
+    cache.put(("Dataset", "id", "b", False, None), {"id": "b"})
+    assert cache.get(("Dataset", "id", "a", False, None)) == {"id": "a"}
+
+    cache.put(("Dataset", "id", "c", False, None), {"id": "c"})
+
+    assert cache.get(("Dataset", "id", "b", False, None)) is None
+    assert cache.get(("Dataset", "id", "a", False, None)) == {"id": "a"}
+    assert cache.get(("Dataset", "id", "c", False, None)) == {"id": "c"}
+    assert cache.stats() == {
+        "entries": 2,
+        "max_entries": 2,
+        "bytes": 2 * len(bson.encode({"id": "a"})),
+        "max_bytes": 256 * 1024 * 1024,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_entity_cache_ttl():
+    """Test that expired entries are not returned"""
+
+    cache = EntityCache(max_entries=10, ttl=-1, collections=["Dataset"])
+    cache.put(("Dataset", "id", "a", False, None), {"id": "a"})
+
+    assert cache.get(("Dataset", "id", "a", False, None)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_entity_cache_invalidate():
+    """
+    Test that invalidating a document removes its entries regardless of the
+    lookup field as well as the entries that embed it, but no other entries
+    """
+
+    cache = EntityCache(max_entries=10, ttl=60, collections=["Dataset", "File"])
+    cache.put(("File", "id", "f1", False, None), {"id": "f1", "accession": "F1"})
+    cache.put(("File", "accession", "F1", False, None), {"id": "f1", "accession": "F1"})
+    cache.put(("File", "id", "f2", False, None), {"id": "f2", "accession": "F2"})
+    cache.put(
+        ("Dataset", "id", "d1", True, (100, 1000000)),
+        {"id": "d1", "has_file": [{"id": "f1", "accession": "F1"}]},
+    )
+    cache.put(
+        ("Dataset", "id", "d2", True, (100, 1000000)),
+        {"id": "d2", "has_file": [{"id": "f2", "accession": "F2"}]},
+    )
+
+    cache.invalidate("File", ["f1"])
+
+    assert cache.get(("File", "id", "f1", False, None)) is None
+    assert cache.get(("File", "accession", "F1", False, None)) is None
+    assert cache.get(("Dataset", "id", "d1", True, (100, 1000000))) is None
+    assert cache.get(("File", "id", "f2", False, None)) == {
+        "id": "f2",
+        "accession": "F2",
+    }
+    assert cache.get(("Dataset", "id", "d2", True, (100, 1000000))) is not None
+
+    cache.invalidate("File", ["f2"])
+    assert cache.get(("Dataset", "id", "d2", True, (100, 1000000))) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_entity_cache_max_bytes():
+    """Test that the least recently used entries are evicted to stay within the
+    byte budget, and that larger documents are not cached"""
+
+    size = len(bson.encode({"id": "a"}))
+    cache = EntityCache(
+        max_entries=10, ttl=60, collections=["Dataset"], max_bytes=2 * size
+    )
+    for identifier in ("a", "b", "c"):
+        cache.put(("Dataset", "id", identifier, False, None), {"id": identifier})
+
+    assert cache.get(("Dataset", "id", "a", False, None)) is None
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 2 * size
+
+    cache.put(("Dataset", "id", "d", False, None), {"id": "d", "title": "x" * size})
+    assert cache.get(("Dataset", "id", "d", False, None)) is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_entity_cache_stale_write():
+    """
+    Test that a document read before an invalidation is not cached after it
+    """
+
+    cache = EntityCache(max_entries=10, ttl=60, collections=["File"])
+    generation = cache.generation
+    cache.invalidate("File", ["f1"])
+    cache.put(("File", "id", "f1", False, None), {"id": "f1"}, generation=generation)
+    assert cache.get(("File", "id", "f1", False, None)) is None
+
+    generation = cache.generation
+    cache.put(("File", "id", "f1", False, None), {"id": "f1"}, generation=generation)
+    assert cache.get(("File", "id", "f1", False, None)) == {"id": "f1"}
+
+
+def test_entity_cache_enabled_collections():
+    """Test that only the configured collections are cached"""
+
+    cache = EntityCache(max_entries=10, ttl=60, collections=["Dataset"])
+    assert cache.is_enabled("Dataset")
+    assert not cache.is_enabled("File")
+
+    cache = EntityCache(max_entries=0, ttl=60, collections=["Dataset"])
+    assert not cache.is_enabled("Dataset")
@@ -0,0 +1,215 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test watching the change stream of the metadata store"""
+
+import asyncio
+
+import pytest
+
+from metadata_repository_service.config import Config
+from metadata_repository_service.dao import change_stream
+from metadata_repository_service.dao.cache import get_entity_cache
+from metadata_repository_service.dao.change_stream import (
+    RESUME_TOKEN_COLLECTION,
+    consume_changes,
+    register_persistent_change_listener,
+    unregister_change_listener,
+    watch_changes,
+)
+from metadata_repository_service.dao.dataset_summary import SUMMARY_COLLECTION_NAME
+
+from .fixtures.change_stream import ReplicaSetDatabaseStandIn
+
+
+async def _settle():
+    """Let the watcher handle all pending changes"""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def _stop(watcher: asyncio.Task):
+    """Cancel the watcher"""
+    watcher.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await watcher
+
+
+@pytest.fixture
+def recorded_changes(monkeypatch):
+    """Record the changes told to the persistent listeners, instead of notifying
+    the registered ones"""
+    monkeypatch.setattr(change_stream, "_PERSISTENT_CHANGE_LISTENERS", [])
+    changes = []
+
+    async def record_change(event, config):
+        changes.append((config.db_name, event))
+
+    register_persistent_change_listener(record_change)
+    try:
+        yield changes
+    finally:
+        unregister_change_listener(record_change)
+
+
+@pytest.mark.asyncio
+async def test_watch_changes_invalidates_cache():
+    """Test that changes remove the affected entities from the entity cache"""
+
+    config = Config(
+        db_name="test-change-stream-cache", entity_cache_collections=["File"]
+    )
+    cache = get_entity_cache(config)
+    for file_id in ("f1", "f2", "f3"):
+        cache.put(("File", "id", file_id, False, None), {"id": file_id})
+    database = ReplicaSetDatabaseStandIn()
+
+    watcher = asyncio.create_task(watch_changes(database, config))
+    await _settle()
+    database.add_change("update", "File", {"id": "f1"})
+    database.add_change("delete", "File", document_before_change={"id": "f2"})
+    await _settle()
+
+    assert cache.get(("File", "id", "f1", False, None)) is None
+    assert cache.get(("File", "id", "f2", False, None)) is None
+    assert cache.get(("File", "id", "f3", False, None)) == {"id": "f3"}
+
+    # without a pre-image, the deleted document is not known
+    database.add_change("delete", "File")
+    await _settle()
+    await _stop(watcher)
+
+    assert cache.stats()["entries"] == 0
+    match = database.watch_calls[-1]["pipeline"][0]["$match"]
+    assert SUMMARY_COLLECTION_NAME in match["ns.coll"]["$nin"]
+    assert database.watch_calls[-1]["full_document_before_change"] == "whenAvailable"
+
+
+@pytest.mark.asyncio
+async def test_consume_changes_resumes_after_restart(recorded_changes, monkeypatch):
+    """Test that a restarted consumer continues after the last persisted change"""
+
+    config = Config(db_name="test-change-stream-resume")
+    database = ReplicaSetDatabaseStandIn()
+    monkeypatch.setattr(change_stream, "CHECKPOINT_EVENTS", 2)
+
+    consumer = asyncio.create_task(consume_changes(database, config, owner="a"))
+    await _settle()
+    database.add_change("update", "Dataset", {"id": "d1"})
+    await _settle()
+    token_doc = await database[RESUME_TOKEN_COLLECTION].find_one(
+        {"consumer": config.change_stream_consumer}
+    )
+    # the position is persisted in batches
+    assert token_doc.get("resume_token") is None
+    database.add_change("update", "Dataset", {"id": "d2"})
+    await _settle()
+    assert token_doc["resume_token"] == {"_data": "1"}
+    database.add_change("update", "Dataset", {"id": "d3"})
+    await _settle()
+    await _stop(consumer)
+    # and when the lease is released
+    assert token_doc["resume_token"] == {"_data": "2"}
+    assert token_doc["owner"] is None
+
+    database.add_change("delete", "Dataset", document_before_change={"id": "d4"})
+    consumer = asyncio.create_task(consume_changes(database, config, owner="b"))
+    await _settle()
+    await _stop(consumer)
+
+    assert [
+        (event.operation, event.document_id)
+        for (db_name, event) in recorded_changes
+        if db_name == config.db_name
+    ] == [("update", "d1"), ("update", "d2"), ("update", "d3"), ("delete", "d4")]
+    assert database.watch_calls[-1]["resume_after"] == {"_data": "2"}
+
+
+@pytest.mark.asyncio
+async def test_consume_changes_single_consumer(recorded_changes, monkeypatch):
+    """Test that a single process consumes the changes at a time"""
+
+    config = Config(db_name="test-change-stream-lease")
+    database = ReplicaSetDatabaseStandIn()
+    monkeypatch.setattr(change_stream, "LEASE_DURATION", 0.01)
+
+    first = asyncio.create_task(consume_changes(database, config, owner="a"))
+    await _settle()
+    second = asyncio.create_task(consume_changes(database, config, owner="b"))
+    await _settle()
+    database.add_change("update", "Dataset", {"id": "d1"})
+    await _settle()
+    assert len(recorded_changes) == 1
+    assert len(database.watch_calls) == 1
+
+    # the other process takes over when the lease is released
+    await _stop(first)
+    await asyncio.sleep(0.05)
+    database.add_change("update", "Dataset", {"id": "d2"})
+    await _settle()
+    await _stop(second)
+
+    assert [event.document_id for (_, event) in recorded_changes] == ["d1", "d2"]
+    assert database.watch_calls[-1]["resume_after"] == {"_data": "0"}
+
+
+@pytest.mark.asyncio
+async def test_consume_changes_without_index(recorded_changes):
+    """Test that the consumers are unique even if the indexes were not created"""
+
+    config = Config(db_name="test-change-stream-index")
+    database = ReplicaSetDatabaseStandIn()
+
+    consumers = [
+        asyncio.create_task(consume_changes(database, config, owner=owner))
+        for owner in ("a", "b")
+    ]
+    await _settle()
+    database.add_change("update", "Dataset", {"id": "d1"})
+    await _settle()
+    for consumer in consumers:
+        await _stop(consumer)
+
+    assert database[RESUME_TOKEN_COLLECTION].unique_fields == ["consumer"]
+    assert len(database[RESUME_TOKEN_COLLECTION].documents) == 1
+    assert len(database.watch_calls) == 1
+    assert len(recorded_changes) == 1
+
+
+@pytest.mark.asyncio
+async def test_consume_changes_lost_history(recorded_changes):
+    """
+    Test that the listeners are told that any document might have changed if the
+    stream cannot be resumed
+    """
+
+    config = Config(db_name="test-change-stream-history")
+    database = ReplicaSetDatabaseStandIn()
+    database.add_change("insert", "Dataset", {"id": "d1"})
+    database.oplog_start = 2
+    await database[RESUME_TOKEN_COLLECTION].update_one(
+        {"consumer": config.change_stream_consumer},
+        {"$set": {"resume_token": {"_data": "0"}}},
+        upsert=True,
+    )
+
+    consumer = asyncio.create_task(consume_changes(database, config))
+    await _settle()
+    await _stop(consumer)
+
+    assert [
+        (event.operation, event.collection_name) for (_, event) in recorded_changes
+    ] == [("invalidate", None)]
+    assert database.watch_calls[-1]["resume_after"] is None
@@ -0,0 +1,55 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the strategies for computing Dataset summaries"""
+
+from ..fixtures.mongodb import MongoAppFixture, mongo_app_fixture2  # noqa: F401
+
+
+def test_dataset_summary_strategies(
+    mongo_app_fixture2: MongoAppFixture,  # noqa: F811
+):
+    """Test that the embedding and the aggregation strategy compute the same
+    Dataset summary"""
+    client = mongo_app_fixture2.app_client
+    config = mongo_app_fixture2.config
+    dac_data = {
+        "name": "Test DAC",
+        "description": "A Data Access Committee for sharing test datasets",
+        "main_contact": {"organization": "GHGA", "email": "foo@ghga.de"},
+        "has_member": [{"organization": "GHGA", "email": "foo@ghga.de"}],
+    }
+    response = client.post("/data_access_committees", json=dac_data)
+    dap_data = {
+        "name": "New DAP",
+        "policy_text": "Some text that explains the access restrictions",
+        "has_data_access_committee": response.json()["accession"],
+    }
+    response = client.post("/data_access_policies", json=dap_data)
+    dataset_data = {
+        "has_file": ["GHGA:FIL000000000001", "GHGA:FIL000000000002"],
+        "has_data_access_policy": response.json()["accession"],
+    }
+    response = client.post("/datasets", json=dataset_data)
+    dataset_id = response.json()["id"]
+
+    summaries = {}
+    for strategy in ("embedding", "aggregation"):
+        config.dataset_summary_strategy = strategy
+        response = client.post("/admin/rebuild_dataset_summaries")
+        assert response.json() == {"count": 1}
+        summaries[strategy] = client.get(f"/dataset_summary/{dataset_id}").json()
+
+    assert summaries["embedding"]["sample_summary"]["count"] == 1
+    assert summaries["aggregation"] == summaries["embedding"]
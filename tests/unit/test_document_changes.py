@@ -0,0 +1,56 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the writes planned for the changes of a Submission update"""
+
+from pymongo import DeleteMany, InsertOne
+
+from metadata_repository_service.dao.utils import (
+    _get_field_changes,
+    _get_reference_edge_changes,
+)
+
+
+def test_field_changes():
+    """Test that only the changed fields of a document are updated"""
+
+    old_document = {"_id": 1, "id": "s1", "title": "old", "description": "kept"}
+    document = {"id": "s1", "title": "new", "has_file": ["f1"]}
+    assert _get_field_changes(document, old_document) == {
+        "$set": {"title": "new", "has_file": ["f1"]},
+        "$unset": {"description": ""},
+    }
+    assert not _get_field_changes(old_document, old_document)
+
+
+def test_reference_edge_changes():
+    """Test that only the added and removed reference edges are written"""
+
+    old_document = {"id": "s1", "has_file": ["f1", "f2"], "has_study": "st1"}
+    document = {"id": "s1", "has_file": ["f2", "f3"], "has_study": "st1"}
+    operations = _get_reference_edge_changes("Submission", document, old_document)
+    edge = {
+        "target_collection": "File",
+        "collection": "Submission",
+        "id": "s1",
+        "field": "has_file",
+    }
+    assert len(operations) == 2
+    assert DeleteMany({**edge, "target_id": "f1"}) in operations
+    assert InsertOne({**edge, "target_id": "f3"}) in operations
+
+    assert not _get_reference_edge_changes("Submission", old_document, old_document)
+    assert _get_reference_edge_changes("Submission", None, old_document) == [
+        DeleteMany({"collection": "Submission", "id": "s1"})
+    ]
@@ -0,0 +1,34 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the registry of the indexes of the metadata store"""
+
+from metadata_repository_service.dao.indexes import get_index_specs
+
+
+def test_accession_index_partial_filter():
+    """Test that only string accessions are indexed, and that an index with
+    other options does not match the spec"""
+
+    spec = get_index_specs(["Dataset"])["Dataset"]["accession_1"]
+    partial_filter = {"accession": {"$type": "string"}}
+    assert spec.to_index_model().document == {
+        "key": {"accession": 1},
+        "name": "accession_1",
+        "unique": True,
+        "partialFilterExpression": partial_filter,
+    }
+    index_info = {"key": {"accession": 1}, "unique": True}
+    assert spec.matches({**index_info, "partialFilterExpression": partial_filter})
+    assert not spec.matches({**index_info, "sparse": True})
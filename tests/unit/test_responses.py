@@ -0,0 +1,85 @@
+# Copyright 2021 - 2022 Universität Tübingen, DKFZ and EMBL
+# for the German Human Genome-Phenome Archive (GHGA)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test rendering documents from the metadata store without validation"""
+
+import json
+import os
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from metadata_repository_service import models
+from metadata_repository_service.api.main import app
+from metadata_repository_service.api.responses import render_entity
+from metadata_repository_service.dao.embedding import CONTINUATIONS_FIELD
+
+from ..fixtures import BASE_DIR
+
+DATA_DIR = BASE_DIR / "test_data" / "create_dataset_example"
+
+
+def _load_documents(filename: str):
+    """Load the documents of a test data file"""
+    with open(DATA_DIR / filename, "r", encoding="utf8") as file:
+        return json.load(file)[os.path.splitext(filename)[0]]
+
+
+@pytest.mark.parametrize(
+    "filename,model_class",
+    [
+        ("biospecimens.json", models.Biospecimen),
+        ("experiments.json", models.Experiment),
+        ("files.json", models.File),
+        ("individuals.json", models.Individual),
+        ("projects.json", models.Project),
+        ("samples.json", models.Sample),
+        ("studies.json", models.Study),
+    ],
+)
+def test_render_entity(filename, model_class):
+    """Test that documents are rendered as their validated model objects"""
+    for document in _load_documents(filename):
+        assert render_entity(model_class, document) == jsonable_encoder(
+            model_class(**document)
+        )
+
+
+def test_render_embedded_entity():
+    """Test that embedded documents are rendered with their model classes"""
+    experiment = _load_documents("experiments.json")[0]
+    experiment["has_study"] = _load_documents("studies.json")[0]
+    experiment["has_sample"] = _load_documents("samples.json")
+    experiment["has_file"] = _load_documents("files.json")
+    experiment["has_protocol"] = [
+        {"id": "p1", "schema_type": "SequencingProtocol", "instrument_model": "x"},
+        {"id": "p2", "schema_type": "LibraryPreparationProtocol", "library_name": 1},
+    ]
+    experiment["_id"] = "not rendered"
+
+    rendered = render_entity(models.Experiment, experiment)
+    assert rendered == jsonable_encoder(models.Experiment(**experiment))
+    assert rendered["has_protocol"][0]["instrument_model"] == "x"
+    assert rendered["has_protocol"][1]["library_name"] == "1"
+    assert "_id" not in rendered
+
+
+def test_continuations_schema():
+    """Test that the cursors of truncated reference arrays are declared in the
+    schemas of the models with arrays of references only"""
+
+    schemas = app.openapi()["components"]["schemas"]
+    assert CONTINUATIONS_FIELD in schemas["Dataset"]["properties"]
+    assert CONTINUATIONS_FIELD not in schemas["File"]["properties"]
+    assert CONTINUATIONS_FIELD not in schemas["EntityPage"]["properties"]